@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+
+# Filas a partir de las cuales los gráficos de dispersión envían una muestra en lugar de todos los puntos.
+MAX_SCATTER_POINTS = 5000
+
+
+def histogram(values, bins=30):
+    """
+    Calcula en el servidor las barras de un histograma.
+
+    Args:
+        values (pd.Series): Valores numéricos (los NaN se ignoran).
+        bins (int): Número de intervalos de igual ancho.
+
+    Returns:
+        pd.DataFrame: Columnas "inicio", "fin" y "frecuencia", una fila por intervalo.
+    """
+    values = values.dropna().to_numpy(dtype="float64")
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({"inicio": edges[:-1], "fin": edges[1:], "frecuencia": counts})
+
+
+def top_counts(values, n=10):
+    """
+    Los `n` valores más frecuentes de una columna.
+
+    Returns:
+        pd.DataFrame: Columnas con el nombre de la serie y "cantidad", de mayor a menor.
+    """
+    counts = values.value_counts().head(n)
+    counts = counts[counts > 0]  # Las categorías sin filas no se muestran.
+    return pd.DataFrame({values.name: counts.index.astype(object), "cantidad": counts.to_numpy()})
+
+
+def box_stats(data, value, by):
+    """
+    Calcula en el servidor los cuartiles, bigotes y valores atípicos de un diagrama de caja por grupo.
+
+    Los bigotes llegan hasta el valor más extremo dentro de 1.5 veces el rango
+    intercuartílico, como en Plotly, Vega-Lite y seaborn.
+
+    Args:
+        data (pd.DataFrame): Datos con las columnas `value` y `by`.
+        value (str): Columna numérica.
+        by (str): Columna de grupos.
+
+    Returns:
+        tuple: (pd.DataFrame con una fila por grupo y las columnas "q1",
+        "mediana", "q3", "min_bigote", "max_bigote" y "n"; pd.DataFrame con los
+        valores atípicos, columnas `by` y `value`).
+    """
+    data = data[[by, value]].dropna()
+    grouped = data.groupby(by, observed=True)[value]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack().reindex(columns=[0.25, 0.5, 0.75])  # Sin grupos queda vacío.
+    stats.columns = ["q1", "mediana", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+    low = (stats["q1"] - 1.5 * iqr).reindex(data[by]).to_numpy()
+    high = (stats["q3"] + 1.5 * iqr).reindex(data[by]).to_numpy()
+    inside = (data[value].to_numpy() >= low) & (data[value].to_numpy() <= high)
+    whiskers = data[inside].groupby(by, observed=True)[value].agg(["min", "max"])
+    stats["min_bigote"] = whiskers["min"]
+    stats["max_bigote"] = whiskers["max"]
+    stats["n"] = grouped.size()
+    stats.index = stats.index.astype(object)
+    return stats.reset_index(), data[~inside]
+
+
+def sample_points(data, max_points=MAX_SCATTER_POINTS, seed=0):
+    """
+    Reduce los puntos de un gráfico de dispersión a una muestra aleatoria.
+
+    Si los datos tienen `max_points` filas o menos se devuelven completos. La
+    muestra usa una semilla fija para que el gráfico no cambie en cada recarga.
+
+    Args:
+        data (pd.DataFrame): Filas a graficar.
+        max_points (int): Número máximo de puntos enviados al navegador.
+        seed (int): Semilla de la muestra.
+
+    Returns:
+        tuple: (pd.DataFrame con las filas a graficar, bool que indica si se muestreó).
+    """
+    if len(data) <= max_points:
+        return data, False
+    return data.sample(n=max_points, random_state=seed).sort_index(), True
+
+
+class AggregateCube:
+    """
+    Cubo de agregados por marca × tipo × cubeta de precio.
+
+    Cada celda guarda el número de productos y, sobre los que tienen precio,
+    el número, la suma, la suma de cuadrados, el mínimo y el máximo del
+    precio. Conteos, promedios, sumas, desviaciones y extremos por marca o por
+    tipo se obtienen reduciendo solo las celdas que cumplen los filtros, por
+    lo que el costo depende del número de celdas y no del de filas.
+
+    Las cubetas tienen ancho `bucket_width` y además separan los precios que
+    caen exactamente en el borde inferior de la cubeta. Así, un rango
+    [mínimo, máximo] cuyos extremos son múltiplos del ancho (con el ancho 1
+    por defecto, cualquier rango del deslizador de enteros) se responde de
+    forma exacta, con la misma semántica que el filtro sobre las filas: los
+    productos sin precio quedan fuera cuando se filtra por precio.
+
+    Args:
+        data (pd.DataFrame): Datos tipados con las columnas "marca", "tipo" y "precio".
+        bucket_width (float): Ancho de las cubetas de precio.
+    """
+
+    def __init__(self, data, bucket_width=1):
+        self.bucket_width = bucket_width
+        self.labels = {}
+        codes = {}
+        for column in ["marca", "tipo"]:
+            codes[column], uniques = pd.factorize(data[column], use_na_sentinel=False)
+            self.labels[column] = pd.Index(uniques, dtype=object)
+        prices = data["precio"].to_numpy(dtype="float64", na_value=np.nan)
+        buckets = np.floor(prices / bucket_width)
+        cells = pd.DataFrame({
+            "marca": codes["marca"],
+            "tipo": codes["tipo"],
+            "cubeta": buckets,
+            "borde": prices == buckets * bucket_width,
+            "precio": prices,
+            "precio2": prices ** 2,
+        }).groupby(["marca", "tipo", "cubeta", "borde"], dropna=False)
+        self.cells = pd.concat([
+            cells.size().rename("cantidad"),
+            cells["precio"].agg(["count", "sum", "min", "max"]).rename(columns={
+                "count": "n_precio", "sum": "suma", "min": "minimo", "max": "maximo",
+            }),
+            cells["precio2"].sum().rename("suma_cuadrados"),
+        ], axis=1).reset_index()
+
+    def select(self, brands=None, types=None, price_range=None):
+        """
+        Celdas que cumplen los filtros de la barra lateral.
+
+        Args:
+            brands (iterable): Marcas seleccionadas; None para no filtrar.
+            types (iterable): Tipos seleccionados; None para no filtrar.
+            price_range (tuple): Precio mínimo y máximo (inclusive); None para no filtrar.
+
+        Returns:
+            np.ndarray: Máscara booleana sobre las celdas.
+        """
+        mask = np.ones(len(self.cells), dtype=bool)
+        for column, selected in [("marca", brands), ("tipo", types)]:
+            if selected is not None:
+                labels = self.labels[column]
+                selected = {None if pd.isna(value) else value for value in selected}
+                allowed = np.array([(None if pd.isna(value) else value) in selected for value in labels], dtype=bool)
+                mask &= allowed[self.cells[column].to_numpy()]
+        if price_range is not None:
+            low, high = price_range
+            start = self.cells["cubeta"].to_numpy() * self.bucket_width
+            mask &= (start >= low) & ((start < high) | ((start == high) & self.cells["borde"].to_numpy()))
+        return mask
+
+    def reduce(self, by, mask=None):
+        """
+        Agrega las celdas seleccionadas por "marca" o por "tipo".
+
+        Args:
+            by (str): "marca" o "tipo".
+            mask (np.ndarray): Celdas a incluir, normalmente de `select`; None para todas.
+
+        Returns:
+            pd.DataFrame: Una fila por valor con "cantidad", "n_precio", "suma",
+            "media", "desviacion", "minimo" y "maximo".
+        """
+        cells = self.cells if mask is None else self.cells[mask]
+        result = cells.groupby(by).agg(
+            cantidad=("cantidad", "sum"),
+            n_precio=("n_precio", "sum"),
+            suma=("suma", "sum"),
+            suma_cuadrados=("suma_cuadrados", "sum"),
+            minimo=("minimo", "min"),
+            maximo=("maximo", "max"),
+        )
+        n = result["n_precio"].where(result["n_precio"] > 0)
+        result["media"] = result["suma"] / n
+        variance = (result["suma_cuadrados"] - result["suma"] ** 2 / n) / (n - 1)
+        result["desviacion"] = np.sqrt(variance.clip(lower=0))
+        result.index = self.labels[by][result.index]
+        result.index.name = by
+        return result.drop(columns="suma_cuadrados")
+
+    def top(self, by, n=10, measure="cantidad", mask=None):
+        """
+        Los `n` valores de "marca" o "tipo" con mayor `measure` (todos si `n` es None).
+
+        Igual que `value_counts`, se omiten los valores nulos y los grupos sin productos.
+
+        Returns:
+            pd.Series: `measure` por valor, de mayor a menor.
+        """
+        result = self.reduce(by, mask)
+        result = result[result.index.notna() & (result["cantidad"] > 0)]
+        result = result[measure].dropna().sort_values(ascending=False, kind="stable")
+        return result if n is None else result.head(n)
@@ -1,15 +1,23 @@
 import streamlit as st
-import pandas as pd
+from dataset import SharedDataset, dataset_version, load_dataset
+from aggregates import AggregateCube
 import seaborn as sns
 import matplotlib.pyplot as plt
+from instrumentation import debug_enabled, render_debug_panel, stage, start_debug_profiler, start_recording
 
 # Cargar los datos
-@st.cache_data
-def load_data():
-    file_path = 'datos_limpios.csv'  # Cambia a la ruta correcta
-    return pd.read_csv(file_path, engine='python')
+@st.cache_resource  # Un único objeto compartido por todas las sesiones, sin copias por sesión
+def load_data(version):
+    return SharedDataset(load_dataset(), version)  # Arrow tipado con memory-map; si no existe, datos_limpios.csv
 
-data = load_data()
+recorder = start_recording()  # Tiempo, filas y memoria de cada etapa de esta ejecución
+profiler = start_debug_profiler()  # Perfilador por muestreo, solo con ?debug=1&perfil=1
+
+with stage("carga"):
+    shared = load_data(dataset_version())
+    data = shared.frame
+with stage("agregados.cubo", len(data)):
+    cube = shared.derived("cube", AggregateCube)  # Conteos y estadísticas por marca y tipo, sin recorrer las filas
 
 # Título de la aplicación
 st.title("Exploración de Datos de Productos")
@@ -20,30 +28,37 @@ st.write(data.head())
 
 # Gráfica de distribución de precios
 st.subheader("Distribución de Precios")
-fig, ax = plt.subplots()
-sns.histplot(data=data, x='precio', bins=30, kde=True, color='skyblue', ax=ax)
-ax.set_title('Distribución de Precios')
-ax.set_xlabel('Precio')
-ax.set_ylabel('Frecuencia')
-st.pyplot(fig)
+with stage("graficos.distribucion_precios", len(data)):
+    fig, ax = plt.subplots()
+    sns.histplot(data=data, x='precio', bins=30, kde=True, color='skyblue', ax=ax)
+    ax.set_title('Distribución de Precios')
+    ax.set_xlabel('Precio')
+    ax.set_ylabel('Frecuencia')
+    st.pyplot(fig)
 
 # Gráfica de marcas más populares
 st.subheader("Marcas Más Populares")
-top_brands = data['marca'].value_counts().head(10)
-fig, ax = plt.subplots()
-sns.barplot(x=top_brands.values, y=top_brands.index, palette='coolwarm', ax=ax)
-ax.set_title('Marcas Más Populares (Top 10)')
-ax.set_xlabel('Cantidad de Productos')
-ax.set_ylabel('Marca')
-st.pyplot(fig)
+with stage("graficos.marcas_populares"):
+    top_brands = cube.top('marca', 10)
+    fig, ax = plt.subplots()
+    sns.barplot(x=top_brands.values, y=top_brands.index, order=top_brands.index, palette='coolwarm', ax=ax)
+    ax.set_title('Marcas Más Populares (Top 10)')
+    ax.set_xlabel('Cantidad de Productos')
+    ax.set_ylabel('Marca')
+    st.pyplot(fig)
 
 # Comparación de precios por tipo de producto
 st.subheader("Comparación de Precios por Tipo de Producto")
-top_types = data['tipo'].value_counts().head(10).index
-filtered_data = data[data['tipo'].isin(top_types)]
-fig, ax = plt.subplots(figsize=(10, 6))
-sns.boxplot(data=filtered_data, x='precio', y='tipo', palette='Set2', ax=ax)
-ax.set_title('Comparación de Precios por Tipo de Producto')
-ax.set_xlabel('Precio')
-ax.set_ylabel('Tipo de Producto')
-st.pyplot(fig)
+with stage("graficos.precios_por_tipo"):
+    top_types = cube.top('tipo', 10).index
+    filtered_data = data[data['tipo'].isin(top_types)]
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.boxplot(data=filtered_data, x='precio', y='tipo', order=top_types, palette='Set2', ax=ax)
+    ax.set_title('Comparación de Precios por Tipo de Producto')
+    ax.set_xlabel('Precio')
+    ax.set_ylabel('Tipo de Producto')
+    st.pyplot(fig)
+
+# Panel de depuración con los tiempos de cada etapa (?debug=1 en la URL)
+if debug_enabled():
+    render_debug_panel(recorder, shared.memory_usage(), profiler)
@@ -1,44 +1,63 @@
 import streamlit as st
-import pandas as pd
+from backends import backend_kind, backend_version, open_backend
 import altair as alt
+from instrumentation import debug_enabled, render_debug_panel, stage, start_debug_profiler, start_recording
 
 # Cargar los datos
-@st.cache_data
-def load_data():
-    file_path = 'datos_limpios.csv'
-    return pd.read_csv(file_path)
+@st.cache_resource
+def load_data(kind, version):
+    return open_backend(kind, version)  # pandas en memoria, o DuckDB sobre Parquet con DASHBOARD_BACKEND=duckdb
 
-data = load_data()
+recorder = start_recording()  # Tiempo, filas y memoria de cada etapa de esta ejecución
+profiler = start_debug_profiler()  # Perfilador por muestreo, solo con ?debug=1&perfil=1
+
+with stage("carga"):
+    kind = backend_kind()
+    backend = load_data(kind, backend_version(kind))
+    n_rows = backend.count()
 
 st.title("Exploración de Datos Interactiva")
 
 # Gráfico interactivo de distribución de precios
+# Los intervalos se calculan en el servidor; al navegador solo se envían las barras.
 st.subheader("Distribución de Precios")
-hist_chart = alt.Chart(data).mark_bar().encode(
-    alt.X('precio:Q', bin=alt.Bin(maxbins=30), title='Precio'),
-    alt.Y('count()', title='Frecuencia')
-).properties(title="Distribución de Precios")
+with stage("graficos.distribucion_precios", n_rows):
+    hist_chart = alt.Chart(backend.histogram('precio', bins=30)).mark_bar().encode(
+        alt.X('inicio:Q', title='Precio'),
+        alt.X2('fin:Q'),
+        alt.Y('frecuencia:Q', title='Frecuencia'),
+        tooltip=['inicio', 'fin', 'frecuencia']
+    ).properties(title="Distribución de Precios")
 st.altair_chart(hist_chart, use_container_width=True)
 
 # Gráfico interactivo de marcas más populares
 st.subheader("Marcas Más Populares")
-top_brands = data['marca'].value_counts().head(10)
-top_brands_df = top_brands.reset_index()
-top_brands_df.columns = ['Marca', 'Cantidad']
-bar_chart = alt.Chart(top_brands_df).mark_bar().encode(
-    x=alt.X('Marca:N', sort='-y', title='Marca'),
-    y=alt.Y('Cantidad:Q', title='Cantidad de Productos'),
-    tooltip=['Marca', 'Cantidad']
-).properties(title="Marcas Más Populares")
+with stage("graficos.marcas_populares"):
+    top_brands_df = backend.top('marca', 10).reset_index()
+    top_brands_df.columns = ['Marca', 'Cantidad']
+    bar_chart = alt.Chart(top_brands_df).mark_bar().encode(
+        x=alt.X('Marca:N', sort='-y', title='Marca'),
+        y=alt.Y('Cantidad:Q', title='Cantidad de Productos'),
+        tooltip=['Marca', 'Cantidad']
+    ).properties(title="Marcas Más Populares")
 st.altair_chart(bar_chart, use_container_width=True)
 
 # Gráfico interactivo de precios por tipo de producto
 st.subheader("Precios por Tipo de Producto")
-top_types = data['tipo'].value_counts().head(10).index
-filtered_data = data[data['tipo'].isin(top_types)]
-box_chart = alt.Chart(filtered_data).mark_boxplot().encode(
-    x=alt.X('precio:Q', title='Precio'),
-    y=alt.Y('tipo:N', title='Tipo de Producto'),
-    tooltip=['precio', 'tipo']
-).properties(title="Precios por Tipo de Producto")
+with stage("graficos.precios_por_tipo"):
+    top_types = backend.top('tipo', 10).index
+    # Cuartiles, bigotes y valores atípicos calculados en el servidor.
+    stats, outliers = backend.box_stats('precio', 'tipo', groups=top_types)
+    outliers = outliers.astype({'tipo': object})
+    base = alt.Chart(stats).encode(y=alt.Y('tipo:N', title='Tipo de Producto'))
+    box_chart = alt.layer(
+        base.mark_rule().encode(x=alt.X('min_bigote:Q', title='Precio'), x2='max_bigote:Q'),
+        base.mark_bar(size=14).encode(x='q1:Q', x2='q3:Q', tooltip=['tipo', 'q1', 'mediana', 'q3', 'n']),
+        base.mark_tick(color='white', size=14).encode(x='mediana:Q'),
+        alt.Chart(outliers).mark_point().encode(x='precio:Q', y='tipo:N', tooltip=['precio', 'tipo']),
+    ).properties(title="Precios por Tipo de Producto")
 st.altair_chart(box_chart, use_container_width=True)
+
+# Panel de depuración con los tiempos de cada etapa (?debug=1 en la URL)
+if debug_enabled():
+    render_debug_panel(recorder, backend.memory_usage(), profiler)
@@ -1,28 +1,56 @@
+import os
 import streamlit as st
-import pandas as pd
-from bokeh.plotting import figure
+from backends import backend_kind, backend_version, open_backend
+from live import ranking_figure
 from bokeh.models import ColumnDataSource
-from bokeh.io import output_notebook
+from instrumentation import debug_enabled, render_debug_panel, stage, start_debug_profiler, start_recording
+
+try:
+    from streamlit_bokeh import streamlit_bokeh as bokeh_chart  # Las versiones recientes de Streamlit ya no incluyen st.bokeh_chart.
+except ImportError:
+    bokeh_chart = st.bokeh_chart
+if hasattr(st, "iframe"):
+    iframe = st.iframe
+else:
+    from streamlit.components.v1 import iframe
+
+# Servidor de Bokeh con los gráficos en vivo (`bokeh serve live_server.py`)
+LIVE_URL = os.environ.get("BOKEH_LIVE_URL", "http://localhost:5006/live_server")
 
 # Cargar los datos
-@st.cache_data
-def load_data():
-    file_path = 'datos_limpios.csv'
-    return pd.read_csv(file_path)
+@st.cache_resource
+def load_data(kind, version):
+    return open_backend(kind, version)  # pandas en memoria, o DuckDB sobre Parquet con DASHBOARD_BACKEND=duckdb
 
-data = load_data()
+recorder = start_recording()  # Tiempo, filas y memoria de cada etapa de esta ejecución
+profiler = start_debug_profiler()  # Perfilador por muestreo, solo con ?debug=1&perfil=1
+
+with stage("carga"):
+    kind = backend_kind()
+    backend = load_data(kind, backend_version(kind))
 
 st.title("Exploración de Datos Interactiva")
 
+# Modo en vivo: vigila datos_limpios.csv, el archivo del que carga los datos el backend pandas
+# (el Arrow solo se usa mientras coincide con él); el backend DuckDB lee una copia Parquet que no sigue.
+live_mode = st.sidebar.toggle("Actualización en vivo", value=False, disabled=kind != "pandas",
+                              help="Solo con el backend pandas: sigue los cambios de datos_limpios.csv.")
+interval = st.sidebar.number_input("Segundos entre revisiones", min_value=5, value=60, step=5, disabled=not live_mode)
+
 # Gráfico interactivo de marcas más populares
 st.subheader("Marcas Más Populares")
-top_brands = data['marca'].value_counts().head(10)
-source = ColumnDataSource(data=dict(marcas=top_brands.index, cantidad=top_brands.values))
+if live_mode:
+    # Los gráficos los sirve el servidor de Bokeh, que envía solo los cambios (patch/stream) al navegador;
+    # el iframe no cambia entre ejecuciones de la página, así que la vista del usuario se conserva.
+    iframe(f"{LIVE_URL}?intervalo={int(interval)}", height=720)
+else:
+    with stage("graficos.marcas_populares"):
+        top_brands = backend.top('marca', 10)
+        source = ColumnDataSource(data=dict(marcas=[str(brand) for brand in top_brands.index], cantidad=top_brands.tolist()))
+        p = ranking_figure(source, top_brands.index, "Marcas Más Populares")
 
-p = figure(x_range=top_brands.index.tolist(), title="Marcas Más Populares",
-           toolbar_location=None, tools="")
-p.vbar(x='marcas', top='cantidad', width=0.9, source=source)
-p.xgrid.grid_line_color = None
-p.y_range.start = 0
+    bokeh_chart(p, use_container_width=True)
 
-st.bokeh_chart(p, use_container_width=True)
+# Panel de depuración con los tiempos de cada etapa (?debug=1 en la URL)
+if debug_enabled():
+    render_debug_panel(recorder, backend.memory_usage(), profiler)
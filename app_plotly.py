@@ -1,23 +1,56 @@
+import math
 import streamlit as st
-import pandas as pd
+from backends import backend_kind, backend_version, open_backend
+from pagination import SORT_COLUMNS
+from aggregates import MAX_SCATTER_POINTS
 import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+from instrumentation import debug_enabled, render_debug_panel, stage, start_debug_profiler, start_recording
 
 # Cargar los datos
-@st.cache_data  # Utiliza la función de caché de Streamlit para almacenar los datos cargados y evitar recargas innecesarias.
-def load_data():
-    file_path = 'datos_limpios.csv'  # Especifica la ruta del archivo CSV con los datos.
-    return pd.read_csv(file_path)  # Lee los datos desde el archivo CSV y los devuelve como un DataFrame de pandas.
+@st.cache_resource  # Guarda un único backend de consultas compartido por todas las sesiones, sin copiarlo en cada una.
+def load_data(kind, version):
+    return open_backend(kind, version)  # pandas sobre el archivo Arrow con memory-map (por defecto), o DuckDB sobre Parquet con DASHBOARD_BACKEND=duckdb.
 
-data = load_data()  # Carga los datos llamando a la función `load_data`.
+# Índice de productos similares
+@st.cache_resource(show_spinner="Preparando el índice de productos similares...")  # Uno por versión de los datos, compartido por las sesiones.
+def similarity_index(kind, version):
+    from similar import load_or_build  # Se importa solo cuando se abre la sección.
+
+    # Se abre desde el disco con memory-map; solo se construye (y se guarda) si cambió el archivo de datos.
+    return load_or_build((kind, version), lambda: backend.batches(["descripcion", "tipo", "precio"]))
+
+def box_figure(stats, outliers, value, by, horizontal=False, title=None):
+    """
+    Crea un diagrama de caja de Plotly a partir de estadísticas calculadas en el servidor.
+    Solo se envían al navegador los cuartiles, los bigotes y los valores atípicos.
+    """
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, row in enumerate(stats.itertuples(index=False)):
+        group = getattr(row, by)
+        stat = dict(q1=[row.q1], median=[row.mediana], q3=[row.q3], lowerfence=[row.min_bigote], upperfence=[row.max_bigote])
+        position = {"y": [group]} if horizontal else {"x": [group]}
+        fig.add_trace(go.Box(name=str(group), marker_color=colors[i % len(colors)], orientation="h" if horizontal else "v", **stat, **position))
+    points = {"x": outliers[value], "y": outliers[by].astype(str)} if horizontal else {"x": outliers[by].astype(str), "y": outliers[value]}
+    fig.add_trace(go.Scatter(mode="markers", name="Valores atípicos", marker_color="gray", **points))
+    fig.update_layout(title=title, xaxis_title=value if horizontal else by, yaxis_title=by if horizontal else value)
+    return fig
+
+recorder = start_recording()  # Tiempo, filas y memoria de cada etapa de esta ejecución.
+profiler = start_debug_profiler()  # Perfilador por muestreo, solo con ?debug=1&perfil=1.
+
+with stage("carga"):
+    kind = backend_kind()
+    backend = load_data(kind, backend_version(kind))  # Se recarga solo cuando cambia el archivo de datos.
+    n_rows = backend.count()
 
 # Título de la aplicación
 st.title("Exploración de Datos Interactiva con Filtros Avanzados")  # Define el título principal de la aplicación.
 
 # Vista previa de los datos
 st.subheader("Vista Previa de los Datos")  # Añade un subtítulo para la sección de vista previa.
-st.dataframe(data.head())  # Muestra las primeras filas del DataFrame cargado en un formato interactivo.
+st.dataframe(backend.page(1, 5))  # Muestra las primeras filas de los datos en un formato interactivo.
 
 # Filtros interactivos
 st.sidebar.header("Filtros")  # Crea un encabezado en la barra lateral para los filtros.
@@ -25,202 +58,356 @@ st.sidebar.header("Filtros")  # Crea un encabezado en la barra lateral para los
 # Filtro: Seleccionar marcas
 selected_brands = st.sidebar.multiselect(  # Widget para seleccionar múltiples marcas.
     "Selecciona Marcas",  # Texto visible en el widget.
-    options=data["marca"].unique(),  # Opciones: lista única de marcas disponibles en los datos.
-    default=data["marca"].unique()  # Valor por defecto: todas las marcas.
+    options=backend.options("marca"),  # Opciones: lista única de marcas disponibles en los datos.
+    default=backend.options("marca")  # Valor por defecto: todas las marcas.
 )
 
 # Filtro: Seleccionar tipos de productos
 selected_types = st.sidebar.multiselect(  # Widget para seleccionar múltiples tipos de productos.
     "Selecciona Tipos de Productos",  # Texto visible en el widget.
-    options=data["tipo"].unique(),  # Opciones: lista única de tipos disponibles en los datos.
-    default=data["tipo"].unique()  # Valor por defecto: todos los tipos.
+    options=backend.options("tipo"),  # Opciones: lista única de tipos disponibles en los datos.
+    default=backend.options("tipo")  # Valor por defecto: todos los tipos.
 )
 
 # Filtro: Rango de precios
+min_price, max_price = backend.price_bounds()
 price_range = st.sidebar.slider(  # Widget deslizante para seleccionar un rango de precios.
     "Rango de Precios",  # Texto visible en el widget.
-    min_value=int(data["precio"].min()),  # Precio mínimo en los datos.
-    max_value=int(data["precio"].max()),  # Precio máximo en los datos.
-    value=(int(data["precio"].min()), int(data["precio"].max()))  # Valor inicial: todo el rango.
+    min_value=int(min_price),  # Precio mínimo en los datos.
+    max_value=int(max_price),  # Precio máximo en los datos.
+    value=(int(min_price), int(max_price))  # Valor inicial: todo el rango.
 )
 
 # Filtro: Buscar por palabra clave
 keyword = st.sidebar.text_input(  # Widget para ingresar texto.
     "Busca por palabra clave en las descripciones",  # Texto visible en el widget.
-    value=""  # Valor inicial: campo vacío.
+    value="",  # Valor inicial: campo vacío.
+    help=(  # Búsqueda por palabras completas (índice de tokens), no por texto contenido.
+        "Muestra los productos cuya descripción contiene todas las palabras escritas, sin distinguir mayúsculas. "
+        "La última palabra puede ser el comienzo de una palabra (\"sam\" encuentra \"Samsung\"); las demás deben "
+        "coincidir completas. No busca dentro de las palabras: \"tv\" no encuentra \"HDTV\"."
+    )
+)
+
+# Máximo de puntos enviados al navegador en los gráficos de dispersión
+max_points = st.sidebar.number_input(  # Por encima de este número se grafica una muestra aleatoria.
+    "Máximo de puntos en gráficos de dispersión",
+    min_value=100,
+    value=MAX_SCATTER_POINTS,
+    step=1000
 )
 
-# Aplicar los filtros al dataset
-filtered_data = data[  # Filtra los datos según las condiciones de los widgets anteriores.
-    (data["marca"].isin(selected_brands)) &  # Filtra las marcas seleccionadas.
-    (data["tipo"].isin(selected_types)) &  # Filtra los tipos seleccionados.
-    (data["precio"] >= price_range[0]) &  # Filtra precios mayores o iguales al mínimo del rango.
-    (data["precio"] <= price_range[1])  # Filtra precios menores o iguales al máximo del rango.
-]
+# Memoria de los datos compartidos por todas las sesiones de este proceso
+with st.sidebar.expander("Memoria"):
+    st.json(backend.memory_usage())  # Bytes de los datos base, de los derivados y pico del proceso (o memoria de DuckDB).
 
-# Filtrar por palabra clave si se ingresó una
-if keyword:  # Solo aplica el filtro si se ingresó un texto.
-    filtered_data = filtered_data[filtered_data["descripcion"].str.contains(keyword, case=False, na=False)]  
-    # Busca la palabra clave en la columna "descripcion" (ignora mayúsculas/minúsculas y NaN).
+# Filtros de la barra lateral; el backend los aplica en cada consulta (índices en memoria o SQL sobre Parquet).
+# La palabra clave busca todas las palabras en las descripciones (la última como prefijo, sin distinguir mayúsculas).
+filters = dict(brands=selected_brands, types=selected_types, price_range=price_range, keyword=keyword)
+with stage("filtros", n_rows):
+    n_filtered = backend.count(**filters)  # Número de filas que cumplen todos los filtros.
 
 # Mostrar los datos filtrados
 st.subheader("Datos Filtrados")  # Subtítulo para los datos filtrados.
-st.write(f"Total de registros filtrados: {len(filtered_data)}")  # Muestra la cantidad de registros que cumplen con los filtros.
-st.dataframe(filtered_data)  # Muestra los datos filtrados en formato interactivo.
+st.write(f"Total de registros filtrados: {n_filtered}")  # Muestra la cantidad de registros que cumplen con los filtros.
 
+# Tabla paginada: solo se envía al navegador la página visible
+with stage("tabla", n_filtered):
+    sort_col, direction_col, size_col, page_col = st.columns(4)
+    sort_by = sort_col.selectbox("Ordenar por", ["Sin ordenar"] + SORT_COLUMNS)
+    descending = direction_col.checkbox("Descendente")
+    page_size = size_col.selectbox("Filas por página", [25, 50, 100, 500], index=1)
+    n_pages = max(1, -(-n_filtered // page_size))
+    page = page_col.number_input("Página", min_value=1, max_value=n_pages, value=1, step=1)
+    page_data = backend.page(page, page_size, None if sort_by == "Sin ordenar" else sort_by,  # Recorta solo las descripciones de la página.
+                             ascending=not descending, **filters)
+    st.dataframe(page_data)  # Muestra la página de datos filtrados en formato interactivo.
+st.caption(f"Página {page} de {n_pages}")
 
-# 1. Distribución de precios
-st.subheader("Distribución de Precios")
-data["precio"] = pd.to_numeric(data["precio"], errors='coerce')
-precios = data["precio"].dropna()
-fig1 = px.histogram(precios, nbins=15, title="Distribución de Precios", labels={'value': 'Precio', 'count': 'Frecuencia'})
-st.plotly_chart(fig1)
-st.write("""
-- **Descripción**: Este histograma muestra cómo se distribuyen los precios en el dataset.
-- **Objetivo**: Identificar rangos de precios más comunes y detectar posibles valores atípicos.
-- **Uso**: Analizar tendencias de precios y ajustar estrategias de precios o inventario.
-""")
 
-# 2. Productos por marca
-st.subheader("Productos por Marca")
-fig2 = px.bar(data['marca'].value_counts().reset_index(), x='index', y='marca',
-              title="Productos por Marca", labels={'index': 'Marca', 'marca': 'Cantidad de Productos'},
-              color_discrete_sequence=px.colors.qualitative.Dark2 )
-st.plotly_chart(fig2)
-st.write("""
-- **Descripción**: Visualiza la cantidad de productos ofrecidos por cada marca.
-- **Objetivo**: Identificar qué marcas tienen mayor representación en el inventario.
-- **Uso**: Ayuda a decidir qué marcas priorizar en términos de marketing o adquisiciones.
-""")
+# Secciones del tablero: solo se calcula y dibuja la sección elegida.
+# Las figuras se guardan en caché por versión de los datos y estado de los filtros.
+filter_state = (  # Clave de caché de las figuras que dependen de los filtros.
+    tuple(sorted(map(str, selected_brands))),
+    tuple(sorted(map(str, selected_types))),
+    tuple(price_range),
+    keyword,
+)
+section = st.radio(  # A diferencia de st.tabs, las secciones no elegidas no se ejecutan.
+    "Sección",
+    ["Precios", "Marcas", "Tipos de Producto", "Descripciones", "Potencia y Capacidad", "Productos Similares"],
+    horizontal=True
+)
 
-# 3. Nube de palabras en descripciones
-st.subheader("Nube de Palabras en Descripciones")
-text = ' '.join(data['descripcion'].dropna())
-wordcloud = WordCloud(width=800, height=400, background_color='white', colormap='viridis').generate(text)
-plt.figure(figsize=(10, 6))
-plt.imshow(wordcloud, interpolation='bilinear')
-plt.axis('off')
-plt.title('Nube de Palabras en Descripciones')
-st.pyplot(plt)
-st.write("""
-- **Descripción**: Identifica las palabras más frecuentes en las descripciones de los productos.
-- **Objetivo**: Detectar patrones en las características y descripciones comunes.
-- **Uso**: Utilizar las palabras clave para optimizar la estrategia de SEO y campañas publicitarias.
-""")
 
-# 4. Comparativa por tipo de producto - Gráfico circular
-st.subheader("Proporción por Tipo de Producto")
-top_types = data['tipo'].value_counts().head(10)
-fig4 = px.pie(top_types, values=top_types.values, names=top_types.index, title="Proporción por Tipo de Producto")
-st.plotly_chart(fig4)
-st.write("""
-- **Descripción**: Este gráfico circular muestra la proporción de los tipos de productos más comunes.
-- **Objetivo**: Visualizar cómo se distribuyen los productos entre las principales categorías.
-- **Uso**: Ayuda a comprender las preferencias de los clientes y ajustar el enfoque de inventario.
+@st.cache_data(max_entries=32, show_spinner=False)
+def price_figures(version, filter_state, _top_types):
+    bins = backend.histogram("precio", bins=15)  # Intervalos calculados en el servidor.
+    fig1 = px.bar(bins, x=(bins['inicio'] + bins['fin']) / 2, y='frecuencia', title="Distribución de Precios", labels={'x': 'Precio', 'frecuencia': 'Frecuencia'})
+    fig1.update_traces(width=bins['fin'] - bins['inicio'])
+
+    price_stats, price_outliers = backend.box_stats('precio', 'tipo')
+    fig5 = box_figure(price_stats, price_outliers, 'precio', 'tipo', title="Distribución de Precios por Tipo de Producto")
+
+    top_stats, top_outliers = backend.box_stats('precio', 'tipo', groups=_top_types.index, **filters)  # Solo se envían cuartiles, bigotes y valores atípicos.
+    fig11 = box_figure(top_stats, top_outliers, 'precio', 'tipo', horizontal=True,
+                       title="Comparación de Precios por Tipo de Producto (Top 10)")
+    return fig1, fig5, fig11
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def brand_figures(version, filter_state):
+    brand_counts = backend.top('marca', n=None, **filters)
+    fig2 = px.bar(brand_counts.reset_index(), x='marca', y='cantidad',
+                  title="Productos por Marca", labels={'marca': 'Marca', 'cantidad': 'Cantidad de Productos'},
+                  color_discrete_sequence=px.colors.qualitative.Dark2 )
+
+    top_brands = backend.top('marca', 10, **filters)  # Obtiene las 10 marcas más populares.
+    fig8 = px.bar(
+        top_brands.reset_index(),  # Convierte los datos en un DataFrame adecuado para Plotly.
+        x='marca',  # Define el eje X como los nombres de las marcas.
+        y='cantidad',  # Define el eje Y como la cantidad de productos.
+        title="Marcas Más Populares (Top 10)",  # Título del gráfico.
+        labels={'marca': 'Marca', 'cantidad': 'Cantidad de Productos'},  # Etiquetas de los ejes.
+        text=top_brands.values,  # Añade texto con los valores en las barras.
+        color_discrete_sequence=px.colors.qualitative.Alphabet  # Paleta de colores personalizada.
+    )
+    fig8.update_traces(textposition='outside')  # Coloca el texto fuera de las barras.
+
+    avg_price = backend.top('marca', 10, measure='media', **filters)
+    fig9 = px.bar(avg_price.reset_index(), x='marca', y='media', title="Precios Promedio por Marca (Top 10)",
+                  labels={'marca': 'Marca', 'media': 'Precio Promedio'},
+                  color_discrete_sequence=px.colors.qualitative.Vivid )
+
+    top_brands_prices = backend.top('marca', 10, measure='suma', **filters)
+    fig12 = px.pie(
+        top_brands_prices,  # Datos
+        values=top_brands_prices.values,  # Sumas de precios
+        names=top_brands_prices.index,  # Nombres de las marcas
+        title="Proporción de Precios por Marca (Top 10)",  # Título del gráfico
+        color_discrete_sequence=px.colors.qualitative.Light24  # Paleta de colores personalizada
+    )
+    return fig2, fig8, fig9, fig12
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def type_figures(version, filter_state, _top_types):
+    fig4 = px.pie(_top_types, values=_top_types.values, names=_top_types.index, title="Proporción por Tipo de Producto")
+    fig10 = px.bar(_top_types.reset_index(), x='tipo', y='cantidad', title="Productos por Tipo (Top 10)",
+                   labels={'tipo': 'Tipo de Producto', 'cantidad': 'Cantidad'},
+                  color_discrete_sequence=px.colors.qualitative.Pastel1 )
+    return fig4, fig10
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def word_cloud_image(version, filter_state):
+    from wordcloud import WordCloud  # Se importa solo cuando se abre la sección.
+
+    frequencies = backend.word_frequencies(**filters)  # Palabras de las filas filtradas, contadas por el backend.
+    if not frequencies:
+        return None
+    wordcloud = WordCloud(width=800, height=400, background_color='white', colormap='viridis').generate_from_frequencies(frequencies)
+    return wordcloud.to_array()  # Imagen RGB; se guarda en caché en lugar de la figura.
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def attribute_figures(version, max_points):
+    watts_points, watts_sampled = backend.sample(['watts'], max_points)
+    fig6 = px.scatter(watts_points, x='watts', y='precio', color='marca', title="Relación entre Precio y Potencia (Watts)")
+    gb_points, gb_sampled = backend.sample(['GB'], max_points)
+    fig7 = px.scatter(gb_points, x='GB', y='precio', color='marca', title="Relación entre Precio y Capacidad (GB)")
+    return (fig6, len(watts_points) if watts_sampled else None), (fig7, len(gb_points) if gb_sampled else None)
+
+
+with stage("agregados"):
+    top_types = backend.top('tipo', 10, **filters)  # Tipos más comunes con los filtros actuales.
+
+if section == "Precios":
+    with stage("graficos.precios"):
+        fig1, fig5, fig11 = price_figures(backend.version, filter_state, top_types)
+
+    # 1. Distribución de precios
+    st.subheader("Distribución de Precios")
+    st.plotly_chart(fig1)
+    st.write("""
+- **Descripción**: Este histograma muestra cómo se distribuyen los precios en el dataset.
+- **Objetivo**: Identificar rangos de precios más comunes y detectar posibles valores atípicos.
+- **Uso**: Analizar tendencias de precios y ajustar estrategias de precios o inventario.
 """)
 
-# 5. Comparativa de precios por tipo de producto - Boxplot
-st.subheader("Distribución de Precios por Tipo de Producto")
-fig5 = px.box(data, x='tipo', y='precio', color='tipo', title="Distribución de Precios por Tipo de Producto")
-st.plotly_chart(fig5)
-st.write("""
+    # 5. Comparativa de precios por tipo de producto - Boxplot
+    st.subheader("Distribución de Precios por Tipo de Producto")
+    st.plotly_chart(fig5)
+    st.write("""
 - **Descripción**: Compara la variación de precios dentro de cada tipo de producto.
 - **Objetivo**: Detectar rangos de precios comunes y categorías con mayor dispersión de precios.
 - **Uso**: Identificar oportunidades para ajustar precios según el tipo de producto.
 """)
 
-# 6. Relación entre precio y watts
-st.subheader("Relación entre Precio y Potencia (Watts)")
-data["watts"] = pd.to_numeric(data["watts"], errors='coerce')
-fig6 = px.scatter(data.dropna(subset=['watts']), x='watts', y='precio', color='marca', title="Relación entre Precio y Potencia (Watts)")
-st.plotly_chart(fig6)
-st.write("""
-- **Descripción**: Muestra cómo se relacionan la potencia (en watts) y el precio de los productos.
-- **Objetivo**: Identificar si hay correlaciones significativas entre estas dos variables.
-- **Uso**: Ayuda a analizar el impacto de la potencia en el costo de los productos.
+    # 11. Comparación de Precios entre Tipos de Productos
+    st.subheader("Comparación de Precios entre Tipos de Productos (Top 10)")
+    st.plotly_chart(fig11)
+    st.write("""
+- **Descripción**: Compara la variación de precios en los 10 tipos de productos principales.
+- **Objetivo**: Evaluar la dispersión de precios dentro de cada categoría.
+- **Uso**: Ayuda a identificar oportunidades para ajustar precios o detectar categorías exclusivas.
 """)
 
-# 7. Relación entre precio y capacidad (GB)
-st.subheader("Relación entre Precio y Capacidad (GB)")
-data["GB"] = pd.to_numeric(data["GB"], errors='coerce')
-fig7 = px.scatter(data.dropna(subset=['GB']), x='GB', y='precio', color='marca', title="Relación entre Precio y Capacidad (GB)")
-st.plotly_chart(fig7)
-st.write("""
-- **Descripción**: Explora la relación entre la capacidad de almacenamiento (GB) y el precio.
-- **Objetivo**: Determinar cómo la capacidad afecta el costo de los productos.
-- **Uso**: Útil para evaluar tendencias en dispositivos con diferentes capacidades.
+elif section == "Marcas":
+    with stage("graficos.marcas"):
+        fig2, fig8, fig9, fig12 = brand_figures(backend.version, filter_state)
+
+    # 2. Productos por marca
+    st.subheader("Productos por Marca")
+    st.plotly_chart(fig2)
+    st.write("""
+- **Descripción**: Visualiza la cantidad de productos ofrecidos por cada marca.
+- **Objetivo**: Identificar qué marcas tienen mayor representación en el inventario.
+- **Uso**: Ayuda a decidir qué marcas priorizar en términos de marketing o adquisiciones.
 """)
 
-# 8. Marcas Más Populares
-st.subheader("Marcas Más Populares (Top 10)")
-top_brands = data['marca'].value_counts().head(10)  # Obtiene las 10 marcas más populares.
-fig8 = px.bar(
-    top_brands.reset_index(),  # Convierte los datos en un DataFrame adecuado para Plotly.
-    x='index',  # Define el eje X como los nombres de las marcas.
-    y='marca',  # Define el eje Y como la cantidad de productos.
-    title="Marcas Más Populares (Top 10)",  # Título del gráfico.
-    labels={'index': 'Marca', 'marca': 'Cantidad de Productos'},  # Etiquetas de los ejes.
-    text=top_brands.values,  # Añade texto con los valores en las barras.
-    color_discrete_sequence=px.colors.qualitative.Alphabet  # Paleta de colores personalizada.
-)
-fig8.update_traces(textposition='outside')  # Coloca el texto fuera de las barras.
-st.plotly_chart(fig8)  # Muestra el gráfico en Streamlit.
-st.write("""
+    # 8. Marcas Más Populares
+    st.subheader("Marcas Más Populares (Top 10)")
+    st.plotly_chart(fig8)  # Muestra el gráfico en Streamlit.
+    st.write("""
 - **Descripción**: Presenta las 10 marcas con mayor número de productos en el inventario.
 - **Objetivo**: Identificar marcas líderes y su representación en los datos.
 - **Uso**: Ayuda a planificar promociones o evaluar relaciones con proveedores.
 """)
 
-# 9. Precios Promedio por Marca
-st.subheader("Precios Promedio por Marca (Top 10)")
-avg_price = data.groupby('marca')['precio'].mean().sort_values(ascending=False).head(10)
-fig9 = px.bar(avg_price.reset_index(), x='marca', y='precio', title="Precios Promedio por Marca (Top 10)",
-              labels={'marca': 'Marca', 'precio': 'Precio Promedio'},
-              color_discrete_sequence=px.colors.qualitative.Vivid )
-st.plotly_chart(fig9)
-st.write("""
+    # 9. Precios Promedio por Marca
+    st.subheader("Precios Promedio por Marca (Top 10)")
+    st.plotly_chart(fig9)
+    st.write("""
 - **Descripción**: Muestra las marcas con los precios promedio más altos.
 - **Objetivo**: Identificar marcas premium con productos de mayor valor.
 - **Uso**: Útil para diferenciar productos según su posicionamiento de precio.
 """)
 
-# 10. Productos por Tipo
-st.subheader("Productos por Tipo (Top 10)")
-fig10 = px.bar(top_types.reset_index(), x='index', y='tipo', title="Productos por Tipo (Top 10)",
-               labels={'index': 'Tipo de Producto', 'tipo': 'Cantidad'},
-              color_discrete_sequence=px.colors.qualitative.Pastel1 )
-st.plotly_chart(fig10)
-st.write("""
+    # 12. Gráfico circular de las marcas Top 10 por suma de precios
+    st.subheader("Proporción de Precios por Marca (Top 10)")
+    st.plotly_chart(fig12)
+    st.write("""
+- **Descripción**: Este gráfico circular muestra la proporción del precio total de los productos para las 10 marcas principales.
+- **Objetivo**: Identificar qué marcas contribuyen más al total de ingresos estimados por precio.
+- **Uso**: Ayuda a priorizar esfuerzos en marcas que generan un mayor valor económico.
+""")
+
+elif section == "Tipos de Producto":
+    with stage("graficos.tipos"):
+        fig4, fig10 = type_figures(backend.version, filter_state, top_types)
+
+    # 4. Comparativa por tipo de producto - Gráfico circular
+    st.subheader("Proporción por Tipo de Producto")
+    st.plotly_chart(fig4)
+    st.write("""
+- **Descripción**: Este gráfico circular muestra la proporción de los tipos de productos más comunes.
+- **Objetivo**: Visualizar cómo se distribuyen los productos entre las principales categorías.
+- **Uso**: Ayuda a comprender las preferencias de los clientes y ajustar el enfoque de inventario.
+""")
+
+    # 10. Productos por Tipo
+    st.subheader("Productos por Tipo (Top 10)")
+    st.plotly_chart(fig10)
+    st.write("""
 - **Descripción**: Visualiza las 10 categorías de productos más comunes.
 - **Objetivo**: Comprender la composición del inventario.
 - **Uso**: Ayuda a priorizar esfuerzos en categorías más representativas.
 """)
 
-# 11. Comparación de Precios entre Tipos de Productos
-st.subheader("Comparación de Precios entre Tipos de Productos (Top 10)")
-filtered_data = data[data['tipo'].isin(top_types.index)]
-fig11 = px.box(filtered_data, x='precio', y='tipo', title="Comparación de Precios por Tipo de Producto (Top 10)",
-               color='tipo', points="all")
-st.plotly_chart(fig11)
-st.write("""
-- **Descripción**: Compara la variación de precios en los 10 tipos de productos principales.
-- **Objetivo**: Evaluar la dispersión de precios dentro de cada categoría.
-- **Uso**: Ayuda a identificar oportunidades para ajustar precios o detectar categorías exclusivas.
+elif section == "Descripciones":
+    # 3. Nube de palabras en descripciones
+    st.subheader("Nube de Palabras en Descripciones")
+    with stage("graficos.nube_de_palabras"):
+        image = word_cloud_image(backend.version, filter_state)
+    if image is not None:
+        import matplotlib.pyplot as plt  # Se importa solo cuando se abre la sección.
+
+        fig3, ax = plt.subplots(figsize=(10, 6))
+        ax.imshow(image, interpolation='bilinear')
+        ax.axis('off')
+        ax.set_title('Nube de Palabras en Descripciones')
+        st.pyplot(fig3)
+        plt.close(fig3)
+    else:
+        st.info("No hay palabras para los filtros seleccionados.")
+    st.write("""
+- **Descripción**: Identifica las palabras más frecuentes en las descripciones de los productos filtrados.
+- **Objetivo**: Detectar patrones en las características y descripciones comunes.
+- **Uso**: Utilizar las palabras clave para optimizar la estrategia de SEO y campañas publicitarias.
 """)
 
-# 12. Gráfico circular de las marcas Top 10 por suma de precios
-st.subheader("Proporción de Precios por Marca (Top 10)")
-top_brands_prices = data.groupby('marca')['precio'].sum().sort_values(ascending=False).head(10)
-fig12 = px.pie(
-    top_brands_prices,  # Datos
-    values=top_brands_prices.values,  # Sumas de precios
-    names=top_brands_prices.index,  # Nombres de las marcas
-    title="Proporción de Precios por Marca (Top 10)",  # Título del gráfico
-    color_discrete_sequence=px.colors.qualitative.Light24  # Paleta de colores personalizada
-)
-st.plotly_chart(fig12)
-st.write("""
-- **Descripción**: Este gráfico circular muestra la proporción del precio total de los productos para las 10 marcas principales.
-- **Objetivo**: Identificar qué marcas contribuyen más al total de ingresos estimados por precio.
-- **Uso**: Ayuda a priorizar esfuerzos en marcas que generan un mayor valor económico.
-""")
\ No newline at end of file
+elif section == "Potencia y Capacidad":
+    with stage("graficos.potencia_capacidad"):
+        (fig6, watts_sample), (fig7, gb_sample) = attribute_figures(backend.version, max_points)
+
+    # 6. Relación entre precio y watts
+    st.subheader("Relación entre Precio y Potencia (Watts)")
+    st.plotly_chart(fig6)
+    if watts_sample:
+        st.caption(f"Se muestra una muestra aleatoria de {watts_sample} productos.")
+    st.write("""
+- **Descripción**: Muestra cómo se relacionan la potencia (en watts) y el precio de los productos.
+- **Objetivo**: Identificar si hay correlaciones significativas entre estas dos variables.
+- **Uso**: Ayuda a analizar el impacto de la potencia en el costo de los productos.
+""")
+
+    # 7. Relación entre precio y capacidad (GB)
+    st.subheader("Relación entre Precio y Capacidad (GB)")
+    st.plotly_chart(fig7)
+    if gb_sample:
+        st.caption(f"Se muestra una muestra aleatoria de {gb_sample} productos.")
+    st.write("""
+- **Descripción**: Explora la relación entre la capacidad de almacenamiento (GB) y el precio.
+- **Objetivo**: Determinar cómo la capacidad afecta el costo de los productos.
+- **Uso**: Útil para evaluar tendencias en dispositivos con diferentes capacidades.
+""")
+
+elif section == "Productos Similares":
+    # 13. Búsqueda de productos similares por descripción
+    st.subheader("Productos Similares")
+    with stage("similares.indice", n_rows):
+        index = similarity_index(kind, backend.version)
+    mode = st.radio("Buscar a partir de", ["Texto libre", "Producto del catálogo"], horizontal=True)
+    n_similar = st.slider("Número de resultados", min_value=1, max_value=50, value=10)
+    if mode == "Texto libre":
+        query = st.text_input("Descripción a buscar", value="")
+        query_type = st.selectbox("Tipo de producto", ["Todos"] + [value for value in backend.options("tipo") if value is not None])
+        use_price_range = st.checkbox("Solo productos en el rango de precios de la barra lateral")
+        restrictions = dict(types=None if query_type == "Todos" else [query_type],
+                            price_range=price_range if use_price_range else None)
+    elif n_rows == 0:
+        st.info("El catálogo no tiene productos para consultar.")
+        query = ""
+    else:
+        row = st.number_input("Fila del producto", min_value=0, max_value=n_rows - 1, value=0, step=1)
+        product = backend.take([row])
+        st.dataframe(product)  # Producto consultado.
+        query = product["descripcion"].iloc[0]
+        same_type = st.checkbox("Solo productos del mismo tipo", value=True)
+        band = st.selectbox("Banda de precio", ["Sin restricción", "±10%", "±25%", "±50%"])
+        price = product["precio"].iloc[0]
+        product_type = index.row_type(row)
+        restrictions = dict(types=[product_type] if same_type and product_type is not None else None, price_range=None,
+                            exclude=row)  # El producto consultado no se muestra como resultado.
+        if band != "Sin restricción" and not math.isnan(price):
+            ratio = int(band.strip("±%")) / 100
+            restrictions["price_range"] = (price * (1 - ratio), price * (1 + ratio))
+    if query:
+        with stage("similares.consulta", n_rows):
+            rows, scores = index.query(query, n_similar, **restrictions)  # Solo recorre las listas de los n-gramas de la consulta.
+            results = backend.take(rows)
+            results.insert(0, "similitud", scores.round(3))
+        if len(results):
+            st.dataframe(results)
+        else:
+            st.info("No hay productos similares con estas restricciones.")
+    st.write("""
+- **Descripción**: Busca los productos cuyas descripciones se parecen más a un texto o a un producto del catálogo.
+- **Objetivo**: Encontrar variantes, reemplazos y productos comparables de un artículo.
+- **Uso**: Útil para recomendar alternativas o revisar precios de productos equivalentes.
+""")
+
+# Panel de depuración con los tiempos de cada etapa (?debug=1 en la URL)
+if debug_enabled():
+    render_debug_panel(recorder, profiler=profiler)
@@ -0,0 +1,479 @@
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from aggregates import MAX_SCATTER_POINTS, AggregateCube, box_stats, histogram, sample_points
+from dataset import PARQUET_PATH, SharedDataset, dataset_version, load_dataset
+from filters import FilterEngine
+from pagination import SortOrders, truncate_text
+from search import KeywordIndex, TokenCounts, standard_forms, tokenize
+
+
+# Backends disponibles; se elige con la variable de entorno DASHBOARD_BACKEND.
+BACKENDS = ["pandas", "duckdb"]
+DEFAULT_BACKEND = "pandas"
+
+# Columnas de los datos limpios que se pueden usar en consultas (nombres fijos, nunca del usuario).
+_COLUMNS = {"marca", "sku", "tipo", "precio", "watts", "GB", "descripcion"}
+_MEASURES = {"cantidad", "n_precio", "suma", "media", "desviacion", "minimo", "maximo"}
+
+# `\w[\w']*` y `\d+` de Python en la sintaxis de RE2, donde `\w` y `\d` solo cubren ASCII.
+_WORD_PATTERN = r"[\p{L}\p{N}_][\p{L}\p{N}_']*"
+_DIGITS_PATTERN = r"\p{Nd}+"
+
+
+def backend_kind():
+    """
+    Backend de consultas configurado: "pandas" (por defecto) o "duckdb".
+    """
+    kind = os.environ.get("DASHBOARD_BACKEND", DEFAULT_BACKEND)
+    if kind not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {kind!r} (opciones: {', '.join(BACKENDS)})")
+    return kind
+
+
+def backend_version(kind):
+    """
+    Versión de los datos que usaría el backend, para usar como clave de caché.
+    """
+    if kind == "duckdb":
+        path = os.environ.get("DASHBOARD_PARQUET", PARQUET_PATH)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No existe {path}; genérelo con `python pipeline.py --parquet`.")
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+    return dataset_version()
+
+
+def open_backend(kind, version=None):
+    """
+    Crea el backend de consultas de los tableros.
+
+    Args:
+        kind (str): "pandas" o "duckdb".
+        version (tuple): Versión de los datos, normalmente de `backend_version`.
+
+    Returns:
+        PandasBackend | DuckDBBackend: Backend listo para consultar.
+    """
+    if kind == "duckdb":
+        return DuckDBBackend(os.environ.get("DASHBOARD_PARQUET", PARQUET_PATH), version)
+    return PandasBackend(SharedDataset(load_dataset(), version))
+
+
+class PandasBackend:
+    """
+    Backend en memoria: los datos completos en un `SharedDataset`.
+
+    Los filtros y agregados usan los índices construidos una vez por versión de
+    los datos (`FilterEngine`, `KeywordIndex`, `AggregateCube`, `SortOrders` y
+    `TokenCounts`). Es el backend por defecto y el adecuado mientras el
+    catálogo quepa en memoria.
+
+    Todos los métodos de consulta reciben los filtros de la barra lateral como
+    argumentos con nombre: `brands`, `types`, `price_range` y `keyword`
+    (None o vacío para no filtrar).
+
+    Args:
+        shared (SharedDataset): Datos compartidos.
+    """
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.version = shared.version
+        self._keyword_cube = lru_cache(maxsize=16)(self._build_keyword_cube)
+
+    def _build_keyword_cube(self, brands, types, price_range, keyword):
+        # La palabra clave no es una dimensión del cubo: se agrega sobre las filas encontradas.
+        return AggregateCube(self._filtered(brands=brands, types=types, price_range=price_range, keyword=keyword))
+
+    def _rows(self, brands=None, types=None, price_range=None, keyword=None):
+        # Posiciones de las filas filtradas, o None si no hay filtros.
+        data = self.shared.frame
+        rows = None
+        if brands is not None or types is not None or price_range is not None:
+            engine = self.shared.derived("filter_engine", FilterEngine)
+            rows = engine.apply(
+                data["marca"].unique() if brands is None else brands,
+                data["tipo"].unique() if types is None else types,
+                price_range,
+            )
+        if keyword:
+            index = self.shared.derived("keyword_index", lambda df: KeywordIndex(df["descripcion"]))
+            keyword_rows = index.query(keyword)
+            if keyword_rows is not None:
+                rows = keyword_rows if rows is None else np.intersect1d(rows, keyword_rows, assume_unique=True)
+        return rows
+
+    def _filtered(self, **filters):
+        data = self.shared.frame
+        rows = self._rows(**filters)
+        return data if rows is None else data.iloc[rows]
+
+    def options(self, column):
+        """
+        Valores distintos de "marca" o "tipo" (incluido el nulo si existe), en orden de aparición.
+        """
+        return list(self.shared.frame[column].unique())
+
+    def price_bounds(self):
+        """
+        Precio mínimo y máximo del catálogo.
+        """
+        prices = self.shared.frame["precio"]
+        return prices.min(), prices.max()
+
+    def count(self, **filters):
+        """
+        Número de filas que cumplen los filtros.
+        """
+        rows = self._rows(**filters)
+        return len(self.shared.frame) if rows is None else len(rows)
+
+    def top(self, by, n=10, measure="cantidad", brands=None, types=None, price_range=None, keyword=None):
+        """
+        Los `n` valores de "marca" o "tipo" con mayor `measure`, como `AggregateCube.top`.
+        """
+        if keyword:
+            cube = self._keyword_cube(*(None if values is None else frozenset(values) for values in [brands, types]),
+                                      None if price_range is None else tuple(price_range), keyword)
+            return cube.top(by, n, measure=measure)
+        cube = self.shared.derived("cube", AggregateCube)
+        return cube.top(by, n, measure=measure, mask=cube.select(brands, types, price_range))
+
+    def histogram(self, column, bins=30, **filters):
+        """
+        Barras de un histograma de `column`, como `aggregates.histogram`.
+        """
+        if not filters:  # Catálogo completo: se calcula una vez por versión de los datos.
+            return self.shared.derived(f"histograma.{column}.{bins}", lambda df: histogram(df[column], bins=bins))
+        return histogram(self._filtered(**filters)[column], bins=bins)
+
+    def box_stats(self, value, by, groups=None, **filters):
+        """
+        Cuartiles, bigotes y valores atípicos por grupo, como `aggregates.box_stats`.
+
+        Args:
+            groups (iterable): Grupos a incluir; None para todos.
+        """
+        if groups is None and not filters:  # Catálogo completo: se calcula una vez por versión de los datos.
+            return self.shared.derived(f"cajas.{value}.{by}", lambda df: box_stats(df, value, by))
+        data = self._filtered(**filters)
+        if groups is not None:
+            data = data[data[by].isin(list(groups))]
+        return box_stats(data, value, by)
+
+    def sample(self, columns, max_points=MAX_SCATTER_POINTS, **filters):
+        """
+        Filas con valor en todas las `columns`, reducidas a una muestra si son más de `max_points`.
+
+        Returns:
+            tuple: (pd.DataFrame, bool que indica si se muestreó).
+        """
+        return sample_points(self._filtered(**filters).dropna(subset=columns), max_points)
+
+    def page(self, page, page_size, sort_by=None, ascending=True, **filters):
+        """
+        Una página de las filas filtradas, con las descripciones recortadas.
+        """
+        data = self.shared.frame
+        rows = self._rows(**filters)
+        if rows is None:
+            rows = np.arange(len(data))
+        sort_orders = self.shared.derived("sort_orders", SortOrders)
+        page_rows = sort_orders.page(rows, page, page_size, column=sort_by, ascending=ascending)
+        return data.iloc[page_rows].assign(descripcion=lambda df: truncate_text(df["descripcion"]))
+
+    def word_frequencies(self, max_words=200, **filters):
+        """
+        Frecuencias de la nube de palabras de las filas filtradas.
+        """
+        token_counts = self.shared.derived("token_counts", lambda df: TokenCounts(df["descripcion"]))
+        return token_counts.frequencies(self._rows(**filters), max_words=max_words)
+
+    def batches(self, columns, batch_size=20000):
+        """
+        Bloques consecutivos de filas con las `columns`, en el orden de las filas
+        (para construir índices como `SimilarityIndex` sin copiar las columnas completas).
+        """
+        data = self.shared.frame
+        for start in range(0, len(data), batch_size):
+            yield data.iloc[start:start + batch_size][columns]
+
+    def take(self, positions):
+        """
+        Filas en las posiciones `positions`, en ese orden y con las descripciones completas.
+        """
+        return self.shared.frame.iloc[np.asarray(positions, dtype=np.int64)]
+
+    def memory_usage(self):
+        """
+        Memoria de los datos compartidos y del proceso (ver `SharedDataset.memory_usage`).
+        """
+        return self.shared.memory_usage()
+
+
+class DuckDBBackend:
+    """
+    Backend sobre DuckDB embebido y un archivo Parquet.
+
+    Los datos no se cargan en memoria: los filtros y agregados se traducen a
+    consultas SQL que DuckDB ejecuta leyendo solo las columnas y grupos de
+    filas necesarios, y a Python solo vuelven resultados pequeños (conteos por
+    grupo, barras de histogramas, cuartiles, muestras de puntos y una página
+    de la tabla). El Parquet se genera con `pipeline.py --parquet`.
+
+    Los filtros tienen la misma semántica que en `PandasBackend`: los nulos de
+    "marca" o "tipo" solo pasan si el nulo está seleccionado, las filas sin
+    precio no pasan el filtro de precio y la palabra clave busca todas las
+    palabras entre los tokens de la descripción, con la última como prefijo.
+
+    Args:
+        path (str): Ruta del archivo Parquet de datos limpios.
+        version (tuple): Versión de los datos, normalmente de `backend_version`.
+    """
+
+    def __init__(self, path, version=None):
+        import duckdb
+
+        self.path = path
+        self.version = version
+        self._connection = duckdb.connect()
+        source = path.replace("'", "''")
+        self._connection.execute(
+            f"CREATE VIEW catalogo AS SELECT * FROM read_parquet('{source}', file_row_number = true)"
+        )
+        self._options = {column: self._distinct(column) for column in ["marca", "tipo"]}
+        self._forms = None
+
+    def _query(self, sql, params=()):
+        # Un cursor por consulta: las sesiones de Streamlit comparten el backend desde hilos distintos.
+        return self._connection.cursor().execute(sql, list(params)).df()
+
+    def _distinct(self, column):
+        # Orden de primera aparición en el archivo, igual que `Series.unique`.
+        values = self._query(
+            f'SELECT "{column}" AS valor FROM catalogo GROUP BY "{column}" ORDER BY min(file_row_number)'
+        )["valor"]
+        return [None if pd.isna(value) else value for value in values]
+
+    def _where(self, brands=None, types=None, price_range=None, keyword=None):
+        clauses, params = [], []
+        for column, selected in [("marca", brands), ("tipo", types)]:
+            if selected is None:
+                continue
+            selected = {None if pd.isna(value) else value for value in selected}
+            if selected >= set(self._options[column]):
+                continue  # Todos los valores seleccionados: no filtra.
+            values = sorted(value for value in selected if value is not None)
+            parts = []
+            if values:
+                parts.append(f'"{column}" IN ({", ".join("?" * len(values))})')
+                params += values
+            if None in selected:
+                parts.append(f'"{column}" IS NULL')
+            clauses.append(f"({' OR '.join(parts)})" if parts else "FALSE")
+        if price_range is not None:
+            clauses.append("precio BETWEEN ? AND ?")
+            params += [float(price_range[0]), float(price_range[1])]
+        terms = tokenize(keyword) if keyword else []
+        for position, term in enumerate(terms):
+            # Los tokens de la descripción limpia están separados por un espacio.
+            suffix = "" if position == len(terms) - 1 else "( |$)"
+            clauses.append("regexp_matches(lower(descripcion), ?)")
+            params.append(f"(^| ){re.escape(term)}{suffix}")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _and(self, where, condition):
+        return f"{where} AND {condition}" if where else f" WHERE {condition}"
+
+    def options(self, column):
+        return list(self._options[column])
+
+    def price_bounds(self):
+        row = self._query("SELECT min(precio) AS minimo, max(precio) AS maximo FROM catalogo").iloc[0]
+        return row["minimo"], row["maximo"]
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        return int(self._query(f"SELECT count(*) AS n FROM catalogo{where}", params)["n"].iloc[0])
+
+    def top(self, by, n=10, measure="cantidad", **filters):
+        assert by in {"marca", "tipo"} and measure in _MEASURES
+        where, params = self._where(**filters)
+        result = self._query(
+            f"""
+            SELECT "{by}", count(*) AS cantidad, count(precio) AS n_precio, sum(precio) AS suma,
+                   avg(precio) AS media, stddev_samp(precio) AS desviacion,
+                   min(precio) AS minimo, max(precio) AS maximo, min(file_row_number) AS primera
+            FROM catalogo{self._and(where, f'"{by}" IS NOT NULL')}
+            GROUP BY "{by}"
+            """,
+            params,
+        )
+        # Los grupos son pocos: se ordenan aquí, con los empates en orden de aparición como en el cubo
+        # (en el catálogo completo, o en las filas encontradas si hay palabra clave).
+        if filters.get("keyword"):
+            order = result.sort_values("primera")[by].tolist()
+        else:
+            order = [value for value in self._options[by] if value is not None]
+        result = result.set_index(by)[measure].reindex(order).dropna().astype(result[measure].dtype)
+        result = result.sort_values(ascending=False, kind="stable")
+        result.index = result.index.astype(object)
+        return result if n is None else result.head(n)
+
+    def histogram(self, column, bins=30, **filters):
+        assert column in _COLUMNS
+        where, params = self._where(**filters)
+        where = self._and(where, f'"{column}" IS NOT NULL')
+        bounds = self._query(f'SELECT min("{column}") AS minimo, max("{column}") AS maximo FROM catalogo{where}', params)
+        low, high = bounds.iloc[0]
+        if pd.isna(low):
+            low, high = 0.0, 1.0
+        elif low == high:
+            low, high = low - 0.5, high + 0.5  # Igual que `np.histogram` con un solo valor.
+        edges = np.linspace(low, high, bins + 1)
+        counts = self._query(
+            f"""
+            SELECT least(CAST(floor(("{column}" - ?) / ?) AS INTEGER), ?) AS cubeta, count(*) AS frecuencia
+            FROM catalogo{where}
+            GROUP BY cubeta
+            """,
+            [low, (high - low) / bins, bins - 1] + params,
+        )
+        frequency = np.zeros(bins, dtype=np.int64)
+        frequency[counts["cubeta"].to_numpy()] = counts["frecuencia"].to_numpy()
+        return pd.DataFrame({"inicio": edges[:-1], "fin": edges[1:], "frecuencia": frequency})
+
+    def box_stats(self, value, by, groups=None, max_outliers=MAX_SCATTER_POINTS, **filters):
+        assert value in _COLUMNS and by in _COLUMNS
+        where, params = self._where(**filters)
+        where = self._and(where, f'"{value}" IS NOT NULL AND "{by}" IS NOT NULL')
+        if groups is not None:
+            groups = [group for group in groups if not pd.isna(group)]
+            where = self._and(where, f'"{by}" IN ({", ".join("?" * len(groups))})' if groups else "FALSE")
+            params = params + groups
+        relation = f"""
+            WITH valores AS (SELECT "{by}" AS grupo, "{value}" AS valor FROM catalogo{where}),
+            cuartiles AS (
+                SELECT grupo, quantile_cont(valor, 0.25) AS q1, quantile_cont(valor, 0.5) AS mediana,
+                       quantile_cont(valor, 0.75) AS q3, count(*) AS n
+                FROM valores GROUP BY grupo
+            ),
+            marcados AS (
+                SELECT grupo, valor, q1, mediana, q3, n,
+                       valor BETWEEN q1 - 1.5 * (q3 - q1) AND q3 + 1.5 * (q3 - q1) AS dentro
+                FROM valores JOIN cuartiles USING (grupo)
+            )
+        """
+        stats = self._query(
+            relation + """
+            SELECT grupo, any_value(q1) AS q1, any_value(mediana) AS mediana, any_value(q3) AS q3,
+                   min(valor) FILTER (WHERE dentro) AS min_bigote, max(valor) FILTER (WHERE dentro) AS max_bigote,
+                   any_value(n) AS n
+            FROM marcados GROUP BY grupo ORDER BY grupo
+            """,
+            params,
+        ).rename(columns={"grupo": by})
+        # Los valores atípicos pueden ser muchos en catálogos grandes: se envía una muestra.
+        outliers = self._query(
+            relation + f"""
+            SELECT grupo, valor FROM (SELECT grupo, valor FROM marcados WHERE NOT dentro)
+            USING SAMPLE reservoir({int(max_outliers)} ROWS) REPEATABLE (0)
+            """,
+            params,
+        ).rename(columns={"grupo": by, "valor": value})
+        return stats, outliers
+
+    def sample(self, columns, max_points=MAX_SCATTER_POINTS, **filters):
+        assert set(columns) <= _COLUMNS
+        where, params = self._where(**filters)
+        where = self._and(where, " AND ".join(f'"{column}" IS NOT NULL' for column in columns))
+        total = int(self._query(f"SELECT count(*) AS n FROM catalogo{where}", params)["n"].iloc[0])
+        selection = "SELECT * EXCLUDE (file_row_number) FROM catalogo" + where
+        if total <= max_points:
+            return self._query(selection, params), False
+        sql = f"SELECT * FROM ({selection}) USING SAMPLE reservoir({int(max_points)} ROWS) REPEATABLE (0)"
+        return self._query(sql, params), True
+
+    def page(self, page, page_size, sort_by=None, ascending=True, **filters):
+        where, params = self._where(**filters)
+        order = "file_row_number"
+        if sort_by is not None:
+            assert sort_by in _COLUMNS
+            order = f'"{sort_by}" {"ASC" if ascending else "DESC"} NULLS LAST, file_row_number'
+        data = self._query(
+            f"SELECT * FROM catalogo{where} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [int(page_size), int((page - 1) * page_size)],
+        ).set_index("file_row_number").rename_axis(None)  # Mismo índice que las filas en pandas.
+        return data.assign(descripcion=lambda df: truncate_text(df["descripcion"]))
+
+    def _word_counts(self, where="", params=()):
+        from wordcloud import STOPWORDS
+
+        # Mismas palabras que `TokenCounts`: sin "'s", sin números y sin stopwords, en orden de primera aparición.
+        return self._query(
+            f"""
+            WITH listas AS (
+                SELECT file_row_number AS fila, regexp_extract_all(descripcion, ?) AS palabras FROM catalogo{where}
+            ),
+            tokens AS (
+                SELECT fila, unnest(range(len(palabras))) AS posicion,
+                       regexp_replace(unnest(palabras), '''[sS]$', '') AS palabra
+                FROM listas
+            )
+            SELECT palabra, count(*) AS frecuencia FROM tokens
+            WHERE NOT regexp_full_match(palabra, ?) AND lower(palabra) NOT IN (SELECT unnest(?))
+            GROUP BY palabra ORDER BY min(fila * 65536 + posicion)
+            """,
+            [_WORD_PATTERN] + list(params) + [_DIGITS_PATTERN, sorted(word.lower() for word in STOPWORDS)],
+        )
+
+    def _word_forms(self):
+        # Forma mostrada de cada palabra y su orden de aparición en el catálogo completo, como en
+        # `TokenCounts`; se calcula una vez por backend.
+        if self._forms is None:
+            counts = self._word_counts()
+            forms = standard_forms(dict(zip(counts["palabra"], counts["frecuencia"])))
+            order = {}
+            for word in counts["palabra"]:
+                order.setdefault(forms[word.lower()], len(order))
+            self._forms = forms, order
+        return self._forms
+
+    def word_frequencies(self, max_words=200, **filters):
+        forms, order = self._word_forms()
+        counts = self._word_counts(*self._where(**filters))
+        totals = {}
+        for word, count in zip(counts["palabra"], counts["frecuencia"]):
+            display = forms[word.lower()]
+            totals[display] = totals.get(display, 0) + int(count)
+        # Mismo orden que `TokenCounts.frequencies`: de mayor a menor, en empate por aparición en el catálogo.
+        return dict(sorted(totals.items(), key=lambda item: (-item[1], order[item[0]]))[:max_words])
+
+    def batches(self, columns, batch_size=20000):
+        assert set(columns) <= _COLUMNS
+        selection = ", ".join(f'"{column}"' for column in columns)
+        # Los bloques se leen de DuckDB a medida que se consumen, sin traer las columnas completas a pandas.
+        cursor = self._connection.cursor().execute(f"SELECT {selection} FROM catalogo ORDER BY file_row_number")
+        # `fetch_record_batch` se llama `to_arrow_reader` en las versiones recientes de DuckDB.
+        reader = getattr(cursor, "to_arrow_reader", None) or cursor.fetch_record_batch
+        for batch in reader(batch_size):
+            yield batch.to_pandas()
+
+    def take(self, positions):
+        positions = [int(position) for position in positions]
+        data = self._query(
+            "SELECT * FROM catalogo WHERE file_row_number IN (SELECT unnest(?::BIGINT[]))", [positions]
+        ).set_index("file_row_number").rename_axis(None)
+        return data.reindex(positions)
+
+    def memory_usage(self):
+        """
+        Memoria usada por DuckDB (los datos se quedan en el archivo Parquet).
+        """
+        usage = self._query("SELECT sum(memory_usage_bytes) AS bytes FROM duckdb_memory()")
+        return {"duckdb": int(usage["bytes"].iloc[0] or 0)}
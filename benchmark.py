@@ -0,0 +1,363 @@
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import extraction
+from aggregates import MAX_SCATTER_POINTS, AggregateCube, box_stats, histogram, sample_points
+from dataset import CSV_PATH, load_dataset, write_columnar
+from extraction import (
+    BrandMatcher, TypeClassifier, brands, clean_catalog, clean_text, clean_text_series, extract_brand, extract_gb,
+    extract_numeric_attributes, extract_price, extract_sku, extract_type_from_dict, extract_watts, tipos,
+)
+from filters import FilterEngine
+from search import KeywordIndex, TokenCounts
+
+
+INPUT_PATH = "Prueba_EVA.XLSX"
+
+# Tamaños de los catálogos sintéticos.
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+# 10M no está en la lista por defecto: solo las descripciones ocupan varios GB.
+DEFAULT_SIZES = ["1k", "100k", "1M"]
+
+
+def _reference_token(rng, n):
+    # Referencia numérica única por fila: evita que el catálogo sintético sea
+    # solo la muestra real repetida (las cachés por palabra acertarían siempre)
+    # sin crear coincidencias nuevas de SKU, watts, GB ni marcas.
+    return pd.Series(rng.integers(1_000_000, 10_000_000, size=n)).astype(str).radd(" Ref ")
+
+
+def _jitter_prices(rng, prices):
+    # Precios cercanos a los reales (±10 % aprox.), enteros como en el catálogo original.
+    return np.round(prices * rng.lognormal(0, 0.1, size=len(prices)))
+
+
+def synthetic_descriptions(n, seed=0, input_path=INPUT_PATH):
+    """
+    Descripciones sin limpiar con la misma forma que las de `input_path`.
+
+    Cada fila toma una descripción real al azar, conserva su texto (y por lo
+    tanto la distribución de marcas, tipos y longitudes), agrega una referencia
+    numérica única y reemplaza el precio final ("$$precio") por uno cercano,
+    dejando vacíos los que estaban vacíos.
+
+    Args:
+        n (int): Número de filas.
+        seed (int): Semilla del generador.
+        input_path (str): Archivo de entrada real usado como modelo.
+
+    Returns:
+        pd.Series: Serie "descripcion" de `n` filas.
+    """
+    rng = np.random.default_rng(seed)
+    templates = pd.read_excel(input_path)["descripcion"].dropna().astype(str)
+    parts = templates.str.rsplit("$$", n=1, expand=True).reindex(columns=[0, 1])
+    prices = pd.to_numeric(parts[1], errors="coerce").to_numpy()
+    rows = rng.integers(0, len(templates), size=n)
+
+    new_prices = pd.Series(_jitter_prices(rng, prices[rows]))
+    price_text = new_prices.map(lambda price: "" if np.isnan(price) else str(int(price)))
+    has_price = pd.Series(parts[1].notna().to_numpy()[rows])
+    body = pd.Series(parts[0].to_numpy()[rows]) + _reference_token(rng, n)
+    return (body + np.where(has_price, "$$", "") + price_text.where(has_price, "")).rename("descripcion")
+
+
+def synthetic_catalog(n, seed=0, csv_path=CSV_PATH):
+    """
+    Catálogo limpio sintético con las distribuciones de `csv_path`.
+
+    Se muestrean filas reales con reemplazo (conservando la relación entre
+    marca, tipo, precio, watts, GB y longitud de la descripción), se varía el
+    precio alrededor del real y se agrega a la descripción una referencia única.
+
+    Args:
+        n (int): Número de filas.
+        seed (int): Semilla del generador.
+        csv_path (str): CSV de datos limpios usado como modelo.
+
+    Returns:
+        pd.DataFrame: Datos limpios con las columnas de `OUTPUT_COLUMNS`.
+    """
+    rng = np.random.default_rng(seed)
+    model = pd.read_csv(csv_path)
+    data = model.iloc[rng.integers(0, len(model), size=n)].reset_index(drop=True)
+    data["precio"] = _jitter_prices(rng, pd.to_numeric(data["precio"], errors="coerce").to_numpy())
+    data["descripcion"] = data["descripcion"].astype(object) + _reference_token(rng, n)
+    return data
+
+
+def measure(function, repeat=1, setup=None):
+    """
+    Mide el tiempo y la memoria pico de una función.
+
+    Se hace una primera ejecución con `tracemalloc` para la memoria pico (memoria
+    asignada por encima de la que había al empezar) y `repeat` ejecuciones sin
+    trazar para el tiempo, del que se toma el mínimo.
+
+    Args:
+        function (callable): Función sin argumentos a medir.
+        repeat (int): Número de ejecuciones cronometradas.
+        setup (callable): Función sin argumentos que se ejecuta, sin medir, antes de cada ejecución.
+
+    Returns:
+        tuple: (segundos, bytes de memoria pico).
+    """
+    setup = setup or (lambda: None)
+    setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        setup()
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times), peak
+
+
+def _each(function):
+    return lambda descriptions: [function(description) for description in descriptions]
+
+
+def extraction_stages(descriptions):
+    """
+    Etapas de extracción: cada función por fila y sus versiones vectorizadas.
+
+    Returns:
+        list: (nombre, función sin argumentos, función de preparación o None).
+    """
+    # Buscadores construidos fuera de la medición; solo se vacía la caché de palabras
+    # para que el resultado no dependa de ejecuciones anteriores.
+    brand_matcher = BrandMatcher(brands)
+    classifier = TypeClassifier(tipos)
+    extract_type_from_dict("")  # Construye los buscadores compartidos de las funciones por fila.
+    extract_brand("")
+
+    def clear_brand_caches():
+        brand_matcher.match_token.cache_clear()
+        extraction._get_brand_matcher(tuple(brands)).match_token.cache_clear()
+
+    frame = descriptions.to_frame()
+    stages = [
+        ("extraccion.extract_brand", _each(extract_brand), clear_brand_caches),
+        ("extraccion.extract_type_from_dict", _each(extract_type_from_dict), None),
+        ("extraccion.extract_price", _each(extract_price), None),
+        ("extraccion.extract_watts", _each(extract_watts), None),
+        ("extraccion.extract_gb", _each(extract_gb), None),
+        ("extraccion.extract_sku", _each(extract_sku), None),
+        ("extraccion.clean_text", _each(clean_text), None),
+        ("extraccion.BrandMatcher.extract_series", brand_matcher.extract_series, clear_brand_caches),
+        ("extraccion.TypeClassifier.classify_series", classifier.classify_series, None),
+        ("extraccion.extract_numeric_attributes", extract_numeric_attributes, None),
+        ("extraccion.clean_text_series", clean_text_series, None),
+        ("extraccion.clean_catalog", lambda values: clean_catalog(frame, brand_matcher, classifier), clear_brand_caches),
+    ]
+    return [(name, (lambda function=function: function(descriptions)), setup) for name, function, setup in stages]
+
+
+def loading_stages(catalog, directory):
+    """
+    Etapas de carga: CSV de datos limpios y archivo Arrow con memory-map.
+    """
+    csv_path = os.path.join(directory, "datos_limpios.csv")
+    arrow_path = os.path.join(directory, "datos_limpios.arrow")
+    catalog.to_csv(csv_path, index=False)
+    write_columnar(catalog, arrow_path, csv_path=csv_path)
+    missing = os.path.join(directory, "no_existe.arrow")
+    return [
+        ("carga.csv", lambda: load_dataset(missing, csv_path), None),
+        ("carga.arrow", lambda: load_dataset(arrow_path, csv_path), None),
+    ]
+
+
+def dashboard_stages(data):
+    """
+    Etapas de app_plotly.py: construcción de índices, filtros de la barra lateral y agregados de cada gráfico.
+
+    La selección de filtros imita un uso típico: la mitad de las marcas, todos
+    los tipos, el 80 % central del rango de precios y una palabra clave.
+    """
+    brand_values = data["marca"].dropna().unique()
+    selected_brands = list(brand_values[: max(1, len(brand_values) // 2)])
+    selected_types = list(data["tipo"].unique())
+    low, high = np.nanpercentile(data["precio"].to_numpy(dtype="float64", na_value=np.nan), [10, 90])
+    price_range = (int(low), int(high))
+
+    engine = FilterEngine(data)
+    keyword_index = KeywordIndex(data["descripcion"])
+    cube = AggregateCube(data)
+    token_counts = TokenCounts(data["descripcion"])
+    rows = engine.apply(selected_brands, selected_types, price_range)
+    mask = cube.select(selected_brands, selected_types, price_range)
+    top_types = cube.top("tipo", 10, mask=mask)
+    filtered = data.iloc[rows]
+
+    def sidebar_filters():
+        filtered_rows = engine.apply(selected_brands, selected_types, price_range)
+        filtered_rows = np.intersect1d(filtered_rows, keyword_index.query("black"), assume_unique=True)
+        cube.select(selected_brands, selected_types, price_range)
+        return data.iloc[filtered_rows]
+
+    def clear_filter_caches():
+        engine.filter.cache_clear()
+        keyword_index.search.cache_clear()
+
+    return [
+        ("indices.FilterEngine", lambda: FilterEngine(data), None),
+        ("indices.KeywordIndex", lambda: KeywordIndex(data["descripcion"]), None),
+        ("indices.AggregateCube", lambda: AggregateCube(data), None),
+        ("indices.TokenCounts", lambda: TokenCounts(data["descripcion"]), None),
+        ("filtros.barra_lateral", sidebar_filters, clear_filter_caches),
+        ("graficos.1_distribucion_precios", lambda: histogram(data["precio"], bins=15), None),
+        ("graficos.2_productos_por_marca", lambda: cube.top("marca", n=None, mask=mask), None),
+        ("graficos.3_nube_de_palabras", lambda: token_counts.frequencies(rows), None),
+        ("graficos.4_proporcion_por_tipo", lambda: cube.top("tipo", 10, mask=mask), None),
+        ("graficos.5_precios_por_tipo", lambda: box_stats(data, "precio", "tipo"), None),
+        ("graficos.6_precio_vs_watts", lambda: sample_points(data.dropna(subset=["watts"]), MAX_SCATTER_POINTS), None),
+        ("graficos.7_precio_vs_gb", lambda: sample_points(data.dropna(subset=["GB"]), MAX_SCATTER_POINTS), None),
+        ("graficos.8_marcas_populares", lambda: cube.top("marca", 10, mask=mask), None),
+        ("graficos.9_precio_promedio_marca", lambda: cube.top("marca", 10, measure="media", mask=mask), None),
+        ("graficos.10_productos_por_tipo", lambda: cube.top("tipo", 10, mask=mask), None),
+        ("graficos.11_precios_top_tipos",
+         lambda: box_stats(filtered[filtered["tipo"].isin(top_types.index)], "precio", "tipo"), None),
+        ("graficos.12_proporcion_precios_marca", lambda: cube.top("marca", 10, measure="suma", mask=mask), None),
+    ]
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=3, seed=0, groups=("extraccion", "carga", "dashboard"), log=print):
+    """
+    Ejecuta el conjunto de mediciones sobre catálogos sintéticos.
+
+    Args:
+        sizes (list): Claves de `SIZES`.
+        repeat (int): Ejecuciones cronometradas por etapa.
+        seed (int): Semilla de los catálogos sintéticos.
+        groups (iterable): Grupos de etapas a medir.
+        log (callable): Función que recibe una línea de progreso.
+
+    Returns:
+        dict: "metadatos" y "resultados" (una entrada por etapa y tamaño con
+        "segundos", "filas_por_segundo" y "memoria_pico" en bytes).
+    """
+    results = []
+    for size in sizes:
+        n = SIZES[size]
+        stages = []
+        if "extraccion" in groups:
+            stages += extraction_stages(synthetic_descriptions(n, seed))
+        catalog = synthetic_catalog(n, seed) if {"carga", "dashboard"} & set(groups) else None
+        with tempfile.TemporaryDirectory() as directory:
+            if "carga" in groups:
+                stages += loading_stages(catalog, directory)
+            if "dashboard" in groups:
+                # Sin CSV junto al archivo Arrow, `load_dataset` lo usa directamente.
+                write_columnar(catalog, os.path.join(directory, "tipado.arrow"))
+                stages += dashboard_stages(load_dataset(os.path.join(directory, "tipado.arrow"),
+                                                        os.path.join(directory, "tipado.csv")))
+            for name, function, setup in stages:
+                seconds, peak = measure(function, repeat=repeat, setup=setup)
+                results.append({
+                    "etapa": name,
+                    "tamano": size,
+                    "filas": n,
+                    "segundos": seconds,
+                    "filas_por_segundo": n / seconds if seconds else None,
+                    "memoria_pico": peak,
+                })
+                log(f"{size:>5} {name:<45} {seconds:10.4f} s {peak / 2 ** 20:10.1f} MiB")
+    return {
+        "metadatos": {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "procesador": platform.processor() or platform.machine(),
+            "semilla": seed,
+            "repeticiones": repeat,
+        },
+        "resultados": results,
+    }
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compara una ejecución con una línea base guardada.
+
+    Args:
+        results (dict): Resultado de `run_benchmarks`.
+        baseline (dict): Resultado guardado de una ejecución anterior.
+        tolerance (float): Aumento relativo de tiempo o memoria tolerado (0.25 = 25 %).
+
+    Returns:
+        list: Regresiones, cada una con "etapa", "tamano", "medida", "base", "actual" y "cambio".
+    """
+    previous = {(entry["etapa"], entry["tamano"]): entry for entry in baseline["resultados"]}
+    regressions = []
+    for entry in results["resultados"]:
+        reference = previous.get((entry["etapa"], entry["tamano"]))
+        if reference is None:
+            continue
+        for measure_name in ["segundos", "memoria_pico"]:
+            before, after = reference[measure_name], entry[measure_name]
+            if before and after > before * (1 + tolerance):
+                regressions.append({
+                    "etapa": entry["etapa"], "tamano": entry["tamano"], "medida": measure_name,
+                    "base": before, "actual": after, "cambio": after / before - 1,
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de la extracción y del tablero sobre catálogos sintéticos.")
+    parser.add_argument("--tamanos", default=",".join(DEFAULT_SIZES),
+                        help=f"Tamaños separados por comas, de {', '.join(SIZES)}.")
+    parser.add_argument("--grupos", default="extraccion,carga,dashboard", help="Grupos de etapas separados por comas.")
+    parser.add_argument("-r", "--repeticiones", type=int, default=3, help="Ejecuciones cronometradas por etapa.")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla de los catálogos sintéticos.")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="Archivo JSON de resultados.")
+    parser.add_argument("--linea-base", help="JSON de una ejecución anterior con el que se comparan los resultados.")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Aumento relativo tolerado antes de marcar una regresión.")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.tamanos.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"tamaños desconocidos: {', '.join(unknown)}")
+    groups = [group.strip() for group in args.grupos.split(",") if group.strip()]
+
+    results = run_benchmarks(sizes, repeat=args.repeticiones, seed=args.semilla, groups=groups)
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(results, output, indent=1)
+    print(f"Resultados escritos en {args.output}")
+
+    if args.linea_base:
+        with open(args.linea_base, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), tolerance=args.tolerancia)
+        for regression in regressions:
+            print(f"REGRESIÓN {regression['tamano']} {regression['etapa']} {regression['medida']}: "
+                  f"{regression['base']:.4g} -> {regression['actual']:.4g} ({regression['cambio']:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"Sin regresiones respecto a {args.linea_base}")
+
+
+if __name__ == "__main__":
+    main()
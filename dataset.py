@@ -0,0 +1,328 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import peak_memory
+
+
+CSV_PATH = "datos_limpios.csv"
+COLUMNAR_PATH = "datos_limpios.arrow"
+PARQUET_PATH = "datos_limpios.parquet"
+
+# Clave de los metadatos del esquema Arrow con la firma del CSV a partir del que se escribió.
+CSV_SIGNATURE_KEY = b"csv_signature"
+
+NUMERIC_COLUMNS = ["precio", "watts", "GB"]
+CATEGORICAL_COLUMNS = ["marca", "tipo"]
+
+
+def columnar_path_for(csv_path, extension=".arrow"):
+    """
+    Devuelve la ruta del archivo columnar (".arrow" o ".parquet") que acompaña a un CSV de datos limpios.
+    """
+    return os.path.splitext(csv_path)[0] + extension
+
+
+def to_typed_frame(data):
+    """
+    Convierte los datos limpios a sus tipos definitivos.
+
+    "precio", "watts" y "GB" pasan a numéricos (los valores no convertibles
+    quedan como NaN) y "marca" y "tipo" a categóricos.
+
+    Args:
+        data (pd.DataFrame): Datos limpios con las columnas de `OUTPUT_COLUMNS`.
+
+    Returns:
+        pd.DataFrame: Copia de los datos con los tipos definitivos.
+    """
+    data = data.copy()
+    for column in NUMERIC_COLUMNS:
+        data[column] = pd.to_numeric(data[column], errors="coerce").astype("float64")
+    for column in CATEGORICAL_COLUMNS:
+        data[column] = data[column].astype("category")
+    return data
+
+
+def csv_signature(csv_path):
+    """
+    Tamaño y fecha de modificación (ns) de un CSV, como se guardan en los metadatos del archivo Arrow.
+    """
+    stat = os.stat(csv_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode("ascii")
+
+
+def _schema(categorical=True):
+    import pyarrow as pa
+
+    category = pa.dictionary(pa.int32(), pa.string()) if categorical else pa.string()
+    return pa.schema([
+        ("marca", category),
+        ("sku", pa.string()),
+        ("tipo", category),
+        ("precio", pa.float64()),
+        ("watts", pa.float64()),
+        ("GB", pa.float64()),
+        ("descripcion", pa.string()),
+    ])
+
+
+def write_columnar(data, path=COLUMNAR_PATH, csv_path=None):
+    """
+    Escribe los datos limpios en formato Arrow IPC sin compresión, listo para
+    leerse con memory-map, o en Parquet si `path` termina en ".parquet".
+
+    Args:
+        data (pd.DataFrame): Datos limpios con las columnas de `OUTPUT_COLUMNS`.
+        path (str): Ruta del archivo de salida.
+        csv_path (str): CSV ya escrito con los mismos datos; su firma se guarda
+            en los metadatos para que `load_dataset` use el archivo Arrow solo
+            mientras el CSV no cambie.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(to_typed_frame(data), schema=_schema(), preserve_index=False)
+    if csv_path is not None:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), CSV_SIGNATURE_KEY: csv_signature(csv_path)})
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+        return
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+class ColumnarWriter:
+    """
+    Escritor incremental del archivo Arrow IPC para el modo por bloques.
+
+    El formato de archivo no admite diccionarios distintos entre bloques, así
+    que "marca" y "tipo" se guardan como texto y `load_dataset` los convierte a
+    categóricos al leer. Si `path` termina en ".parquet" se escribe Parquet,
+    un grupo de filas por bloque.
+
+    El esquema de un archivo IPC no se puede cambiar después de escribir el
+    primer bloque, y la firma del CSV solo se conoce al terminarlo. Por eso,
+    con `csv_path`, los bloques se escriben en un archivo temporal y `close`
+    los copia al archivo final con la firma en los metadatos (una copia
+    secuencial de los bloques, sin volver a convertir los datos).
+
+    Args:
+        path (str): Ruta del archivo de salida.
+        csv_path (str): CSV que se escribe en paralelo; debe estar cerrado antes de `close`.
+    """
+
+    def __init__(self, path, csv_path=None):
+        import pyarrow as pa
+
+        self._schema = _schema(categorical=False)
+        self._path = path
+        self._csv_path = None
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            self._sink = None
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._csv_path = csv_path
+            self._sink = pa.OSFile(path + ".tmp" if csv_path else path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def write(self, data):
+        import pyarrow as pa
+
+        typed = to_typed_frame(data)
+        for column in CATEGORICAL_COLUMNS:
+            typed[column] = typed[column].astype(object).where(typed[column].notna(), None)
+        self._writer.write_table(pa.Table.from_pandas(typed, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        import pyarrow as pa
+
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        if self._csv_path is not None:
+            temporary = self._path + ".tmp"
+            schema = self._schema.with_metadata({CSV_SIGNATURE_KEY: csv_signature(self._csv_path)})
+            with pa.memory_map(temporary, "r") as source, pa.OSFile(self._path, "wb") as sink:
+                reader = pa.ipc.open_file(source)
+                with pa.ipc.new_file(sink, schema) as writer:
+                    for i in range(reader.num_record_batches):
+                        writer.write_batch(reader.get_batch(i))
+            os.remove(temporary)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _source_path(path, csv_path):
+    # El archivo Arrow solo se usa si se escribió a partir de este mismo CSV (o si no hay CSV).
+    if not os.path.exists(path):
+        return csv_path
+    if not os.path.exists(csv_path):
+        return path
+    try:
+        import pyarrow as pa
+
+        with pa.memory_map(path, "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (ImportError, OSError, ValueError):  # Sin pyarrow o archivo incompleto.
+        return csv_path
+    return path if metadata.get(CSV_SIGNATURE_KEY) == csv_signature(csv_path) else csv_path
+
+
+def dataset_version(path=COLUMNAR_PATH, csv_path=CSV_PATH):
+    """
+    Identificador de la versión de los datos que cargaría `load_dataset`.
+
+    Cambia cuando se regenera el archivo de origen, por lo que sirve como clave
+    de caché para todo lo que se construye a partir de los datos.
+
+    Returns:
+        tuple: Ruta, fecha de modificación (ns) y tamaño del archivo de origen.
+    """
+    source = _source_path(path, csv_path)
+    stat = os.stat(source)
+    return source, stat.st_mtime_ns, stat.st_size
+
+
+def load_dataset(path=COLUMNAR_PATH, csv_path=CSV_PATH):
+    """
+    Carga los datos limpios ya tipados.
+
+    Usa el archivo Arrow si existe y se escribió a partir del CSV actual
+    (mismo tamaño y fecha de modificación, guardados en sus metadatos); en
+    caso contrario lee el CSV y aplica los tipos.
+
+    El archivo Arrow se lee con memory-map, lo que evita copiarlo a un búfer
+    antes de convertirlo, pero `to_pandas` crea columnas nuevas en la memoria
+    del proceso (los textos como objetos de Python): el DataFrame no queda
+    respaldado por el archivo. Lo que se ahorra respecto del CSV es el parseo
+    y la conversión de tipos, no la memoria de los datos.
+
+    Args:
+        path (str): Ruta del archivo Arrow IPC.
+        csv_path (str): Ruta del CSV de datos limpios usado como respaldo.
+
+    Returns:
+        pd.DataFrame: Datos limpios con "precio", "watts" y "GB" numéricos y "marca" y "tipo" categóricos.
+    """
+    if _source_path(path, csv_path) == path:
+        import pyarrow as pa
+
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas(categories=CATEGORICAL_COLUMNS)
+    return to_typed_frame(pd.read_csv(csv_path))
+
+
+def _copy_on_write_enabled():
+    # Siempre activo desde pandas 3; en versiones anteriores depende de la opción "mode.copy_on_write".
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except KeyError:
+        return False
+
+
+def _nbytes(value, seen=None):
+    # Bytes de los arreglos de un resultado derivado: recorre sus atributos y contenedores.
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(_nbytes(key, seen) + _nbytes(item, seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(_nbytes(item, seen) for item in value)
+    if hasattr(value, "__dict__") and not callable(value):
+        return _nbytes(vars(value), seen)
+    return 0
+
+
+class SharedDataset:
+    """
+    Capa de datos de solo lectura compartida por todas las sesiones de un proceso.
+
+    Se guarda con `st.cache_resource`, que entrega el mismo objeto a cada
+    sesión en lugar de una copia deserializada. `frame` devuelve una vista
+    superficial: con Copy-on-Write (siempre activo desde pandas 3), si una
+    sesión modifica su vista solo se copia la columna afectada y los datos
+    compartidos no cambian; sin Copy-on-Write devuelve una copia. Las columnas
+    derivadas se calculan una vez con `derived` y también se comparten.
+
+    Args:
+        data (pd.DataFrame): Datos tipados, normalmente de `load_dataset`.
+        version (tuple): Versión de los datos, normalmente de `dataset_version`.
+    """
+
+    def __init__(self, data, version=None):
+        self.version = version
+        self._frame = data
+        self._derived = {}
+        self._lock = threading.Lock()
+        self._copy_on_write = _copy_on_write_enabled()
+        self._nbytes = {}  # nombre de un derivado -> bytes
+        self._frame_nbytes = None
+
+    @property
+    def frame(self):
+        """
+        Vista del DataFrame compartido que cada sesión puede usar libremente.
+        """
+        return self._frame.copy(deep=not self._copy_on_write)
+
+    def derived(self, name, compute):
+        """
+        Devuelve una columna o tabla derivada, calculándola solo la primera vez.
+
+        Args:
+            name (str): Nombre único del resultado derivado.
+            compute (callable): Función que recibe el DataFrame compartido y devuelve el resultado.
+
+        Returns:
+            El resultado de `compute`, compartido entre sesiones (no debe modificarse).
+        """
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = compute(self._frame)
+            return self._derived[name]
+
+    def memory_usage(self):
+        """
+        Memoria ocupada por los datos compartidos y por el proceso.
+
+        El tamaño de los datos y el de cada resultado derivado se miden una
+        sola vez (los datos de una versión no cambian); solo el pico del
+        proceso se consulta en cada llamada.
+
+        Returns:
+            dict: Bytes de los datos base, de los derivados y pico de memoria residente del proceso.
+        """
+        with self._lock:
+            derived = dict(self._derived)
+            if self._frame_nbytes is None:
+                self._frame_nbytes = int(self._frame.memory_usage(deep=True).sum())
+        for name, value in derived.items():
+            if name not in self._nbytes:
+                self._nbytes[name] = _nbytes(value)
+        return {
+            "datos": self._frame_nbytes,
+            "derivados": sum(self._nbytes.values()),
+            "pico_proceso": peak_memory(),
+        }
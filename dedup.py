@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+
+# Columnas que cuentan para elegir la fila canónica de cada grupo (la más completa).
+_INFO_COLUMNS = ["marca", "sku", "tipo", "precio", "watts", "GB"]
+
+# Base del hash polinomial de los shingles.
+_SHINGLE_BASE = np.uint64(1099511628211)
+
+# Código de modelo del catálogo: "... Notebook Computer - VGNCS180JP / 2 . 26GHz ...".
+MODEL_CODE_PATTERN = r" - ([A-Z0-9]{4,})(?= / | , | ?\$|$)"
+
+
+def normalize_descriptions(descriptions):
+    """
+    Normaliza las descripciones para compararlas.
+
+    Pasa a minúsculas, quita el precio ("$$ 399") y reemplaza los signos y
+    espacios repetidos por un espacio, de modo que dos publicaciones del mismo
+    modelo que solo difieren en el precio, en mayúsculas o en separadores
+    quedan iguales.
+
+    Args:
+        descriptions (pd.Series): Serie con las descripciones.
+
+    Returns:
+        pd.Series: Descripciones normalizadas.
+    """
+    texts = descriptions.fillna("").astype(object).str.lower()
+    texts = texts.str.replace(r"\$+[\s\d.,]*", " ", regex=True)
+    return texts.str.replace(r"[\W_]+", " ", regex=True).str.strip()
+
+
+def model_codes(data):
+    """
+    Código de modelo de cada fila, para reconocer publicaciones del mismo producto.
+
+    Se usa el primer código en mayúsculas que el catálogo escribe tras " - "
+    y, si no hay, el "sku" de `extract_sku`. Se prefiere el código del
+    catálogo porque `extract_sku` toma la primera palabra con letras y números,
+    que a menudo es el procesador o un modelo compatible ("P8400" en varios
+    portátiles distintos).
+
+    Args:
+        data (pd.DataFrame): Datos limpios con "descripcion" y "sku".
+
+    Returns:
+        pd.Series: Código de modelo por fila (None si no se encuentra).
+    """
+    codes = data["descripcion"].fillna("").astype(object).str.extract(MODEL_CODE_PATTERN)[0]
+    return codes.where(codes.notna(), data["sku"].astype(object)).where(lambda values: values.notna(), None)
+
+
+def _hash_values(values):
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def shingle_hashes(texts, shingle_size):
+    """
+    Hash de 64 bits de cada ventana de `shingle_size` bytes de cada texto.
+
+    El hash polinomial se calcula sobre todos los textos a la vez, con
+    operaciones vectorizadas; solo se incluyen las ventanas completas dentro
+    de su texto.
+
+    Args:
+        texts (list): Textos.
+        shingle_size (int): Bytes por ventana.
+
+    Returns:
+        tuple: (np.ndarray uint64 con los hashes, texto por texto y en orden;
+        np.ndarray con el número de ventanas de cada texto).
+    """
+    encoded = [text.encode("utf-8") for text in texts]
+    lengths = np.fromiter((len(text) for text in encoded), dtype=np.int64, count=len(encoded))
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+    n_windows = np.maximum(lengths - shingle_size + 1, 0)
+    if n_windows.sum() == 0:
+        return np.empty(0, dtype=np.uint64), n_windows
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    # Inicio de cada ventana que queda completa dentro de su texto.
+    offsets = np.arange(n_windows.sum()) - np.repeat(np.cumsum(n_windows) - n_windows, n_windows)
+    positions = np.repeat(starts, n_windows) + offsets
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for shift in range(shingle_size):
+            hashes = hashes * _SHINGLE_BASE + buffer[positions + shift]
+    return hashes, n_windows
+
+
+def minhash_signatures(texts, num_perm=64, shingle_size=5, seed=0, block_size=50000):
+    """
+    Firmas MinHash de los shingles de caracteres de cada texto.
+
+    Cada shingle (ventana de `shingle_size` bytes) se resume con un hash de
+    64 bits, y cada una de las `num_perm` funciones de la familia
+    multiplicar-desplazar `(a * x + b) >> 32` toma el mínimo sobre los shingles
+    del texto. La fracción de posiciones iguales entre dos firmas estima la
+    similitud de Jaccard de sus conjuntos de shingles. Los textos se procesan
+    por bloques, así que la memoria depende de `block_size` y no del total.
+
+    Args:
+        texts (pd.Series): Textos normalizados (ver `normalize_descriptions`).
+        num_perm (int): Largo de la firma.
+        shingle_size (int): Bytes por shingle.
+        seed (int): Semilla de las funciones hash.
+        block_size (int): Textos por bloque.
+
+    Returns:
+        tuple: (np.ndarray uint32 de forma (n, num_perm) con las firmas;
+        np.ndarray bool con los textos que tienen al menos un shingle).
+    """
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    increments = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    texts = texts.tolist()
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    has_shingles = np.zeros(len(texts), dtype=bool)
+    for start in range(0, len(texts), block_size):
+        hashes, n_windows = shingle_hashes(texts[start:start + block_size], shingle_size)
+        present = n_windows > 0
+        has_shingles[start:start + len(n_windows)] = present
+        if not len(hashes):
+            continue
+        rows = start + np.flatnonzero(present)
+        bounds = (np.cumsum(n_windows) - n_windows)[present]
+        values = np.empty_like(hashes)
+        with np.errstate(over="ignore"):
+            for i in range(num_perm):
+                np.multiply(hashes, multipliers[i], out=values)
+                np.add(values, increments[i], out=values)
+                # El desplazamiento conserva el orden: se toma el mínimo y después se desplaza.
+                signatures[rows, i] = np.minimum.reduceat(values, bounds) >> np.uint64(32)
+    return signatures, has_shingles
+
+
+def _bucket_edges(keys, rows):
+    # Une cada fila con la primera fila de su cubeta (misma clave).
+    if len(keys) == 0:
+        return rows[:0], rows[:0]
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    group_start = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    heads = order[np.flatnonzero(group_start)[np.cumsum(group_start) - 1]]
+    members = order != heads
+    return rows[order[members]], rows[heads[members]]
+
+
+def _connected_components(n, first, second):
+    # Enganche y compresión de caminos: cada fila termina apuntando a la menor de su componente.
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[first], labels[second])
+        hooked = labels.copy()
+        np.minimum.at(hooked, labels[first], low)
+        np.minimum.at(hooked, labels[second], low)
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            return labels
+        labels = hooked
+
+
+def find_duplicates(data, threshold=0.8, num_perm=64, bands=16, shingle_size=5):
+    """
+    Agrupa las publicaciones casi duplicadas del catálogo limpio.
+
+    Dos filas quedan en el mismo grupo si se cumple alguna de estas condiciones (y por transitividad):
+
+    - Camino rápido: tienen el mismo código de modelo (ver `model_codes`) y
+      la misma "marca", o la misma descripción normalizada.
+    - Sus descripciones normalizadas tienen una similitud de Jaccard estimada
+      de al menos `threshold` sobre shingles de caracteres y no tienen
+      códigos de modelo distintos (las variantes de color o tamaño de un
+      producto se parecen mucho pero son productos diferentes). Los
+      candidatos se obtienen con LSH: la firma MinHash se divide en `bands`
+      bandas y solo se comparan filas que coinciden en alguna banda completa
+      (cada fila con la primera de su cubeta), por lo que el costo crece casi
+      linealmente con el número de filas en lugar de comparar todos los pares.
+
+    En cada grupo la fila canónica es la que tiene más atributos extraídos
+    (marca, sku, tipo, precio, watts, GB); en un empate, la de descripción más
+    larga y después la primera.
+
+    Args:
+        data (pd.DataFrame): Datos limpios con las columnas de `OUTPUT_COLUMNS`.
+        threshold (float): Similitud de Jaccard mínima entre descripciones.
+        num_perm (int): Largo de la firma MinHash; debe ser múltiplo de `bands`.
+        bands (int): Bandas de LSH; más bandas encuentran más candidatos con menor similitud.
+        shingle_size (int): Bytes por shingle.
+
+    Returns:
+        pd.DataFrame: Con el índice de `data`, "grupo" (número de grupo, en
+        orden de aparición) y "canonica" (si la fila es la canónica de su grupo).
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) debe ser múltiplo de bands ({bands})")
+    n = len(data)
+    rows = np.arange(n)
+    with stage("deduplicacion.normalizacion", n):
+        texts = normalize_descriptions(data["descripcion"].reset_index(drop=True))
+    with stage("deduplicacion.exactos", n):
+        first, second = [], []
+        codes = model_codes(data.reset_index(drop=True))
+        code_ids, _ = pd.factorize(codes)
+        with_code = code_ids >= 0
+        keys = _hash_values(pd.DataFrame({"marca": data["marca"].astype(object).to_numpy(), "codigo": codes})[with_code])
+        for edges in [_bucket_edges(keys, rows[with_code]), _bucket_edges(_hash_values(texts), rows)]:
+            first.append(edges[0])
+            second.append(edges[1])
+    with stage("deduplicacion.firmas", n):
+        signatures, has_shingles = minhash_signatures(texts, num_perm=num_perm, shingle_size=shingle_size)
+    with stage("deduplicacion.lsh", n):
+        candidates = rows[has_shingles]
+        width = num_perm // bands
+        for band in range(bands):
+            band_keys = _hash_values(pd.DataFrame(signatures[candidates, band * width:(band + 1) * width]))
+            member, head = _bucket_edges(band_keys, candidates)
+            similarity = (signatures[member] == signatures[head]).mean(axis=1)
+            conflict = with_code[member] & with_code[head] & (code_ids[member] != code_ids[head])
+            keep = (similarity >= threshold) & ~conflict
+            first.append(member[keep])
+            second.append(head[keep])
+    with stage("deduplicacion.grupos", n):
+        labels = _connected_components(n, np.concatenate(first), np.concatenate(second))
+        groups, _ = pd.factorize(labels)
+        score = data[_INFO_COLUMNS].notna().sum(axis=1).to_numpy()
+        length = data["descripcion"].fillna("").str.len().to_numpy()
+        order = np.lexsort((rows, -length, -score, groups))
+        canonical = np.zeros(n, dtype=bool)
+        canonical[order[np.diff(groups[order], prepend=-1) != 0]] = True  # La primera fila de cada grupo.
+    return pd.DataFrame({"grupo": groups, "canonica": canonical}, index=data.index)
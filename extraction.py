@@ -0,0 +1,500 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+from fuzzywuzzy import process, utils
+
+from instrumentation import stage
+
+
+# Lista de marcas reconocidas.
+brands = [
+    "Sony", "Samsung", "LG", "Apple", "Toshiba", "Bose", "Panasonic", "Canon", 
+    "Nikon", "Dell", "HP", "Lenovo", "Sharp", "Philips", "GE", "Microsoft", 
+    "Jabra", "Yamaha", "Onkyo", "Pioneer", "Kenwood", "Olympus", "Mac", "Garmin", "Logitech", "Whirlpool"
+    ,"Linksys", "Mitsubishi", "KitchenAid", "Motorola", "Xiaomi", "Sennheiser", "Shure", "Sharp"
+]
+
+# Diccionario de tipos simplificados y sus variantes. El orden de las claves
+# define la prioridad: gana el primer tipo con alguna coincidencia.
+tipos = {
+    "television": ["TV", "Televisor", "Smart TV", "Pantalla", "television"],
+    "audifonos": ["Auriculares", "Headphones", "Audífonos inalámbricos","audifonos","Headset"],
+    "teatro_casa": ["Home Theater", "Sistema de sonido", "Teatro en casa"],
+    "speaker": ["Altavoz", "Bocina", "Parlante", "Speaker"],
+    "notebook": ["Laptop", "Computadora portátil", "Notebook", "Computadora portatil"],
+    "manos_libres": ["Auriculares Bluetooth", "Manos libres", "Earbuds"],
+    "telefono": ["Teléfono fijo", "Línea fija", "Teléfono","Telefono fijo", "Linea fija", "Telefono"],
+    "smartphone": ["Celular", "Teléfono inteligente", "Smartphone", "Telefono inteligente",  "Telefono movil"],
+    "tablet": ["iPad", "Tablet", "Tableta electrónica","Tableta electrónica"],
+    "smartwatch": ["Reloj inteligente", "Smartwatch", "Wearable"],
+    "camara_digital": ["Cámara", "Cámara compacta", "Digital Camera","Camara", "Camara compacta", "Camera"],
+    "dron": ["Drone", "Quadcopter", "Aeronave no tripulada"],
+    "bocina_inteligente": ["Altavoz inteligente", "Smart Speaker", "Bocina con asistente"],
+    "proyector": ["Proyector", "Proyector HD", "Proyector de video"],
+    "blu_ray": ["Reproductor Blu-ray", "Blu-ray player", "Reproductor HD"],
+    "monitor": ["Pantalla", "Monitor LED", "Monitor de computadora"],
+    "router": ["Router Wi-Fi", "Router inalámbrico", "Wi-Fi Router"],
+    "consola": ["Consola de videojuegos", "Videojuegos", "Gaming Console", "Xbox", "play station", "nintendo"],
+    "smart_hub": ["Hub inteligente", "Smart Hub", "Centro domótico"],
+    "cargador": ["Power Bank", "Cargador portátil", "Bateria externa"],
+    "barra_sonido": ["Soundbar", "Barra de sonido", "Altavoz horizontal"],
+    "control_remoto": ["Control remoto", "Universal Remote", "Control IR"],
+    "camara_seguridad": ["Cámara de seguridad", "CCTV", "Cámara IP"],
+    "disco_duro": ["HDD", "SSD", "Disco duro externo"],
+    "impresora": ["Multifuncional", "Impresora", "Impresora 3D"],
+    "escaner": ["Escáner", "Escáner portátil", "Scanner"],
+    "repetidor": ["Extensor Wi-Fi", "Repetidor", "Wi-Fi Booster"],
+    "mouse": ["Ratón", "Mouse", "Mouse inalámbrico"],
+    "teclado": ["Teclado", "Teclado mecánico", "Teclado mecanico", "Keyboard"],
+    "tv_box": ["Android TV", "Apple TV", "Roku", "Fire Stick"],
+    "auriculares": ["Auriculares", "Noise Cancelling", "Auriculares Bluetooth"],
+    "microondas": ["Horno de microondas", "Microondas inteligente", "Microwave", "Microwave"],
+    "refrigerador": ["Refrigerador inteligente", "Smart Fridge", "Refrigerador"],
+    "purificador": ["Purificador de aire", "Air Purifier", "Purificador inteligente"],
+    "termostato": ["Termostato", "Smart Thermostat", "Climatizador"],
+    "luces": ["Focos inteligentes", "Smart Bulbs", "Luces LED inteligentes"],
+    "enchufe": ["Smart Plug", "Enchufe inteligente", "Tomacorriente inteligente"],
+    "altavoz_agua": ["Altavoz resistente al agua", "Bocina waterproof", "Parlante impermeable"],
+    "camara_accion": ["GoPro", "Cámara deportiva", "Action Camera"],
+    "gafas_vr": ["Gafas VR", "Lentes de realidad virtual", "Virtual Reality"],
+    "control_videojuegos": ["Gamepad", "Controlador", "Joystick"],
+    "modem": ["Modem", "Router/Modem", "Modem de alta velocidad", "Router"],
+    "bascula": ["Báscula", "Smart Scale", "Báscula inteligente"],
+    "cepillo": ["Cepillo eléctrico", "Cepillo dental", "Cepillo inteligente"],
+    "reloj": ["Despertador", "Reloj despertador", "Smart Clock"],
+    "hoverboard": ["Hoverboard", "Scooter eléctrico", "Monopatín eléctrico","Scooter electrico", "Monopatín electrico"],
+    "bicicleta": ["Bicicleta eléctrica", "E-bike", "Bicicleta con motor"],
+    "camara_web": ["Webcam", "Cámara web", "Cámara para streaming"],
+    "cortadora": ["Cortadora de cabello", "Máquina de cortar pelo", "Trimmer"],
+    "tiras_led": ["Luces LED", "Tiras LED inteligentes", "Tiras de luz"],
+    "adaptador_usb": ["Hub USB-C", "Adaptador USB-C", "Docking Station"],
+    "microfono": ["Micrófono", "Micrófono de estudio", "Micrófono condensador"],
+    "convertidor_streaming": ["Streaming Box", "Convertidor de streaming", "Media Box"],
+    "radio": ["Radio", "Radio FM", "Radio digital"],
+    "sistema_karaoke": ["Karaoke", "Sistema de karaoke", "Karaoke portátil"],
+    "control_clima": ["Control de clima", "Climatizador inteligente", "Thermostat Remote"],
+    "usb": ["USB", "Flash Drive", "memoria usb", "flash"],
+    "horno": ["Oven"],
+    "washer": ["washer", "dishwasher"],
+    "control_remoto": ["ControlRemote","Control Remote", "Control Remoto", "Control", "IR/RF", "RF"],
+    "bateria": ["Battery", "bateria"],
+    "software": ["software", "licencia", "licence"],
+    "secadora": ["Electric Dryer", "Dryer", "secadora"],
+    "Switch": ["Switcher", "Switch"],
+    "Reproductor": [ "player"],
+    "extensor": ["Expander", "extensor"],
+    "carcasa": ["case"]
+}
+
+
+# Palabras de una descripción, con la misma definición de palabra que `\b`.
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class TypeClassifier:
+    """
+    Clasificador de tipos de producto construido una sola vez a partir de un
+    diccionario de tipos.
+
+    Las palabras clave (en minúsculas) se guardan en una tabla hash indexada
+    por su primera palabra. Una coincidencia de `\\bclave\\b` empieza y
+    termina en un límite de palabra, así que su primera palabra es una
+    palabra completa de la descripción: basta con buscar cada palabra de la
+    descripción en la tabla y comprobar el texto de los pocos candidatos. El
+    costo depende del número de palabras de la descripción y no del número
+    de palabras clave.
+
+    Se conserva la regla original: gana el primer tipo del diccionario que
+    tenga alguna palabra clave en la descripción, sin importar su posición en
+    el texto.
+
+    Args:
+        datas (dict): Diccionario de tipos simplificados y variantes.
+    """
+
+    def __init__(self, datas):
+        self.tipos = list(datas)
+        self.keywords = {}
+        # Palabras clave que empiezan o terminan con un signo: `\b` no cae en un límite de
+        # palabra de la descripción y se buscan con su expresión regular.
+        self.irregular = []
+        for priority, keywords in enumerate(datas.values()):
+            for keyword in keywords:
+                lowered = keyword.lower()
+                first = re.match(r"\w+", lowered)
+                if first is None or not re.search(r"\w$", lowered):
+                    self.irregular.append((priority, re.compile(rf"\b{re.escape(keyword)}\b", re.IGNORECASE)))
+                    continue
+                candidates = self.keywords.setdefault(first.group(0), {})
+                candidates[lowered] = min(candidates.get(lowered, priority), priority)
+        for first, candidates in self.keywords.items():
+            # Candidatos por prioridad: el primero que coincide es el mejor de esa posición.
+            self.keywords[first] = sorted(candidates.items(), key=lambda candidate: candidate[1])
+
+    def classify(self, description):
+        """
+        Devuelve el tipo de producto de una descripción.
+
+        Args:
+            description (str): La descripción del producto.
+
+        Returns:
+            str: La clave del tipo de producto detectado o None si no se encuentra.
+        """
+        if not isinstance(description, str):
+            return None
+        text = description.lower()
+        best = len(self.tipos)
+        for word in _WORD_PATTERN.finditer(text):
+            for keyword, priority in self.keywords.get(word.group(0), ()):
+                if priority >= best:
+                    break
+                end = word.start() + len(keyword)
+                if text.startswith(keyword, word.start()) and (end == len(text) or not _WORD_PATTERN.match(text, end)):
+                    best = priority
+                    break
+            if best == 0:
+                break
+        for priority, pattern in self.irregular:
+            if priority < best and pattern.search(description):
+                best = priority
+        return self.tipos[best] if best < len(self.tipos) else None
+
+    def classify_series(self, descriptions):
+        """
+        Clasifica una serie completa de descripciones en una sola llamada.
+
+        Las descripciones repetidas se evalúan una única vez.
+
+        Args:
+            descriptions (pd.Series): Serie con las descripciones de los productos.
+
+        Returns:
+            pd.Series: Serie con el tipo detectado para cada fila (None si no hay coincidencia).
+        """
+        codes, uniques = pd.factorize(descriptions, use_na_sentinel=True)
+        labels = [self.classify(description) for description in uniques]
+        labels.append(None)  # El código -1 de los valores nulos apunta al último elemento.
+        result = [labels[code] for code in codes]
+        return pd.Series(result, index=descriptions.index, dtype=object, name="tipo")
+
+
+def extract_type_from_dict(description, datas=tipos):
+    """
+    Extrae el tipo de producto de una descripción utilizando un diccionario .
+
+    El clasificador compilado se construye una vez por diccionario y se reutiliza
+    en las llamadas siguientes.
+
+    Args:
+        description (str): La descripción del producto.
+        datas (dict): Diccionario de tipos simplificados y variantes
+    Returns:
+        str: La clave del tipo de producto detectado o None si no se encuentra.
+    """
+    return _get_classifier(datas).classify(description)
+
+
+_classifiers = {}
+
+
+def _get_classifier(datas):
+    key = tuple((tipo, tuple(keywords)) for tipo, keywords in datas.items())
+    if key not in _classifiers:
+        _classifiers[key] = TypeClassifier(datas)
+    return _classifiers[key]
+
+
+class BrandMatcher:
+    """
+    Buscador difuso de marcas con índice de candidatos y caché de decisiones.
+
+    Produce el mismo resultado que recorrer las palabras de la descripción con
+    `process.extractOne(word, brand_list)` y aceptar la primera con puntuación
+    mayor al umbral, pero evita comparar cada palabra contra toda la lista:
+
+    1. Búsqueda exacta (sin distinguir mayúsculas) en una tabla hash.
+    2. Prefiltro por bigramas de caracteres (o por carácter si la palabra tiene
+       una sola letra) y por longitud: con `WRatio` una marca solo puede superar
+       80 puntos si comparte al menos un bigrama con la palabra y ninguna de las
+       dos es más de 8 veces más larga que la otra.
+    3. Puntuación con `process.extractOne` solo sobre los candidatos, en el
+       orden original de la lista para conservar los desempates.
+
+    Las decisiones palabra -> marca se guardan en una caché LRU.
+
+    Args:
+        brand_list (list): Lista de marcas reconocidas.
+        threshold (int): Puntuación mínima (exclusiva) para aceptar una marca.
+        cache_size (int): Número máximo de palabras guardadas en la caché.
+    """
+
+    def __init__(self, brand_list, threshold=80, cache_size=65536):
+        self.brand_list = list(brand_list)
+        self.threshold = threshold
+        self._keys = [self._normalize(brand) for brand in self.brand_list]
+        self._exact = {}
+        self._grams = {}
+        for position, key in enumerate(self._keys):
+            self._exact.setdefault(key, self.brand_list[position])
+            for gram in self._ngrams(key, 1) | self._ngrams(key, 2):
+                self._grams.setdefault(gram, []).append(position)
+        self.match_token = lru_cache(maxsize=cache_size)(self._match_token)
+
+    @staticmethod
+    def _normalize(word):
+        # Misma normalización que aplican `process.extractOne` y `fuzz.WRatio`.
+        return utils.full_process(utils.full_process(word), force_ascii=True)
+
+    @staticmethod
+    def _ngrams(key, n):
+        return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+    def _candidates(self, key):
+        if " " in key:
+            # Los comparadores por tokens no cumplen la cota de bigramas; se evalúa toda la lista.
+            return self.brand_list
+        positions = set()
+        for gram in self._ngrams(key, 1 if len(key) == 1 else 2):
+            positions.update(self._grams.get(gram, ()))
+        return [
+            self.brand_list[position]
+            for position in sorted(positions)
+            if max(len(key), len(self._keys[position])) <= 8 * min(len(key), len(self._keys[position]))
+        ]
+
+    def _match_token(self, word):
+        key = self._normalize(word)
+        if not key:
+            return None
+        if key in self._exact:
+            return self._exact[key]
+        candidates = self._candidates(key)
+        if not candidates:
+            return None
+        matched_brand, score = process.extractOne(word, candidates)
+        return matched_brand if score > self.threshold else None
+
+    def extract(self, description):
+        """
+        Extrae la marca de una descripción de producto.
+
+        Args:
+            description (str): Descripcion del produto.
+
+        Returns:
+            str: La marca detectada u "other" si no se encuentra ninguna marca.
+        """
+        if not description or pd.isna(description):
+            return None
+        for word in re.findall(r"\b\w+\b", description):
+            matched_brand = self.match_token(word)
+            if matched_brand is not None:
+                return matched_brand
+        return "other"
+
+    def extract_series(self, descriptions):
+        """
+        Extrae la marca de una serie completa de descripciones.
+
+        Args:
+            descriptions (pd.Series): Serie con las descripciones de los productos.
+
+        Returns:
+            pd.Series: Serie con la marca detectada para cada fila.
+        """
+        return pd.Series(
+            [self.extract(description) for description in descriptions],
+            index=descriptions.index, dtype=object, name="marca",
+        )
+
+    def cache_info(self):
+        """
+        Devuelve las estadísticas de la caché de palabras (aciertos, fallos y tamaño).
+        """
+        return self.match_token.cache_info()
+
+
+def extract_brand(description, brand_list=brands):
+    """
+    Extrae la marca de una descripción de producto.
+
+    Args:
+        description (str): Descripcion del produto.
+        brand_list (list): Listas de marecas reconocidas.
+
+    Returns:
+        str: La marca detectada u "other" si no se encuentra ninguna marca.
+    """
+    return _get_brand_matcher(tuple(brand_list)).extract(description)
+
+
+@lru_cache(maxsize=None)
+def _get_brand_matcher(brand_list):
+    return BrandMatcher(brand_list)
+
+
+# Expresiones regulares de los atributos numéricos y del SKU.
+PRICE_PATTERN = r"\$\s?(\d+(?:,\d{3})*(?:\.\d{1,2})?)"
+WATTS_PATTERN = r"\b(\d+)\s*(?:W(?:atts)?|Wats)\b"
+GB_PATTERN = r"\b(\d+(?:\.\d+)?)\s*GB\b"
+SKU_PATTERN = r"\b[a-zA-Z]{1,4}\d{1,4}\b"
+CLEAN_PATTERN = r'\s+|\n|\t|\r|\\|\b|\f|\||,|;'
+
+# Columnas del archivo de salida, en orden.
+OUTPUT_COLUMNS = ["marca", "sku", "tipo", "precio", "watts", "GB", "descripcion"]
+
+# Las cuatro búsquedas combinadas en una sola expresión: cada lookahead parte del
+# inicio del texto y captura la primera coincidencia de su patrón, si existe.
+_FUSED_PATTERN = (
+    r"(?s)^"
+    rf"(?=(?:.*?{PRICE_PATTERN})?)"
+    rf"(?=(?:.*?(?i:{WATTS_PATTERN}))?)"
+    rf"(?=(?:.*?(?i:{GB_PATTERN}))?)"
+    rf"(?=(?:.*?({SKU_PATTERN}))?)"
+)
+
+
+def extract_price(description):
+    """
+    Extrae el precio de una descripción de producto utilizando expresiones regulares.
+
+    Args:
+        description (str): La descripción del producto.
+
+    Returns:
+        str: El precio detectado o None si no se encuentra.
+    """
+    # Buscar patrones de precios como "$99" o "$ 1235"
+    price_match = re.search(PRICE_PATTERN, description)
+    if price_match:
+        return price_match.group(1).strip()
+    return None
+
+
+def extract_watts(description):
+    """
+    Extrae la potencia en watts de una descripción de producto utilizando expresiones regulares.
+
+    Args:
+        description (str): La descripción del producto.
+
+    Returns:
+        str: La potencia detectada o None si no se encuentra.
+    """
+    # Buscar patrones como "500 Watts", "100W", "12Watts", "5 W", "5 Wats"
+    watts_match = re.search(WATTS_PATTERN, description, re.IGNORECASE)
+    if watts_match:
+        return watts_match.group(1).strip()
+    return None
+
+
+def extract_gb(description):
+    """
+    Extrae la capacidad en GB de una descripción de producto utilizando expresiones regulares.
+
+    Args:
+        description (str): La descripción del producto.
+
+    Returns:
+        str: La capacidad en GB detectada o None si no se encuentra.
+    """
+    # Buscar patrones como "32GB", "128GB", "64 GB", "4.7 GB"
+    gb_match = re.search(GB_PATTERN, description, re.IGNORECASE)
+    if gb_match:
+        return gb_match.group(1).strip()
+    return None
+
+
+def extract_sku(description):
+    """
+    Extrae el SKU (ID único) de una descripción de producto utilizando expresiones regulares.
+
+    Args:
+        description (str): La descripción del producto.
+
+    Returns:
+        str: El SKU detectado o None si no se encuentra.
+    """
+    # Buscar cadenas alfanuméricas que comiencen con 1-4 letras seguidas de 1-4 números
+    sku_match = re.search(SKU_PATTERN, description)
+    if sku_match and len(sku_match.group(0)) > 4:
+        return sku_match.group(0).strip()
+    return None
+
+
+def clean_text(text:str) -> str:
+    """
+    Eliminar espacios en blanco adicionales, saltos de línea, tabulaciones y caracteres especiales
+    Args:
+    text (str): cadena donde se quiere suprimir los caracteres especiales
+
+    Returns:
+        str: cadena sin caracteres especiales
+    """
+    cleaned_text = re.sub(CLEAN_PATTERN, ' ', text)  # Reemplazar espacios en blanco, caracteres especiales y ',;'
+    return ' '.join(cleaned_text.split())
+
+
+def extract_numeric_attributes(descriptions):
+    """
+    Extrae precio, watts, GB y SKU de una serie de descripciones en una sola pasada vectorizada.
+
+    Equivale a aplicar `extract_price`, `extract_watts`, `extract_gb` y
+    `extract_sku` fila por fila.
+
+    Args:
+        descriptions (pd.Series): Serie con las descripciones de los productos.
+
+    Returns:
+        pd.DataFrame: Columnas "precio", "watts", "GB" y "sku" (NaN si no se encuentran).
+    """
+    # Con tipo object pandas usa el módulo `re`, igual que las funciones por fila.
+    attributes = descriptions.astype(object).str.extract(_FUSED_PATTERN)
+    attributes.columns = ["precio", "watts", "GB", "sku"]
+    # Igual que `extract_sku`: solo se acepta la primera coincidencia si tiene más de 4 caracteres.
+    attributes["sku"] = attributes["sku"].where(attributes["sku"].str.len() > 4)
+    return attributes
+
+
+def clean_text_series(texts):
+    """
+    Versión vectorizada de `clean_text` para una serie completa.
+
+    Args:
+        texts (pd.Series): Serie de cadenas a limpiar.
+
+    Returns:
+        pd.Series: Serie con las cadenas sin caracteres especiales.
+    """
+    # Con tipo object pandas usa el módulo `re`; otros motores tratan distinto la coincidencia vacía de `\b`.
+    return texts.astype(object).str.replace(CLEAN_PATTERN, ' ', regex=True).str.split().str.join(' ')
+
+
+def clean_catalog(df, brand_matcher=None, classifier=None):
+    """
+    Ejecuta todo el proceso de limpieza sobre un DataFrame con la columna "descripcion".
+
+    Args:
+        df (pd.DataFrame): Datos de entrada con la columna "descripcion".
+        brand_matcher (BrandMatcher): Buscador de marcas; por defecto uno construido con `brands`.
+        classifier (TypeClassifier): Clasificador de tipos; por defecto uno construido con `tipos`.
+
+    Returns:
+        pd.DataFrame: Datos limpios con las columnas de `OUTPUT_COLUMNS`.
+    """
+    brand_matcher = brand_matcher or _get_brand_matcher(tuple(brands))
+    classifier = classifier or _get_classifier(tipos)
+    descriptions = df["descripcion"]
+    rows = len(descriptions)
+
+    with stage("extraccion.numericos", rows):
+        data = extract_numeric_attributes(descriptions)
+    with stage("extraccion.marca", rows):
+        data["marca"] = brand_matcher.extract_series(descriptions)
+    with stage("extraccion.tipo", rows):
+        data["tipo"] = classifier.classify_series(descriptions)
+    with stage("extraccion.descripcion", rows):
+        data["descripcion"] = clean_text_series(descriptions)
+    return data[OUTPUT_COLUMNS]
@@ -0,0 +1,121 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from extraction import (
+    CLEAN_PATTERN, GB_PATTERN, OUTPUT_COLUMNS, PRICE_PATTERN, SKU_PATTERN, WATTS_PATTERN, BrandMatcher,
+    TypeClassifier, brands, clean_text_series, extract_numeric_attributes, tipos,
+)
+
+
+def _rule_version(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:12]
+
+
+class ExtractionCache:
+    """
+    Caché en disco de atributos extraídos, indexada por el hash del texto de "descripcion".
+
+    Los atributos se agrupan según las reglas de las que dependen (marca, tipo,
+    atributos numéricos y descripción limpia). Cada grupo se guarda en su propio
+    archivo, cuyo nombre incluye una versión calculada a partir de sus reglas:
+    al cambiar la lista de marcas solo se recalcula la columna "marca", al
+    cambiar `tipos` solo "tipo", y así sucesivamente. Dentro de cada grupo solo
+    se procesan las descripciones que no estaban en la caché, y las
+    descripciones que ya no están en la entrada se eliminan, de modo que la
+    caché no crece más allá del catálogo actual. Un grupo solo se vuelve a
+    escribir si cambió.
+
+    Args:
+        directory (str): Carpeta donde se guardan los archivos de la caché.
+        brand_matcher (BrandMatcher): Buscador de marcas; por defecto uno construido con `brands`.
+        classifier (TypeClassifier): Clasificador de tipos; por defecto uno construido con `tipos`.
+    """
+
+    def __init__(self, directory=".extraction_cache", brand_matcher=None, classifier=None):
+        self.directory = directory
+        brand_matcher = brand_matcher or BrandMatcher(brands)
+        classifier = classifier or TypeClassifier(tipos)
+        # grupo -> (versión de las reglas, función que calcula sus columnas)
+        self.groups = {
+            "marca": (
+                _rule_version(brand_matcher.brand_list, brand_matcher.threshold),
+                lambda descriptions: brand_matcher.extract_series(descriptions).to_frame(),
+            ),
+            "tipo": (
+                _rule_version(classifier.tipos, sorted(classifier.keywords.items()),
+                              [(priority, pattern.pattern) for priority, pattern in classifier.irregular]),
+                lambda descriptions: classifier.classify_series(descriptions).to_frame(),
+            ),
+            "numericos": (
+                _rule_version(PRICE_PATTERN, WATTS_PATTERN, GB_PATTERN, SKU_PATTERN),
+                extract_numeric_attributes,
+            ),
+            "descripcion": (
+                _rule_version(CLEAN_PATTERN),
+                lambda descriptions: clean_text_series(descriptions).to_frame("descripcion"),
+            ),
+        }
+        self.stats = {}
+
+    def _path(self, group, version):
+        return os.path.join(self.directory, f"{group}-{version}.pkl")
+
+    def _load(self, group, version):
+        path = self._path(group, version)
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+        return None
+
+    def _save(self, group, version, table):
+        os.makedirs(self.directory, exist_ok=True)
+        # Las versiones anteriores del mismo grupo ya no se pueden reutilizar.
+        for name in os.listdir(self.directory):
+            if name.startswith(f"{group}-") and name != os.path.basename(self._path(group, version)):
+                os.remove(os.path.join(self.directory, name))
+        table.to_pickle(self._path(group, version))
+
+    def clean(self, df):
+        """
+        Equivalente a `clean_catalog`, pero reutilizando los atributos guardados en la caché.
+
+        Después de cada llamada, `stats` contiene las filas reutilizadas y
+        recalculadas en total y por grupo.
+
+        Args:
+            df (pd.DataFrame): Datos de entrada con la columna "descripcion".
+
+        Returns:
+            pd.DataFrame: Datos limpios con las columnas de `OUTPUT_COLUMNS`.
+        """
+        descriptions = df["descripcion"]
+        keys = pd.util.hash_pandas_object(descriptions, index=False).to_numpy()
+        recomputed_rows = pd.Series(False, index=descriptions.index)
+        columns = {}
+        self.stats = {"grupos": {}}
+
+        for group, (version, compute) in self.groups.items():
+            table = self._load(group, version)
+            missing = ~pd.Series(keys, index=descriptions.index).isin(table.index if table is not None else [])
+            stale = table is not None and not table.index.isin(keys).all()
+            if stale:
+                table = table[table.index.isin(keys)]  # Descripciones que ya no están en la entrada.
+            if missing.any():
+                new = descriptions[missing]
+                new = new[~pd.Index(keys[missing.to_numpy()]).duplicated()]
+                computed = compute(new)
+                computed.index = pd.util.hash_pandas_object(new, index=False).to_numpy()
+                table = computed if table is None else pd.concat([table, computed])
+            if missing.any() or stale:
+                self._save(group, version, table)
+            recomputed_rows |= missing
+            self.stats["grupos"][group] = {"reutilizadas": int((~missing).sum()), "recalculadas": int(missing.sum())}
+            for column in table.columns:
+                # Se conserva el tipo de la tabla: pandas inferiría texto donde `clean_catalog` deja objetos.
+                columns[column] = pd.Series(table[column].reindex(keys).to_numpy(), index=descriptions.index,
+                                            dtype=table[column].dtype)
+
+        self.stats["reutilizadas"] = int((~recomputed_rows).sum())
+        self.stats["recalculadas"] = int(recomputed_rows.sum())
+        return pd.DataFrame(columns, index=descriptions.index)[OUTPUT_COLUMNS]
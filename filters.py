@@ -0,0 +1,119 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def _key(value):
+    # NaN no es igual a sí mismo; se usa None como clave única para los valores nulos.
+    return None if pd.isna(value) else value
+
+
+class FilterEngine:
+    """
+    Motor de filtros de la barra lateral construido una vez por versión de los datos.
+
+    - "marca" y "tipo": para cada valor se guarda la lista ordenada de filas
+      que lo contienen (un bitmap disperso), de modo que una selección se
+      resuelve uniendo las listas de los valores elegidos (o de los excluidos,
+      si son menos) sin recorrer el DataFrame.
+    - "precio": las filas ordenadas por precio; un rango se resuelve con dos
+      búsquedas binarias.
+    - Las combinaciones de filtros recientes se guardan en una caché LRU.
+
+    Los resultados son arreglos ordenados de posiciones de fila, que se
+    aplican con `data.iloc[rows]`. Igual que los filtros originales, los
+    valores nulos de "marca" o "tipo" solo pasan si NaN está seleccionado y
+    las filas sin precio no pasan el filtro de precio (pero sí pasan si no se
+    indica un rango).
+
+    Args:
+        data (pd.DataFrame): Datos tipados con las columnas "marca", "tipo" y "precio".
+        cache_size (int): Número de combinaciones de filtros guardadas.
+    """
+
+    def __init__(self, data, cache_size=256):
+        self.n_rows = len(data)
+        self._value_rows = {column: self._index_values(data[column]) for column in ["marca", "tipo"]}
+        prices = data["precio"].to_numpy(dtype="float64", na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(prices))
+        order = np.argsort(prices[valid], kind="stable")
+        self._price_rows = valid[order]
+        self._sorted_prices = prices[valid][order]
+        self.filter = lru_cache(maxsize=cache_size)(self._filter)
+
+    @staticmethod
+    def _index_values(values):
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        return {_key(value): order[bounds[code]:bounds[code + 1]] for code, value in enumerate(uniques)}
+
+    def value_rows(self, column, selected):
+        """
+        Filas cuyo valor de `column` está en `selected`.
+
+        Args:
+            column (str): "marca" o "tipo".
+            selected (iterable): Valores seleccionados.
+
+        Returns:
+            np.ndarray: Posiciones de fila ordenadas, o None si la selección incluye todos los valores.
+        """
+        rows_by_value = self._value_rows[column]
+        selected = {_key(value) for value in selected} & rows_by_value.keys()
+        if len(selected) == len(rows_by_value):
+            return None
+        excluded = rows_by_value.keys() - selected
+        if sum(len(rows_by_value[value]) for value in excluded) < sum(len(rows_by_value[value]) for value in selected):
+            mask = np.ones(self.n_rows, dtype=bool)
+            for value in excluded:
+                mask[rows_by_value[value]] = False
+            return np.flatnonzero(mask)
+        if not selected:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate([rows_by_value[value] for value in selected]))
+
+    def price_rows(self, low, high):
+        """
+        Filas con precio dentro de [low, high].
+
+        Returns:
+            np.ndarray: Posiciones de fila ordenadas.
+        """
+        start = np.searchsorted(self._sorted_prices, low, side="left")
+        end = np.searchsorted(self._sorted_prices, high, side="right")
+        return np.sort(self._price_rows[start:end])
+
+    def _filter(self, brands, types, price_range):
+        candidates = [
+            self.value_rows("marca", brands),
+            self.value_rows("tipo", types),
+            None if price_range is None else self.price_rows(*price_range),
+        ]
+        candidates = sorted((rows for rows in candidates if rows is not None), key=len)
+        if not candidates:
+            candidates = [np.arange(self.n_rows)]
+        rows = candidates[0]
+        for other in candidates[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        rows.setflags(write=False)  # El resultado se comparte a través de la caché.
+        return rows
+
+    def apply(self, brands, types, price_range):
+        """
+        Filas que cumplen los filtros de marca, tipo y rango de precios.
+
+        Args:
+            brands (iterable): Marcas seleccionadas.
+            types (iterable): Tipos seleccionados.
+            price_range (tuple): Precio mínimo y máximo (inclusive); None para no filtrar por precio.
+
+        Returns:
+            np.ndarray: Posiciones de fila ordenadas (de solo lectura).
+        """
+        return self.filter(
+            frozenset(_key(value) for value in brands),
+            frozenset(_key(value) for value in types),
+            None if price_range is None else tuple(price_range),
+        )
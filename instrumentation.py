@@ -0,0 +1,304 @@
+import collections
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # No disponible en Windows.
+    resource = None
+
+
+# Cada registro de etapa se emite como una línea JSON en este logger (nivel INFO).
+logger = logging.getLogger("instrumentation")
+
+# Registrador activo en el contexto actual (un hilo de Streamlit, una ejecución del pipeline).
+_current_recorder = contextvars.ContextVar("stage_recorder", default=None)
+
+
+def peak_memory():
+    """
+    Pico de memoria residente del proceso en bytes (`ru_maxrss`), o None si no está disponible.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss está en KiB en Linux y en bytes en macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def current_memory():
+    """
+    Memoria residente actual del proceso en bytes.
+
+    Usa /proc/self/statm en Linux; en otros sistemas devuelve el pico de
+    memoria residente (ver `peak_memory`), o None si tampoco está disponible.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return peak_memory()
+
+
+class StageRecorder:
+    """
+    Lista de las etapas medidas durante una ejecución.
+
+    Cada registro es un dict con "etapa", "segundos", "filas" (o None),
+    "filas_por_segundo", "memoria_delta" (bytes de memoria residente ganados
+    durante la etapa) y "inicio" (segundos desde que se creó el registrador).
+    """
+
+    def __init__(self):
+        self.records = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def elapsed(self):
+        """
+        Segundos desde que se creó el registrador.
+        """
+        return time.perf_counter() - self._origin
+
+    def to_json(self):
+        """
+        Los registros como texto JSON.
+        """
+        return json.dumps(self.records, ensure_ascii=False)
+
+    def summary(self):
+        """
+        Tiempo total, filas y número de ejecuciones por etapa, de la más lenta a la más rápida.
+
+        Returns:
+            list: Un dict por etapa con "etapa", "llamadas", "segundos", "filas" y "memoria_delta".
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record["etapa"], {
+                "etapa": record["etapa"], "llamadas": 0, "segundos": 0.0, "filas": None, "memoria_delta": None,
+            })
+            total["llamadas"] += 1
+            total["segundos"] += record["segundos"]
+            for key in ["filas", "memoria_delta"]:
+                if record[key] is not None:
+                    total[key] = (total[key] or 0) + record[key]
+        return sorted(totals.values(), key=lambda total: total["segundos"], reverse=True)
+
+
+def start_recording():
+    """
+    Activa un registrador nuevo en el contexto actual, por ejemplo al inicio de
+    cada ejecución de un script de Streamlit.
+
+    Returns:
+        StageRecorder: El registrador activo.
+    """
+    recorder = StageRecorder()
+    _current_recorder.set(recorder)
+    return recorder
+
+
+@contextmanager
+def recording():
+    """
+    Activa un registrador nuevo solo para las etapas ejecutadas dentro del bloque.
+
+    Yields:
+        StageRecorder: El registrador, con los registros de todas las etapas del bloque.
+    """
+    recorder = StageRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Mide una etapa: tiempo de reloj, filas procesadas y variación de memoria.
+
+    El registro se agrega al registrador activo (ver `recording`) y se emite
+    como JSON en `logger`. Si las filas solo se conocen al final, se pueden
+    asignar en el registro que entrega el bloque::
+
+        with stage("carga") as record:
+            data = load_dataset()
+            record["filas"] = len(data)
+
+    Args:
+        name (str): Nombre de la etapa, por ejemplo "extraccion.marca".
+        rows (int): Filas procesadas, si se conocen de antemano.
+
+    Yields:
+        dict: El registro de la etapa.
+    """
+    record = {"etapa": name, "filas": rows}
+    recorder = _current_recorder.get()
+    memory_before = current_memory()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        end = time.perf_counter()
+        memory_after = current_memory()
+        record["segundos"] = end - start
+        record["filas_por_segundo"] = record["filas"] / record["segundos"] if record["filas"] and record["segundos"] else None
+        record["memoria_delta"] = memory_after - memory_before if memory_before is not None else None
+        if recorder is not None:
+            record["inicio"] = start - recorder._origin
+            recorder.add(record)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def log_to_file(path):
+    """
+    Escribe los registros de etapa como líneas JSON en `path` (se agregan al final).
+
+    Returns:
+        logging.Handler: El manejador agregado a `logger`.
+    """
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo que escribe pilas en formato "folded".
+
+    Un hilo aparte toma cada `interval` segundos la pila del hilo perfilado
+    (por defecto el que llama a `start`) y cuenta cuántas veces aparece cada
+    pila. El resultado, una línea "func_a;func_b;func_c cuenta" por pila, se
+    puede abrir con flamegraph.pl, speedscope o inferno para obtener un
+    flame graph. No requiere instrumentar el código y su costo depende solo
+    del intervalo.
+
+    Args:
+        interval (float): Segundos entre muestras.
+        thread_id (int): Hilo a perfilar; por defecto el que llama a `start`.
+    """
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break  # El hilo perfilado ya terminó: no queda nada que muestrear.
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def folded(self):
+        """
+        Las pilas muestreadas en formato folded, de la más frecuente a la menos frecuente.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(self.folded())
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def debug_enabled():
+    """
+    Si el panel de depuración está activado, con `?debug=1` en la URL o la variable de entorno DASHBOARD_DEBUG=1.
+    """
+    import streamlit as st
+
+    return os.environ.get("DASHBOARD_DEBUG") == "1" or st.query_params.get("debug") == "1"
+
+
+def start_debug_profiler():
+    """
+    Inicia el perfilador por muestreo si el panel de depuración está activo y la URL incluye `?perfil=1`.
+
+    Antes detiene el perfilador que haya dejado en marcha una ejecución
+    anterior de la sesión; además, el hilo de muestreo termina solo cuando
+    termina el hilo perfilado.
+
+    Returns:
+        SamplingProfiler: El perfilador en marcha, o None.
+    """
+    import streamlit as st
+
+    # Una ejecución anterior de la sesión que no llegó a `render_debug_panel` (por una excepción,
+    # `st.stop` o una nueva ejecución) pudo dejar su perfilador en marcha.
+    previous = st.session_state.pop("perfilador", None)
+    if previous is not None:
+        previous.stop()
+    if debug_enabled() and st.query_params.get("perfil") == "1":
+        profiler = st.session_state["perfilador"] = SamplingProfiler().start()
+        return profiler
+    return None
+
+
+def render_debug_panel(recorder, memory=None, profiler=None):
+    """
+    Muestra en la barra lateral de Streamlit las etapas de la ejecución actual.
+
+    Args:
+        recorder (StageRecorder): Registrador de la ejecución.
+        memory (dict): Uso de memoria adicional a mostrar (por ejemplo `SharedDataset.memory_usage`).
+        profiler (SamplingProfiler): Perfilador de la ejecución; se detiene y se ofrece su salida.
+    """
+    import streamlit as st
+
+    with st.sidebar.expander("Depuración: etapas", expanded=True):
+        st.write(f"Ejecución: {recorder.elapsed():.3f} s")
+        st.dataframe(recorder.summary(), hide_index=True)
+        if memory is not None:
+            st.json(memory)
+        st.download_button("Descargar JSON", recorder.to_json(), file_name="etapas.json", mime="application/json")
+        if profiler is not None:
+            profiler.stop()
+            st.download_button("Descargar perfil (folded)", profiler.folded(), file_name="perfil.folded", mime="text/plain")
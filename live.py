@@ -0,0 +1,214 @@
+import hashlib
+import io
+import os
+import threading
+
+import pandas as pd
+
+from dataset import CSV_PATH
+
+
+# Bytes finales del contenido ya leído que se comparan para detectar si el archivo solo creció.
+_TAIL_BYTES = 4096
+
+
+def file_signature(path):
+    """
+    Fecha de modificación (ns) y tamaño de un archivo; cambia cuando el archivo se modifica.
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class LiveCounts:
+    """
+    Conteos por `by` del CSV de datos limpios que se actualizan con cada cambio del archivo.
+
+    `refresh` compara la firma del archivo (fecha y tamaño) y, si cambió, solo
+    procesa la diferencia:
+
+    - Si el archivo creció y los últimos bytes ya leídos no cambiaron, las
+      filas nuevas se leen desde la posición anterior (un archivo al que el
+      proceso de carga agrega filas cada hora). Una última línea incompleta se
+      deja para la siguiente lectura.
+    - En otro caso (el pipeline reescribió el archivo) se vuelve a contar y
+      el cambio se obtiene comparando los hashes de las filas con los de la
+      versión anterior: una fila modificada cuenta como eliminada y agregada.
+
+    Se comparte entre los documentos del servidor de Bokeh (ver
+    `shared_live_counts` y live_server.py); cada documento compara `version`
+    con la última que dibujó y aplica solo los cambios del ranking.
+
+    Args:
+        path (str): Ruta del CSV de datos limpios.
+        by (str): Columna por la que se cuenta, por ejemplo "marca".
+    """
+
+    def __init__(self, path=CSV_PATH, by="marca"):
+        self.path = path
+        self.by = by
+        self.version = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _read(self, source, **kwargs):
+        # Todo como texto: los hashes de las filas no dependen de la conversión de tipos.
+        return pd.read_csv(source, dtype=str, keep_default_na=False, **kwargs)
+
+    def _rows(self, data):
+        # Hash de cada fila y su valor de `by` (los vacíos son nulos, como en los datos tipados).
+        return pd.DataFrame({
+            "hash": pd.util.hash_pandas_object(data, index=False).to_numpy(),
+            self.by: data[self.by].replace("", None).to_numpy(),
+        })
+
+    def _load(self):
+        with open(self.path, "rb") as source:
+            content = source.read()
+        self.signature = file_signature(self.path)
+        self._header = content[:content.index(b"\n") + 1] if b"\n" in content else content
+        self._offset = content.rindex(b"\n") + 1 if b"\n" in content else 0
+        self._tail = _digest(content[max(0, self._offset - _TAIL_BYTES):self._offset])
+        data = self._read(io.BytesIO(content[:self._offset]))
+        self._row_hashes = self._rows(data)
+        self.counts = self._row_hashes[self.by].value_counts(sort=False, dropna=True)
+        self.counts = self.counts.reindex(pd.unique(self._row_hashes[self.by].dropna()))  # Orden de aparición.
+        self.total = len(data)
+
+    def _apply(self, delta):
+        delta = delta[delta != 0]
+        index = self.counts.index.append(delta.index.difference(self.counts.index, sort=False))
+        counts = self.counts.reindex(index, fill_value=0) + delta.reindex(index, fill_value=0)
+        self.counts = counts[counts > 0].astype("int64")
+
+    def _append(self, size):
+        # Lee solo los bytes agregados desde la última lectura, hasta la última línea completa.
+        with open(self.path, "rb") as source:
+            source.seek(max(0, self._offset - _TAIL_BYTES))
+            tail = source.read(self._offset - max(0, self._offset - _TAIL_BYTES))
+            if _digest(tail) != self._tail:
+                return None
+            added = source.read(size - self._offset)
+        complete = added.rindex(b"\n") + 1 if b"\n" in added else 0
+        if not complete:
+            return pd.DataFrame(columns=["hash", self.by])
+        data = self._read(io.BytesIO(self._header + added[:complete]))
+        self._offset += complete
+        self._tail = _digest((tail + added[:complete])[-_TAIL_BYTES:])
+        return self._rows(data)
+
+    def refresh(self):
+        """
+        Incorpora los cambios del archivo desde la última llamada.
+
+        Returns:
+            pd.Series: Cambio de los conteos por valor de `by` (vacío si no hubo cambios).
+        """
+        with self._lock:
+            signature = file_signature(self.path)
+            if signature == self.signature:
+                return pd.Series(dtype="int64")
+            added = self._append(signature[1]) if signature[1] > self._offset else None
+            if added is not None:
+                self._row_hashes = pd.concat([self._row_hashes, added], ignore_index=True)
+                delta = added[self.by].value_counts(sort=False)
+                self._apply(delta)
+                self.total += len(added)
+                self.signature = signature
+            else:
+                previous = self._row_hashes
+                self._load()
+                # Multiconjuntos de filas: cada fila agregada suma y cada fila eliminada resta.
+                pairs = pd.concat([self._row_hashes.assign(cambio=1), previous.assign(cambio=-1)], ignore_index=True)
+                changes = pairs.groupby(["hash", self.by], dropna=False, sort=False)["cambio"].sum()
+                delta = changes[changes != 0].groupby(level=self.by, dropna=True, sort=False).sum()
+            self.version += 1
+            return delta[delta != 0]
+
+    def top(self, n=10):
+        """
+        Los `n` valores más frecuentes, con los empates en orden de aparición (como `AggregateCube.top`).
+
+        Returns:
+            pd.Series: Conteo por valor, de mayor a menor.
+        """
+        with self._lock:
+            return self.counts.sort_values(ascending=False, kind="stable").head(n)
+
+
+# LiveCounts compartidos por todos los documentos del proceso, por (ruta, columna).
+_shared_counts = {}
+_shared_lock = threading.Lock()
+
+
+def shared_live_counts(path=CSV_PATH, by="marca"):
+    """
+    `LiveCounts` de un archivo y columna, uno solo por proceso.
+
+    El servidor de Bokeh vuelve a ejecutar el script de la aplicación en cada
+    sesión, pero los módulos importados se comparten: así todas las sesiones
+    leen cada cambio del archivo una sola vez.
+    """
+    key = (os.path.abspath(path), by)
+    with _shared_lock:
+        if key not in _shared_counts:
+            _shared_counts[key] = LiveCounts(path, by=by)
+        return _shared_counts[key]
+
+
+def ranking_figure(source, factors, title, names="marcas", values="cantidad", **kwargs):
+    """
+    Gráfico de barras de Bokeh de un ranking, con las columnas `names` y `values` de `source`.
+    """
+    from bokeh.plotting import figure
+
+    p = figure(x_range=[str(factor) for factor in factors], title=title, toolbar_location=None, tools="", **kwargs)
+    p.vbar(x=names, top=values, width=0.9, source=source)
+    p.xgrid.grid_line_color = None
+    p.y_range.start = 0
+    return p
+
+
+def update_ranking_source(source, x_range, ranking, names="marcas", values="cantidad"):
+    """
+    Lleva un gráfico de barras de Bokeh a un nuevo ranking modificando solo lo que cambió.
+
+    Las posiciones cuyo nombre o valor cambió se actualizan con
+    `ColumnDataSource.patch`, las posiciones nuevas se agregan con `stream` y
+    las categorías del eje se reemplazan solo si cambiaron. La fuente solo se
+    reemplaza completa si el ranking se acorta.
+
+    Args:
+        source (ColumnDataSource): Fuente con las columnas `names` y `values`.
+        x_range (FactorRange): Eje de categorías del gráfico.
+        ranking (pd.Series): Nuevo ranking, valor por nombre.
+
+    Returns:
+        bool: Si hubo cambios.
+    """
+    new_names = [str(name) for name in ranking.index]
+    new_values = [int(value) for value in ranking.to_numpy()]
+    old_names = list(source.data[names])
+    old_values = list(source.data[values])
+    if new_names == old_names and new_values == old_values:
+        return False
+    if len(new_names) < len(old_names):
+        source.data = {names: new_names, values: new_values}
+    else:
+        common = range(len(old_names))
+        patches = {
+            names: [(i, new_names[i]) for i in common if new_names[i] != old_names[i]],
+            values: [(i, new_values[i]) for i in common if new_values[i] != old_values[i]],
+        }
+        patches = {column: changes for column, changes in patches.items() if changes}
+        if patches:
+            source.patch(patches)
+        if len(new_names) > len(old_names):
+            source.stream({names: new_names[len(old_names):], values: new_values[len(old_names):]})
+    if list(x_range.factors) != new_names:
+        x_range.factors = new_names
+    return True
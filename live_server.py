@@ -0,0 +1,66 @@
+# Gráficos en vivo de app_bokeh.py, servidos por un servidor de Bokeh:
+#
+#     bokeh serve live_server.py --allow-websocket-origin=localhost:8501
+#
+# Cada pestaña abierta es un documento del servidor. Una función periódica revisa
+# datos_limpios.csv (ver `live.LiveCounts`) y solo envía al navegador lo que cambió, con
+# `ColumnDataSource.patch`/`stream`: el gráfico no se vuelve a crear y conserva la vista.
+# Argumento de la URL: `intervalo`, segundos entre revisiones (por defecto 60).
+import datetime
+
+from bokeh.io import curdoc
+from bokeh.layouts import column
+from bokeh.models import ColumnDataSource, Div
+from bokeh.plotting import figure
+
+from dataset import CSV_PATH
+from live import ranking_figure, shared_live_counts, update_ranking_source
+
+
+def describe_changes(delta, n=5):
+    """
+    Texto con los `n` cambios más grandes de un conteo, por ejemplo "Sony +2, Bose -1".
+    """
+    largest = delta.abs().sort_values(ascending=False, kind="stable").index[:n]
+    return ", ".join(f"{value} {int(delta[value]):+d}" for value in largest)
+
+
+doc = curdoc()
+arguments = doc.session_context.request.arguments if doc.session_context and doc.session_context.request else {}
+interval = arguments.get("intervalo", [b"60"])[0]
+interval = max(5, int(interval)) if interval.isdigit() else 60
+
+counts = shared_live_counts(CSV_PATH, by="marca")
+counts.refresh()
+now = datetime.datetime.now()
+top_brands = counts.top(10)
+source = ColumnDataSource(data=dict(marcas=[str(brand) for brand in top_brands.index], cantidad=top_brands.tolist()))
+ranking = ranking_figure(source, top_brands.index, "Marcas Más Populares", sizing_mode="stretch_width")
+history = ColumnDataSource(data=dict(hora=[now], productos=[counts.total]))
+history_figure = figure(x_axis_type="datetime", title="Productos en el Catálogo", toolbar_location=None, tools="",
+                        height=250, sizing_mode="stretch_width")
+history_figure.line(x='hora', y='productos', source=history)
+history_figure.scatter(x='hora', y='productos', source=history)
+status = Div(text=f"Revisado a las {now:%H:%M:%S}.")
+# Lo último que dibujó este documento: los cambios se muestran respecto de esto, aunque otro
+# documento haya leído antes el archivo.
+drawn = dict(version=counts.version, counts=counts.counts)
+
+
+def update():
+    counts.refresh()  # Solo lee las filas agregadas (o compara hashes si el archivo se reescribió).
+    now = datetime.datetime.now()
+    changes = ""
+    if counts.version != drawn["version"]:
+        current = counts.counts
+        update_ranking_source(source, ranking.x_range, counts.top(10))  # patch/stream de las barras.
+        history.stream(dict(hora=[now], productos=[counts.total]), rollover=500)
+        delta = current.sub(drawn["counts"], fill_value=0)
+        changes = describe_changes(delta[delta != 0])
+        drawn.update(version=counts.version, counts=current)
+    status.text = f"Revisado a las {now:%H:%M:%S}. " + (f"Cambios: {changes}." if changes else "Sin cambios.")
+
+
+doc.add_root(column(ranking, history_figure, status, sizing_mode="stretch_width"))
+doc.add_periodic_callback(update, interval * 1000)
+doc.title = "Marcas Más Populares (en vivo)"
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+
+SORT_COLUMNS = ["precio", "watts", "GB", "marca"]
+
+
+class SortOrders:
+    """
+    Órdenes precalculados para paginar la tabla de datos filtrados.
+
+    Para cada columna de `columns` y cada sentido se guarda el orden de todas
+    las filas (`order`) y la posición de cada fila en ese orden (`rank`), una
+    vez por versión de los datos. Ordenar un subconjunto de filas no vuelve a
+    comparar valores: si el subconjunto es grande se recorre el orden
+    precalculado con una máscara, y si es pequeño se ordenan sus posiciones.
+    Los valores nulos quedan al final en ambos sentidos; "marca" se ordena
+    alfabéticamente.
+
+    Args:
+        data (pd.DataFrame): Datos tipados con las columnas de `columns`.
+        columns (list): Columnas por las que se puede ordenar.
+    """
+
+    def __init__(self, data, columns=SORT_COLUMNS):
+        self.n_rows = len(data)
+        self._orders = {}
+        self._ranks = {}
+        for column in columns:
+            keys = self._sort_keys(data[column])
+            for ascending in (True, False):
+                order = np.argsort(keys if ascending else -keys, kind="stable")  # NaN siempre al final.
+                rank = np.empty(self.n_rows, dtype=np.intp)
+                rank[order] = np.arange(self.n_rows)
+                self._orders[column, ascending] = order
+                self._ranks[column, ascending] = rank
+
+    @staticmethod
+    def _sort_keys(values):
+        if isinstance(values.dtype, pd.CategoricalDtype) or values.dtype == object:
+            codes, _ = pd.factorize(values.astype(object), sort=True)
+            return np.where(codes < 0, np.nan, codes.astype("float64"))
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+
+    def sort(self, rows, column=None, ascending=True):
+        """
+        Ordena posiciones de fila por una columna.
+
+        Args:
+            rows (np.ndarray): Posiciones de fila, normalmente de `FilterEngine.apply`.
+            column (str): Columna de orden; None conserva el orden de `rows`.
+            ascending (bool): Sentido del orden.
+
+        Returns:
+            np.ndarray: Las mismas posiciones, ordenadas.
+        """
+        if column is None:
+            return rows
+        if len(rows) * 8 > self.n_rows:
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[rows] = True
+            order = self._orders[column, ascending]
+            return order[selected[order]]
+        return rows[np.argsort(self._ranks[column, ascending][rows], kind="stable")]
+
+    def page(self, rows, page, page_size, column=None, ascending=True):
+        """
+        Posiciones de las filas de una página.
+
+        Args:
+            rows (np.ndarray): Posiciones de fila del conjunto filtrado.
+            page (int): Número de página, empezando en 1.
+            page_size (int): Filas por página.
+            column (str): Columna de orden; None para el orden original.
+            ascending (bool): Sentido del orden.
+
+        Returns:
+            np.ndarray: Posiciones de fila de la página, en orden.
+        """
+        start = (page - 1) * page_size
+        if column is None:
+            return rows[start:start + page_size]
+        return self.sort(rows, column, ascending)[start:start + page_size]
+
+
+def truncate_text(texts, max_chars=80):
+    """
+    Recorta textos largos para mostrarlos en una tabla.
+
+    Args:
+        texts (pd.Series): Textos a recortar (normalmente solo los de una página).
+        max_chars (int): Longitud máxima, incluido el "…" final.
+
+    Returns:
+        pd.Series: Textos de a lo más `max_chars` caracteres.
+    """
+    texts = texts.astype(object)
+    long = texts.str.len() > max_chars
+    return texts.where(~long, texts.str.slice(0, max_chars - 1) + "…")
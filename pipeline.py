@@ -0,0 +1,272 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from dataset import ColumnarWriter, columnar_path_for, write_columnar
+from dedup import find_duplicates
+from extraction import BrandMatcher, TypeClassifier, brands, clean_catalog, tipos
+from extraction_cache import ExtractionCache
+from instrumentation import SamplingProfiler, log_to_file, stage
+
+
+# Buscadores compilados de cada proceso del pool (se construyen una vez por proceso).
+_worker_matchers = {}
+
+
+def read_input(path):
+    """
+    Lee el archivo de entrada (XLSX o CSV) con la columna "descripcion".
+
+    Args:
+        path (str): Ruta del archivo de entrada.
+
+    Returns:
+        pd.DataFrame: Datos de entrada.
+    """
+    if path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def iter_input_chunks(path, chunk_size=50000):
+    """
+    Lee el archivo de entrada por bloques de filas sin cargarlo completo en memoria.
+
+    Los XLSX se recorren fila por fila con el lector de solo lectura de
+    openpyxl y los CSV con `pd.read_csv(..., chunksize=...)`.
+
+    Args:
+        path (str): Ruta del archivo XLSX o CSV de entrada.
+        chunk_size (int): Número de filas por bloque.
+
+    Yields:
+        pd.DataFrame: Bloques consecutivos de los datos de entrada.
+    """
+    if path.lower().endswith(".xls"):
+        # El formato binario antiguo no admite lectura por filas.
+        df = read_input(path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    elif path.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == chunk_size:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def _init_worker():
+    _worker_matchers["brand_matcher"] = BrandMatcher(brands)
+    _worker_matchers["classifier"] = TypeClassifier(tipos)
+
+
+def _clean_chunk(chunk):
+    return clean_catalog(chunk, **_worker_matchers)
+
+
+def clean_catalog_parallel(df, workers=None, chunk_size=50000):
+    """
+    Ejecuta `clean_catalog` por bloques de filas en un pool de procesos.
+
+    Cada proceso construye el buscador de marcas y el clasificador de tipos una
+    sola vez al iniciar. Los bloques se reensamblan en el orden original, por lo
+    que el resultado es idéntico al de la ejecución en serie.
+
+    Args:
+        df (pd.DataFrame): Datos de entrada con la columna "descripcion".
+        workers (int): Número de procesos; por defecto el número de núcleos.
+        chunk_size (int): Número de filas por bloque.
+
+    Returns:
+        pd.DataFrame: Datos limpios con las columnas de `OUTPUT_COLUMNS`.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = [df.iloc[start:start + chunk_size][["descripcion"]] for start in range(0, len(df), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        return clean_catalog(df)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker) as executor:
+        return pd.concat(executor.map(_clean_chunk, chunks))
+
+
+def clean_chunks(chunks, workers=1):
+    """
+    Aplica `clean_catalog` a una secuencia de bloques a medida que se leen.
+
+    En modo paralelo se mantienen como máximo dos bloques en curso por
+    proceso, de modo que la memoria sigue acotada por el tamaño del bloque.
+    Los bloques se devuelven en el orden de entrada.
+
+    Args:
+        chunks (iterable): Bloques de datos de entrada con la columna "descripcion".
+        workers (int): Número de procesos (1 ejecuta en serie, 0 usa todos los núcleos).
+
+    Yields:
+        pd.DataFrame: Bloques de datos limpios.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield clean_catalog(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_clean_chunk, chunk[["descripcion"]]))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def groups_path_for(csv_path):
+    """
+    Devuelve la ruta del CSV con los grupos de duplicados que acompaña a un CSV de datos limpios.
+    """
+    return os.path.splitext(csv_path)[0] + "_grupos.csv"
+
+
+def run_streaming(input_path, output_path, workers=1, chunk_size=50000, columnar=True, parquet=False):
+    """
+    Limpia el archivo de entrada por bloques y escribe el CSV de salida de forma incremental.
+
+    Args:
+        input_path (str): Ruta del archivo XLSX o CSV de entrada.
+        output_path (str): Ruta del CSV de salida.
+        workers (int): Número de procesos (1 ejecuta en serie, 0 usa todos los núcleos).
+        chunk_size (int): Número de filas por bloque.
+        columnar (bool): Si también se escribe el archivo Arrow tipado junto al CSV.
+        parquet (bool): Si también se escribe una copia Parquet junto al CSV (para el backend DuckDB).
+
+    Returns:
+        int: Número de filas escritas.
+    """
+    rows = 0
+    extensions = [".arrow"] * columnar + [".parquet"] * parquet
+    writers = {
+        extension: ColumnarWriter(columnar_path_for(output_path, extension), csv_path=output_path)
+        for extension in extensions
+    }
+    try:
+        with open(output_path, "w", newline="", encoding="utf-8") as output:
+            for chunk in clean_chunks(iter_input_chunks(input_path, chunk_size), workers=workers):
+                with stage("escritura.csv", len(chunk)):
+                    chunk.to_csv(output, index=False, header=rows == 0)
+                for extension, writer in writers.items():
+                    with stage(f"escritura{extension}", len(chunk)):
+                        writer.write(chunk)
+                rows += len(chunk)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return rows
+
+
+def run(input_path, output_path, workers=1, chunk_size=50000, cache_dir=None, columnar=True, parquet=False,
+        deduplicate=False):
+    """
+    Limpia el archivo de entrada y escribe el resultado en CSV.
+
+    Args:
+        input_path (str): Ruta del archivo XLSX o CSV de entrada.
+        output_path (str): Ruta del CSV de salida.
+        workers (int): Número de procesos (1 ejecuta en serie, 0 usa todos los núcleos); no se usa con `cache_dir`.
+        chunk_size (int): Número de filas por bloque en el modo paralelo.
+        cache_dir (str): Carpeta de la caché incremental; si se indica, solo se
+            procesan las descripciones nuevas o afectadas por reglas modificadas.
+        columnar (bool): Si también se escribe el archivo Arrow tipado junto al CSV.
+        parquet (bool): Si también se escribe una copia Parquet junto al CSV (para el backend DuckDB).
+        deduplicate (bool): Si se agrupan las publicaciones casi duplicadas (ver
+            `dedup.find_duplicates`): todas las filas se escriben con su grupo en
+            "<salida>_grupos.csv" y la salida conserva solo la fila canónica de cada grupo.
+
+    Returns:
+        pd.DataFrame: Datos limpios.
+    """
+    with stage("lectura") as record:
+        df = read_input(input_path)
+        record["filas"] = len(df)
+    with stage("limpieza", len(df)):
+        if cache_dir:
+            cache = ExtractionCache(cache_dir)
+            data = cache.clean(df)
+            print(f"Caché: {cache.stats['reutilizadas']} filas reutilizadas, {cache.stats['recalculadas']} recalculadas")
+        else:
+            data = clean_catalog_parallel(df, workers=workers, chunk_size=chunk_size)
+    if deduplicate:
+        with stage("deduplicacion", len(data)):
+            groups = find_duplicates(data)
+        with stage("escritura.grupos", len(data)):
+            data.join(groups).to_csv(groups_path_for(output_path), index=False)
+        data = data[groups["canonica"]]
+        print(f"Duplicados: {len(groups) - len(data)} filas descartadas ({groups['grupo'].nunique()} grupos)")
+    with stage("escritura.csv", len(data)):
+        data.to_csv(output_path, index=False)
+    if columnar:
+        with stage("escritura.arrow", len(data)):
+            write_columnar(data, columnar_path_for(output_path), csv_path=output_path)
+    if parquet:
+        with stage("escritura.parquet", len(data)):
+            write_columnar(data, columnar_path_for(output_path, ".parquet"))
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera datos_limpios.csv a partir del catálogo de productos.")
+    parser.add_argument("input", nargs="?", default="Prueba_EVA.XLSX", help="Archivo XLSX o CSV con la columna 'descripcion'.")
+    parser.add_argument("-o", "--output", default="datos_limpios.csv", help="Ruta del CSV de salida.")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Procesos en paralelo (0 = todos los núcleos).")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Filas por bloque en el modo paralelo.")
+    parser.add_argument("--cache-dir", help="Carpeta de la caché incremental de extracción (desactivada si se omite).")
+    parser.add_argument("--no-columnar", action="store_true", help="No escribe el archivo Arrow tipado (.arrow) junto al CSV.")
+    parser.add_argument("--parquet", action="store_true", help="Escribe también una copia Parquet junto al CSV (backend DuckDB del tablero).")
+    parser.add_argument("--deduplicar", action="store_true", help="Agrupa las publicaciones casi duplicadas y conserva una fila por grupo.")
+    parser.add_argument("--stream", action="store_true", help="Procesa la entrada por bloques sin cargarla completa en memoria.")
+    parser.add_argument("--log-etapas", help="Archivo donde se agregan los tiempos de cada etapa como líneas JSON.")
+    parser.add_argument("--perfil", help="Archivo de salida del perfilador por muestreo (formato folded para flame graphs).")
+    args = parser.parse_args(argv)
+    if args.stream and args.cache_dir:
+        parser.error("--stream no se puede combinar con --cache-dir")
+    if args.cache_dir and args.workers != 1:
+        parser.error("--cache-dir no se puede combinar con -w/--workers")
+    if args.stream and args.deduplicar:
+        parser.error("--stream no se puede combinar con --deduplicar")
+    if args.log_etapas:
+        log_to_file(args.log_etapas)
+    profiler = SamplingProfiler().start() if args.perfil else None
+
+    start = time.perf_counter()
+    if args.stream:
+        rows = run_streaming(
+            args.input, args.output, workers=args.workers, chunk_size=args.chunk_size, columnar=not args.no_columnar,
+            parquet=args.parquet,
+        )
+    else:
+        rows = len(run(
+            args.input, args.output, workers=args.workers, chunk_size=args.chunk_size, cache_dir=args.cache_dir,
+            columnar=not args.no_columnar, parquet=args.parquet, deduplicate=args.deduplicar,
+        ))
+    if profiler is not None:
+        profiler.stop()
+        profiler.write(args.perfil)
+    print(f"{rows} filas escritas en {args.output} ({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+import argparse
+import hashlib
+import html
+import inspect
+import json
+import os
+import pickle
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from aggregates import MAX_SCATTER_POINTS, AggregateCube, box_stats, histogram, sample_points
+from dataset import CSV_PATH, columnar_path_for, load_dataset
+from search import TokenCounts
+
+
+MANIFEST_NAME = ".manifest.json"
+# Versión del dibujo de los gráficos, parte de su huella: se incrementa al cambiar algo que
+# `fingerprint` no ve, como el estilo de matplotlib o la versión de wordcloud.
+RENDER_VERSION = 1
+
+
+def chart_inputs(data, word_frequencies=None):
+    """
+    Calcula en el proceso principal los datos de cada gráfico del reporte.
+
+    Los gráficos son los mismos de app_plotly.py y los nombres de archivo los
+    de la carpeta send/. Solo se calculan agregados pequeños (cubo, cuartiles,
+    frecuencias de palabras y muestras de puntos); el dibujo se hace en los
+    procesos del pool.
+
+    Args:
+        data (pd.DataFrame): Datos tipados del reporte.
+        word_frequencies (dict): Frecuencias de la nube de palabras, si ya se
+            calcularon (por ejemplo con `TokenCounts.frequencies`).
+
+    Returns:
+        dict: Nombre de archivo -> (tipo de gráfico, título, datos del gráfico).
+    """
+    cube = AggregateCube(data)
+    top_types = cube.top("tipo", 10)
+    has_prices = data["precio"].notna().any()
+
+    def bars(values, xlabel, ylabel, horizontal=False):
+        return {"labels": [str(label) for label in values.index], "values": values.to_numpy(dtype="float64"),
+                "xlabel": xlabel, "ylabel": ylabel, "horizontal": horizontal}
+
+    def pie(values):
+        return {"labels": [str(label) for label in values.index], "values": values.to_numpy(dtype="float64")}
+
+    def boxes(subset, horizontal=False):
+        if subset[["tipo", "precio"]].dropna().empty:
+            return None
+        stats, outliers = box_stats(subset, "precio", "tipo")
+        return {"stats": stats, "outliers": outliers, "horizontal": horizontal}
+
+    def scatter(column):
+        points, _ = sample_points(data.dropna(subset=[column, "precio"])[[column, "precio", "marca"]], MAX_SCATTER_POINTS)
+        return {"points": points.astype({"marca": object}), "x": column, "y": "precio"}
+
+    return {
+        "1distribucion_precios.png": ("histograma", "Distribución de Precios",
+                                      histogram(data["precio"], bins=15) if has_prices else None),
+        "2productos_por_marca.png": ("barras", "Productos por Marca",
+                                     bars(cube.top("marca", None), "Marca", "Cantidad de Productos")),
+        "3nube_de_palabras.png": ("nube", "Nube de Palabras en Descripciones",
+                                  word_frequencies if word_frequencies is not None
+                                  else TokenCounts(data["descripcion"]).frequencies()),
+        "4proporcion_por_tipo.png": ("pastel", "Proporción por Tipo de Producto", pie(top_types)),
+        "5precios_por_tipo.png": ("cajas", "Distribución de Precios por Tipo de Producto", boxes(data)),
+        "6precio_vs_watts.png": ("dispersion", "Relación entre Precio y Potencia (Watts)", scatter("watts")),
+        "7precio_vs_gb.png": ("dispersion", "Relación entre Precio y Capacidad (GB)", scatter("GB")),
+        "8marcas_populares_top_10.png": ("barras", "Marcas Más Populares (Top 10)",
+                                         bars(cube.top("marca", 10), "Marca", "Cantidad de Productos")),
+        "9precio_promedio_top_10.png": ("barras", "Precios Promedio por Marca (Top 10)",
+                                        bars(cube.top("marca", 10, measure="media"), "Marca", "Precio Promedio")),
+        "10productos_por_tipo_top_10.png": ("barras", "Productos por Tipo (Top 10)",
+                                            bars(top_types, "Tipo de Producto", "Cantidad")),
+        "11comparacion_de_precios_tipo_top_10.png": ("cajas", "Comparación de Precios por Tipo de Producto (Top 10)",
+                                                     boxes(data[data["tipo"].isin(top_types.index)], horizontal=True)),
+        "12proporcion_precios.png": ("pastel", "Proporción de Precios por Marca (Top 10)",
+                                     pie(cube.top("marca", 10, measure="suma"))),
+    }
+
+
+def _draw_histogram(ax, bins):
+    ax.bar(bins["inicio"], bins["frecuencia"], width=bins["fin"] - bins["inicio"], align="edge", edgecolor="white")
+    ax.set_xlabel("Precio")
+    ax.set_ylabel("Frecuencia")
+
+
+def _draw_bars(ax, inputs):
+    if inputs["horizontal"]:
+        ax.barh(inputs["labels"], inputs["values"])
+        ax.invert_yaxis()
+        ax.set_xlabel(inputs["ylabel"])
+        ax.set_ylabel(inputs["xlabel"])
+    else:
+        ax.bar(inputs["labels"], inputs["values"])
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.set_xlabel(inputs["xlabel"])
+        ax.set_ylabel(inputs["ylabel"])
+
+
+def _draw_pie(ax, inputs):
+    ax.pie(inputs["values"], labels=inputs["labels"], autopct="%1.1f%%", startangle=90, counterclock=False)
+    ax.axis("equal")
+
+
+def _draw_boxes(ax, inputs):
+    stats, outliers = inputs["stats"], inputs["outliers"]
+    boxes = [
+        {
+            "label": str(row.tipo), "q1": row.q1, "med": row.mediana, "q3": row.q3,
+            "whislo": row.min_bigote, "whishi": row.max_bigote,
+            "fliers": outliers.loc[outliers["tipo"] == row.tipo, "precio"].to_numpy(),
+        }
+        for row in stats.itertuples(index=False)
+    ]
+    if inputs["horizontal"]:
+        # `orientation` reemplaza a `vert` desde matplotlib 3.10.
+        horizontal = {"orientation": "horizontal"} if "orientation" in inspect.signature(ax.bxp).parameters else {"vert": False}
+        ax.bxp(boxes, **horizontal)
+    else:
+        ax.bxp(boxes)
+    if inputs["horizontal"]:
+        ax.set_xlabel("precio")
+        ax.set_ylabel("tipo")
+    else:
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.set_xlabel("tipo")
+        ax.set_ylabel("precio")
+
+
+def _draw_scatter(ax, inputs):
+    points = inputs["points"]
+    for brand, group in points.groupby(points["marca"].fillna("(sin marca)"), sort=True):
+        ax.scatter(group[inputs["x"]], group[inputs["y"]], s=12, label=brand)
+    ax.set_xlabel(inputs["x"])
+    ax.set_ylabel(inputs["y"])
+    ax.legend(fontsize="x-small", ncol=2, loc="upper right")
+
+
+def _draw_word_cloud(ax, frequencies):
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=800, height=400, background_color="white", colormap="viridis")
+    ax.imshow(wordcloud.generate_from_frequencies(frequencies), interpolation="bilinear")
+    ax.axis("off")
+
+
+# tipo de gráfico -> función que lo dibuja en un eje de matplotlib
+RENDERERS = {
+    "histograma": _draw_histogram,
+    "barras": _draw_bars,
+    "pastel": _draw_pie,
+    "cajas": _draw_boxes,
+    "dispersion": _draw_scatter,
+    "nube": _draw_word_cloud,
+}
+
+
+def fingerprint(kind, title, inputs):
+    """
+    Huella de un gráfico: cambia si cambian sus datos, su título, el código que lo dibuja
+    (su función de `RENDERERS` y las comunes, `render_chart` y `_init_worker`) o `RENDER_VERSION`.
+    """
+    digest = hashlib.sha256(str(RENDER_VERSION).encode("utf-8"))
+    for function in [RENDERERS[kind], render_chart, _init_worker]:
+        digest.update(inspect.getsource(function).encode("utf-8"))
+    digest.update(pickle.dumps((kind, title, inputs), protocol=4))
+    return digest.hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")  # Sin ventanas: los procesos solo escriben archivos.
+
+
+def render_chart(path, kind, title, inputs):
+    """
+    Dibuja un gráfico y lo guarda como PNG.
+
+    Args:
+        path (str): Ruta del archivo de salida.
+        kind (str): Tipo de gráfico, una clave de `RENDERERS`.
+        title (str): Título del gráfico.
+        inputs: Datos del gráfico, de `chart_inputs`; None o vacíos si no hay datos.
+
+    Returns:
+        str: La ruta escrita.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if inputs is None or len(inputs) == 0 or ("values" in inputs and not any(inputs["values"])) \
+            or ("points" in inputs and inputs["points"].empty):
+        ax.text(0.5, 0.5, "Sin datos", ha="center", va="center", fontsize=16)
+        ax.axis("off")
+    else:
+        RENDERERS[kind](ax, inputs)
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def _slug(value):
+    return re.sub(r"[^\w.-]+", "_", str(value)).strip("_") or "sin_valor"
+
+
+def _slugs(values):
+    """
+    Nombre de carpeta de cada valor. Si varios valores dan el mismo nombre (por ejemplo
+    "A/B" y "A B", o "Sony" y "SONY" en un sistema de archivos sin mayúsculas), a cada
+    uno se le agrega un hash corto del valor original para que no compartan carpeta.
+    """
+    slugs = [_slug(value) for value in values]
+    repeated = Counter(slug.lower() for slug in slugs)
+    return [
+        f"{slug}-{hashlib.sha1(str(value).encode('utf-8')).hexdigest()[:8]}" if repeated[slug.lower()] > 1 else slug
+        for value, slug in zip(values, slugs)
+    ]
+
+
+def _write_summary(directory, title, data, charts):
+    cube = AggregateCube(data)
+    columns = ["cantidad", "media", "desviacion", "minimo", "maximo", "suma"]
+    tables = "".join(
+        f"<h2>Resumen por {by}</h2>"
+        + cube.reduce(by).loc[lambda df: df["cantidad"] > 0, columns]
+        .sort_values("cantidad", ascending=False).to_html(float_format=lambda x: f"{x:,.2f}", na_rep="")
+        for by in ["marca", "tipo"]
+    )
+    images = "".join(
+        f'<figure><img src="{html.escape(name)}" alt="{html.escape(chart_title)}"></figure>'
+        for name, (_, chart_title, _) in charts.items()
+    )
+    with open(os.path.join(directory, "index.html"), "w", encoding="utf-8") as output:
+        output.write(
+            f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'><title>{html.escape(title)}</title></head>"
+            f"<body><h1>{html.escape(title)}</h1><p>{len(data)} productos</p>{images}{tables}</body></html>"
+        )
+
+
+def generate_reports(data, output_dir="reportes", by=None, workers=1, force=False):
+    """
+    Genera los PNG de los gráficos y un resumen HTML, en total o por grupo.
+
+    Los gráficos se dibujan en paralelo en un pool de procesos con el backend
+    Agg de matplotlib. Cada carpeta de reporte guarda en `MANIFEST_NAME` la
+    huella de cada gráfico (`fingerprint`); los gráficos cuya huella no cambió
+    desde la última ejecución y cuyo archivo existe no se vuelven a dibujar.
+
+    Args:
+        data (pd.DataFrame): Datos tipados, normalmente de `load_dataset`.
+        output_dir (str): Carpeta de salida.
+        by (str): "marca" o "tipo" para generar un reporte por valor en
+            subcarpetas de `output_dir`; None para un solo reporte.
+        workers (int): Número de procesos (1 dibuja en serie, 0 usa todos los núcleos).
+        force (bool): Si se vuelven a dibujar todos los gráficos.
+
+    Returns:
+        dict: Gráficos "generados" y "omitidos".
+    """
+    if by is None:
+        reports = [(output_dir, "Reporte de Productos", None)]
+    else:
+        groups = sorted(data.groupby(by, observed=True).indices.items())
+        reports = [
+            (os.path.join(output_dir, slug), f"Reporte de Productos: {value}", rows)
+            for slug, (value, rows) in zip(_slugs([value for value, _ in groups]), groups)
+        ]
+    token_counts = TokenCounts(data["descripcion"])  # Palabras contadas una sola vez para todos los reportes.
+
+    tasks = []
+    manifests = {}
+    skipped = 0
+    for directory, title, rows in reports:
+        subset = data if rows is None else data.iloc[rows]
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        previous = {}
+        if os.path.exists(manifest_path) and not force:
+            with open(manifest_path, encoding="utf-8") as manifest:
+                previous = json.load(manifest)
+        charts = chart_inputs(subset, token_counts.frequencies(rows))
+        current = {}
+        for name, (kind, chart_title, inputs) in charts.items():
+            path = os.path.join(directory, name)
+            current[name] = fingerprint(kind, chart_title, inputs)
+            if previous.get(name) == current[name] and os.path.exists(path):
+                skipped += 1
+            else:
+                tasks.append((path, kind, chart_title, inputs))
+        manifests[manifest_path] = current
+        _write_summary(directory, title, subset, charts)
+
+    if by is not None:
+        links = "".join(
+            f'<li><a href="{html.escape(os.path.relpath(directory, output_dir))}/index.html">{html.escape(title)}</a></li>'
+            for directory, title, _ in reports
+        )
+        with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as output:
+            output.write(f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'><title>Reportes por {by}</title>"
+                         f"</head><body><h1>Reportes por {by}</h1><ul>{links}</ul></body></html>")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker()
+        for task in tasks:
+            render_chart(*task)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker) as executor:
+            for future in [executor.submit(render_chart, *task) for task in tasks]:
+                future.result()
+
+    # El manifiesto se escribe al final, solo si todos los gráficos se dibujaron.
+    for manifest_path, current in manifests.items():
+        with open(manifest_path, "w", encoding="utf-8") as manifest:
+            json.dump(current, manifest, indent=1, sort_keys=True)
+    return {"generados": len(tasks), "omitidos": skipped}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los gráficos PNG y un resumen HTML a partir de los datos limpios.")
+    parser.add_argument("input", nargs="?", default=CSV_PATH, help="CSV de datos limpios (se usa el .arrow si está al día).")
+    parser.add_argument("-o", "--output", default="reportes", help="Carpeta de salida.")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Procesos en paralelo (0 = todos los núcleos).")
+    parser.add_argument("--por", choices=["marca", "tipo"], help="Genera un reporte por cada marca o tipo.")
+    parser.add_argument("--marca", action="append", help="Incluye solo esta marca (se puede repetir).")
+    parser.add_argument("--tipo", action="append", help="Incluye solo este tipo de producto (se puede repetir).")
+    parser.add_argument("--forzar", action="store_true", help="Vuelve a dibujar todos los gráficos aunque no hayan cambiado.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    data = load_dataset(columnar_path_for(args.input), args.input)
+    if args.marca:
+        data = data[data["marca"].isin(args.marca)]
+    if args.tipo:
+        data = data[data["tipo"].isin(args.tipo)]
+    stats = generate_reports(data, args.output, by=args.por, workers=args.workers, force=args.forzar)
+    print(f"{stats['generados']} gráficos generados y {stats['omitidos']} sin cambios en {args.output} "
+          f"({time.perf_counter() - start:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from extraction import clean_text, clean_text_series
+
+
+def tokenize_series(texts):
+    """
+    Separa una serie de textos en tokens normalizados.
+
+    Usa la misma normalización que `clean_text` y pasa los tokens a
+    minúsculas; se descartan los tokens sin letras ni números ("/", "$$", ...).
+
+    Args:
+        texts (pd.Series): Serie de textos.
+
+    Returns:
+        pd.Series: Un token por fila, indexado por la posición de la fila de origen.
+    """
+    tokens = clean_text_series(texts.reset_index(drop=True)).str.lower().str.split().explode()
+    tokens = tokens.dropna()
+    return tokens[tokens.str.contains(r"\w", regex=True)]
+
+
+def tokenize(text):
+    """
+    Versión de `tokenize_series` para un solo texto.
+
+    Returns:
+        list: Tokens normalizados del texto.
+    """
+    return [token for token in clean_text(text).lower().split() if re.search(r"\w", token)]
+
+
+class KeywordIndex:
+    """
+    Índice invertido sobre los tokens de "descripcion".
+
+    Para cada token del vocabulario (ordenado) se guardan las filas que lo
+    contienen, en formato comprimido: `rows[offsets[i]:offsets[i + 1]]` son las
+    filas del token `vocabulary[i]`. Una consulta con varias palabras devuelve
+    las filas que contienen todas (AND); por defecto la última palabra se trata
+    como prefijo, así que "sony sam" encuentra "Sony ... Samsung" mientras se escribe.
+
+    Args:
+        descriptions (pd.Series): Serie con las descripciones de los productos.
+        cache_size (int): Número de consultas recientes guardadas.
+    """
+
+    def __init__(self, descriptions, cache_size=256):
+        pairs = tokenize_series(descriptions)
+        pairs = pairs[~pd.MultiIndex.from_arrays([pairs.index, pairs.to_numpy()]).duplicated()]
+        codes, vocabulary = pd.factorize(pairs, sort=True)
+        order = np.argsort(codes, kind="stable")
+        self.vocabulary = list(vocabulary)
+        self.rows = pairs.index.to_numpy()[order]
+        self.offsets = np.searchsorted(codes[order], np.arange(len(vocabulary) + 1))
+        self.search = lru_cache(maxsize=cache_size)(self._search)
+
+    def _term_rows(self, term, prefix):
+        start = bisect_left(self.vocabulary, term)
+        if prefix:
+            end = bisect_left(self.vocabulary, term[:-1] + chr(ord(term[-1]) + 1))
+        else:
+            end = start + 1 if start < len(self.vocabulary) and self.vocabulary[start] == term else start
+        if end - start == 1:
+            return self.rows[self.offsets[start]:self.offsets[end]]
+        return np.unique(self.rows[self.offsets[start]:self.offsets[end]])
+
+    def _search(self, query, prefix=True):
+        terms = tokenize(query)
+        if not terms:
+            return None
+        matches = [self._term_rows(term, False) for term in set(terms[:-1])]
+        matches.append(self._term_rows(terms[-1], prefix))
+        matches.sort(key=len)
+        rows = matches[0]
+        for other in matches[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        rows = np.array(rows)
+        rows.setflags(write=False)  # El resultado se comparte a través de la caché.
+        return rows
+
+    def query(self, query, prefix=True):
+        """
+        Filas cuya descripción contiene todas las palabras de la consulta.
+
+        Args:
+            query (str): Palabras a buscar.
+            prefix (bool): Si la última palabra puede ser el inicio de un token.
+
+        Returns:
+            np.ndarray: Posiciones de fila ordenadas (de solo lectura), o None si la consulta no tiene palabras.
+        """
+        return self.search(query, prefix)
+
+
+class TokenCounts:
+    """
+    Conteo de palabras por fila para generar la nube de palabras de cualquier subconjunto.
+
+    Las palabras se obtienen igual que en `WordCloud.process_text` (mismo
+    patrón, sin "'s", sin números ni stopwords), pero se cuentan una sola vez
+    por versión de los datos. La forma con que se muestra cada palabra se fija
+    con `standard_forms` sobre el catálogo completo, de modo que no cambia al
+    filtrar. Para un subconjunto de filas basta con sumar sus conteos y pasar
+    el resultado a `WordCloud.generate_from_frequencies`. Para el catálogo
+    completo las frecuencias coinciden con las de `WordCloud(collocations=False)`.
+
+    Los conteos se guardan en formato disperso: una entrada por cada par
+    (fila, palabra) presente, con `entry_rows`, `entry_words` y `entry_counts`.
+    `vocabulary` está en orden de primera aparición en el catálogo.
+
+    Args:
+        descriptions (pd.Series): Serie con las descripciones de los productos.
+        stopwords (set): Palabras a descartar; por defecto `wordcloud.STOPWORDS`.
+    """
+
+    def __init__(self, descriptions, stopwords=None):
+        from wordcloud import STOPWORDS
+
+        stopwords = {word.lower() for word in (STOPWORDS if stopwords is None else stopwords)}
+        words = descriptions.reset_index(drop=True).astype(object).str.findall(r"\w[\w']*").explode().dropna()
+        words = words.where(~words.str.lower().str.endswith("'s"), words.str[:-2])
+        words = words[~words.str.isdigit() & ~words.str.lower().isin(stopwords)]
+
+        raw_codes, raw_words = pd.factorize(words)
+        forms = standard_forms(dict(zip(raw_words, np.bincount(raw_codes, minlength=len(raw_words)))))
+        display = words.str.lower().map(forms)
+        codes, self.vocabulary = pd.factorize(display)
+
+        entries = pd.DataFrame({"row": words.index.to_numpy(), "word": codes}).value_counts(sort=False).sort_index()
+        self.entry_rows = entries.index.get_level_values("row").to_numpy()
+        self.entry_words = entries.index.get_level_values("word").to_numpy()
+        self.entry_counts = entries.to_numpy()
+        self.n_rows = len(descriptions)
+        self.totals = np.bincount(self.entry_words, weights=self.entry_counts, minlength=len(self.vocabulary))
+
+    def frequencies(self, rows=None, max_words=200):
+        """
+        Frecuencias de las palabras más comunes en un subconjunto de filas.
+
+        Args:
+            rows (np.ndarray): Posiciones de las filas; None para todo el catálogo.
+            max_words (int): Número máximo de palabras devueltas.
+
+        Returns:
+            dict: Palabra -> frecuencia, de mayor a menor frecuencia (en empate,
+            la que aparece primero en el catálogo), listo para `generate_from_frequencies`.
+        """
+        if rows is None:
+            totals = self.totals
+        else:
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[rows] = True
+            keep = selected[self.entry_rows]
+            totals = np.bincount(self.entry_words[keep], weights=self.entry_counts[keep], minlength=len(self.vocabulary))
+        present = np.flatnonzero(totals)
+        present = present[np.argsort(-totals[present], kind="stable")[:max_words]]
+        return {self.vocabulary[word]: int(totals[word]) for word in present}
+
+
+def standard_forms(counts):
+    """
+    Forma con que se muestra cada palabra en la nube, a partir de conteos ya agregados.
+
+    Aplica las mismas reglas que `wordcloud.tokenization.process_tokens`
+    (cada palabra con su forma de mayúsculas más común, en empate la que
+    aparece primero, y "palabras" unido a "palabra" si ambas aparecen), pero
+    sobre conteos en lugar de una lista de palabras, para cuando el conteo se
+    hace fuera de Python.
+
+    Args:
+        counts (dict): Palabra (con sus mayúsculas) -> frecuencia, en orden de primera aparición.
+
+    Returns:
+        dict: Palabra en minúsculas -> forma mostrada (la del singular para los plurales unidos).
+    """
+    cases = {}
+    for word, count in counts.items():
+        case_counts = cases.setdefault(word.lower(), {})
+        case_counts[word] = case_counts.get(word, 0) + count
+    plurals = {}
+    for key in list(cases):
+        if key.endswith("s") and not key.endswith("ss") and key[:-1] in cases:
+            singular = cases[key[:-1]]
+            for word, count in cases.pop(key).items():
+                singular[word[:-1]] = singular.get(word[:-1], 0) + count
+            plurals[key] = key[:-1]
+    forms = {key: max(case_counts.items(), key=lambda item: item[1])[0] for key, case_counts in cases.items()}
+    forms.update((plural, forms[singular]) for plural, singular in plurals.items())
+    return forms
@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from dedup import normalize_descriptions, shingle_hashes
+
+
+# Dimensión del espacio de n-gramas con hash y largo de los n-gramas de caracteres.
+N_FEATURES = 2 ** 20
+NGRAM_SIZE = 3
+
+# Si una consulta supera `MAX_POSTINGS`, los n-gramas presentes en más de esta fracción de las filas no se usan.
+MAX_DF_RATIO = 0.2
+
+# Entradas de las listas por n-grama que recorre como máximo una consulta.
+MAX_POSTINGS = 1000000
+
+# Prefijo de las carpetas temporales donde se escribe un índice antes de moverlo a su lugar.
+_STAGING_PREFIX = ".tmp-"
+
+_ARRAYS = ["feature_ptr", "rows", "weights", "idf", "tipo", "precio"]
+
+
+def _features(texts, n_features=N_FEATURES, ngram_size=NGRAM_SIZE):
+    # Pares (fila, n-grama) con su frecuencia, ordenados por fila y n-grama.
+    padded = [f" {text} " for text in texts]
+    hashes, n_windows = shingle_hashes(padded, ngram_size)
+    rows = np.repeat(np.arange(len(padded), dtype=np.int64), n_windows)
+    keys = rows * n_features + (hashes % np.uint64(n_features)).astype(np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    return keys // n_features, keys % n_features, counts
+
+
+class SimilarityIndex:
+    """
+    Índice de productos similares por "descripcion".
+
+    Cada descripción normalizada (ver `dedup.normalize_descriptions`) se
+    representa con un vector TF-IDF disperso de n-gramas de caracteres,
+    asignados por hash a `n_features` dimensiones, con frecuencia sublineal
+    (1 + log tf) y norma 1. Los n-gramas de caracteres hacen que variantes de
+    escritura ("hdtv"/"hd tv", errores de una letra) sigan siendo parecidas.
+
+    El índice se guarda en formato disperso por n-grama (CSC): para el
+    n-grama `f`, `rows[feature_ptr[f]:feature_ptr[f + 1]]` son las filas que lo
+    contienen y `weights` sus pesos. Una consulta solo recorre las listas de
+    sus propios n-gramas (en catálogos grandes, sin los demasiado comunes, que
+    casi no distinguen productos), así que su costo depende de esas listas y
+    no del tamaño del catálogo. Junto al índice se guardan el código de "tipo" y el
+    "precio" de cada fila para restringir los resultados.
+
+    Args:
+        descriptions (pd.Series): Descripciones de los productos.
+        types (pd.Series): "tipo" de cada fila.
+        prices (pd.Series): "precio" de cada fila.
+        n_features (int): Dimensión del espacio de n-gramas.
+        ngram_size (int): Bytes por n-grama.
+        block_size (int): Filas procesadas por bloque al construir el índice.
+
+    Para construirlo sin cargar las columnas completas, ver `from_batches`.
+    """
+
+    def __init__(self, descriptions=None, types=None, prices=None, n_features=N_FEATURES, ngram_size=NGRAM_SIZE,
+                 block_size=20000):
+        self.n_features = n_features
+        self.ngram_size = ngram_size
+        if descriptions is None:
+            return  # Se completa con `load` o `from_batches`.
+        columns = {"descripcion": descriptions, "tipo": types, "precio": prices}
+        columns = {name: column.reset_index(drop=True) for name, column in columns.items()}
+        self._build(lambda: (
+            {name: column.iloc[start:start + block_size] for name, column in columns.items()}
+            for start in range(0, len(descriptions), block_size)
+        ))
+
+    @classmethod
+    def from_batches(cls, batches, n_features=N_FEATURES, ngram_size=NGRAM_SIZE):
+        """
+        Construye el índice a partir de bloques de filas, sin tener el catálogo completo en memoria.
+
+        Args:
+            batches (callable): Función sin argumentos que devuelve los bloques
+                consecutivos de filas (DataFrames o dicts de series con
+                "descripcion", "tipo" y "precio"); se llama una vez por pasada.
+            n_features (int): Dimensión del espacio de n-gramas.
+            ngram_size (int): Bytes por n-grama.
+
+        Returns:
+            SimilarityIndex: El índice.
+        """
+        index = cls(n_features=n_features, ngram_size=ngram_size)
+        index._build(batches)
+        return index
+
+    def _build(self, batches):
+        n_features, ngram_size = self.n_features, self.ngram_size
+        # Primera pasada: frecuencia de documento de cada n-grama, y "tipo" y "precio" de cada fila.
+        # Las descripciones se normalizan por bloque en cada pasada, sin guardar todas.
+        document_frequency = np.zeros(n_features, dtype=np.int64)
+        labels, type_codes, prices = {}, [], []
+        for batch in batches():
+            texts = normalize_descriptions(batch["descripcion"]).tolist()
+            _, features, _ = _features(texts, n_features, ngram_size)
+            document_frequency += np.bincount(features, minlength=n_features)
+            codes, values = pd.factorize(batch["tipo"])
+            lookup = np.array([labels.setdefault(value, len(labels)) for value in values] + [-1], dtype=np.int32)
+            type_codes.append(lookup[codes])  # Los nulos (código -1) quedan en -1.
+            prices.append(pd.Series(batch["precio"]).to_numpy(dtype="float32", na_value=np.nan))
+        self.tipo = np.concatenate(type_codes) if type_codes else np.empty(0, dtype=np.int32)
+        self.type_labels = [str(label) for label in labels]
+        self.precio = np.concatenate(prices) if prices else np.empty(0, dtype=np.float32)
+        self.n_rows = len(self.tipo)
+        self.idf = (np.log((1 + self.n_rows) / (1 + document_frequency)) + 1).astype(np.float32)
+        # Segunda pasada: los pesos de cada bloque se copian en su lugar de las listas por
+        # n-grama, así que solo un bloque a la vez está en memoria además del índice.
+        self.feature_ptr = np.concatenate([[0], np.cumsum(document_frequency)])
+        self.rows = np.empty(self.feature_ptr[-1], dtype=np.int32)
+        self.weights = np.empty(self.feature_ptr[-1], dtype=np.float32)
+        next_position = self.feature_ptr[:-1].copy()
+        start = 0
+        for batch in batches():
+            texts = normalize_descriptions(batch["descripcion"]).tolist()
+            rows, features, counts = _features(texts, n_features, ngram_size)
+            weights = (1 + np.log(counts)).astype(np.float32) * self.idf[features]
+            norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2))
+            weights /= norms[rows].astype(np.float32)
+            order = np.argsort(features, kind="stable")  # Cada lista queda ordenada por fila.
+            sorted_features = features[order]
+            first = np.flatnonzero(np.r_[True, sorted_features[1:] != sorted_features[:-1]])
+            sizes = np.diff(np.r_[first, len(order)])
+            positions = next_position[sorted_features] + np.arange(len(order)) - np.repeat(first, sizes)
+            self.rows[positions] = rows[order] + start
+            self.weights[positions] = weights[order]
+            next_position[sorted_features[first]] += sizes
+            start += len(texts)
+
+    def save(self, directory):
+        """
+        Guarda el índice en `directory` (un .npy por arreglo, legibles con memory-map).
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as meta:
+            json.dump({"n_rows": self.n_rows, "n_features": self.n_features, "ngram_size": self.ngram_size,
+                       "type_labels": self.type_labels}, meta, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Abre un índice guardado con `save`. Los arreglos se leen con memory-map,
+        así que varias sesiones o procesos comparten las mismas páginas.
+        """
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as meta:
+            meta = json.load(meta)
+        index = cls(n_features=meta["n_features"], ngram_size=meta["ngram_size"])
+        index.n_rows = meta["n_rows"]
+        index.type_labels = meta["type_labels"]
+        for name in _ARRAYS:
+            setattr(index, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        return index
+
+    def vectorize(self, text):
+        """
+        Vector TF-IDF de un texto libre.
+
+        Returns:
+            tuple: (np.ndarray con los n-gramas, np.ndarray float32 con sus pesos de norma 1).
+        """
+        texts = normalize_descriptions(pd.Series([text])).tolist()
+        _, features, counts = _features(texts, self.n_features, self.ngram_size)
+        weights = (1 + np.log(counts)).astype(np.float32) * self.idf[features]
+        norm = np.sqrt(np.sum(weights.astype(np.float64) ** 2))
+        return features, weights / norm if norm else weights
+
+    def query(self, text, k=10, types=None, price_range=None, exclude=None):
+        """
+        Las `k` filas más parecidas a un texto (similitud coseno).
+
+        Mientras las listas de los n-gramas de la consulta sumen como máximo
+        `MAX_POSTINGS` entradas la similitud es exacta. Si suman más, se
+        descartan los n-gramas presentes en más de `MAX_DF_RATIO` de las filas
+        y solo se recorren los más raros hasta `MAX_POSTINGS`: la similitud es
+        entonces una cota inferior, pero el orden lo deciden los n-gramas más
+        distintivos y el tiempo de la consulta queda acotado en catálogos grandes.
+
+        Args:
+            text (str): Descripción o texto de búsqueda.
+            k (int): Número de resultados.
+            types (iterable): Valores de "tipo" permitidos; None para todos.
+            price_range (tuple): Precio mínimo y máximo (inclusive); None para no filtrar.
+            exclude (int): Fila a omitir de los resultados (la del producto consultado).
+
+        Returns:
+            tuple: (np.ndarray con las posiciones de fila, np.ndarray con sus similitudes), de mayor a menor.
+        """
+        features, query_weights = self.vectorize(text)
+        if not len(features):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        starts, ends = self.feature_ptr[features], self.feature_ptr[features + 1]
+        lengths = ends - starts
+        if lengths.sum() > MAX_POSTINGS:
+            useful = lengths <= max(1, MAX_DF_RATIO * self.n_rows)
+            if not useful.any():
+                useful[:] = True  # Solo n-gramas comunes: se usan todos.
+            # Los n-gramas más raros primero, hasta recorrer `MAX_POSTINGS` entradas (al menos uno).
+            order = np.flatnonzero(useful)[np.argsort(lengths[useful], kind="stable")]
+            within_budget = np.cumsum(lengths[order]) <= MAX_POSTINGS
+            within_budget[0] = True
+            order = order[within_budget]
+            starts, lengths, query_weights = starts[order], lengths[order], query_weights[order]
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        matched = np.asarray(self.rows[positions])
+        contributions = np.asarray(self.weights[positions]) * np.repeat(query_weights, lengths)
+        scores = np.bincount(matched, weights=contributions, minlength=self.n_rows)
+        candidates = np.flatnonzero(scores > 0)
+        scores = scores[candidates]
+        keep = np.ones(len(candidates), dtype=bool)
+        if types is not None:
+            allowed = [self.type_labels.index(str(value)) for value in types if str(value) in self.type_labels]
+            keep &= np.isin(self.tipo[candidates], allowed)
+        if price_range is not None:
+            prices = self.precio[candidates]
+            keep &= (prices >= price_range[0]) & (prices <= price_range[1])
+        if exclude is not None:
+            keep &= candidates != exclude
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[best], scores[best]
+        order = np.lexsort((candidates, -scores))
+        return candidates[order], scores[order]
+
+    def row_type(self, row):
+        """
+        "tipo" de una fila (None si no tiene).
+        """
+        code = int(self.tipo[row])
+        return self.type_labels[code] if code >= 0 else None
+
+
+def index_directory(version, cache_dir=".similarity_index", n_features=N_FEATURES, ngram_size=NGRAM_SIZE):
+    """
+    Carpeta del índice de una versión de los datos y de sus parámetros.
+    """
+    key = hashlib.sha1(repr((version, n_features, ngram_size)).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, key)
+
+
+def load_or_build(version, batches, cache_dir=".similarity_index"):
+    """
+    Abre el índice guardado de una versión de los datos o lo construye y lo guarda.
+
+    El índice nuevo se escribe en una carpeta temporal y se mueve a su lugar
+    con `os.replace`; después se eliminan los índices de otras versiones.
+
+    Args:
+        version (tuple): Versión de los datos (por ejemplo de `backend_version`).
+        batches (callable): Función sin argumentos que devuelve los bloques de
+            filas con "descripcion", "tipo" y "precio" (ver
+            `SimilarityIndex.from_batches`); solo se llama si hay que construir el índice.
+        cache_dir (str): Carpeta donde se guardan los índices.
+
+    Returns:
+        SimilarityIndex: El índice.
+    """
+    directory = index_directory(version, cache_dir)
+    if os.path.exists(os.path.join(directory, "meta.json")):
+        return SimilarityIndex.load(directory)
+    index = SimilarityIndex.from_batches(batches)
+    # Se guarda en una carpeta temporal que luego se mueve a su lugar: otros procesos nunca ven
+    # un índice a medio escribir, y si otro proceso guardó la misma versión antes se usa la suya.
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=_STAGING_PREFIX, dir=cache_dir)
+    try:
+        index.save(staging)
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            if not os.path.exists(os.path.join(directory, "meta.json")):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    # Los índices de otras versiones se eliminan solo con el nuevo ya en su lugar. Los procesos que
+    # todavía los tengan abiertos con memory-map siguen leyéndolos hasta cerrarlos.
+    for name in os.listdir(cache_dir):
+        if name != os.path.basename(directory) and not name.startswith(_STAGING_PREFIX):
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+    return SimilarityIndex.load(directory)
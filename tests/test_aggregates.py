@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import AggregateCube
+from conftest import ROOT
+from dataset import to_typed_frame
+
+
+@pytest.fixture(scope="module")
+def data():
+    return to_typed_frame(pd.read_csv(os.path.join(ROOT, "datos_limpios.csv")))
+
+
+@pytest.fixture(scope="module")
+def cube(data):
+    return AggregateCube(data)
+
+
+def _filtered(data, brands, types, price_range):
+    mask = pd.Series(True, index=data.index)
+    if brands is not None:
+        mask &= data["marca"].isin(brands)
+    if types is not None:
+        mask &= data["tipo"].isin(types)
+    if price_range is not None:
+        mask &= data["precio"].between(*price_range)
+    return data[mask]
+
+
+SELECTIONS = [
+    (None, None, None),
+    (["Sony", "Samsung", "Bose", "Canon"], None, None),
+    (None, ["television", "speaker", "camara_digital"], None),
+    (None, None, (50, 300)),
+    (["Sony", "Samsung", "Panasonic", "LG"], ["television", "speaker"], (100, 1000)),
+    (None, None, (40, 40)),
+    (["Sony"], None, (5000, 6000)),
+]
+
+
+@pytest.mark.parametrize("brands, types, price_range", SELECTIONS)
+@pytest.mark.parametrize("by", ["marca", "tipo"])
+def test_reduce_matches_groupby(data, cube, by, brands, types, price_range):
+    filtered = _filtered(data, brands, types, price_range)
+    expected = filtered.groupby(by, observed=True).agg(
+        cantidad=("precio", "size"),
+        n_precio=("precio", "count"),
+        suma=("precio", "sum"),
+        media=("precio", "mean"),
+        desviacion=("precio", "std"),
+        minimo=("precio", "min"),
+        maximo=("precio", "max"),
+    )
+    result = cube.reduce(by, cube.select(brands, types, price_range))
+    result = result[result.index.notna() & (result["cantidad"] > 0)]  # groupby omite los nulos y los grupos vacíos.
+    assert sorted(result.index) == sorted(expected.index.astype(object))
+    result = result.reindex(expected.index.astype(object))
+    for column in expected.columns:
+        np.testing.assert_allclose(result[column].to_numpy(dtype="float64"),
+                                   expected[column].to_numpy(dtype="float64"), rtol=1e-9, atol=1e-6, err_msg=column)
+
+
+@pytest.mark.parametrize("brands, types, price_range", SELECTIONS)
+@pytest.mark.parametrize("by", ["marca", "tipo"])
+def test_top_matches_value_counts(data, cube, by, brands, types, price_range):
+    filtered = _filtered(data, brands, types, price_range)
+    expected = filtered[by].value_counts()
+    expected = expected[expected > 0]
+    result = cube.top(by, n=None, mask=cube.select(brands, types, price_range))
+    assert dict(zip(result.index, result.tolist())) == dict(zip(expected.index.astype(object), expected.tolist()))
+    assert result.is_monotonic_decreasing
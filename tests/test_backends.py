@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backends import DuckDBBackend, PandasBackend
+from conftest import ROOT
+from dataset import SharedDataset, load_dataset, write_columnar
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory):
+    pytest.importorskip("duckdb")
+    csv_path = os.path.join(ROOT, "datos_limpios.csv")
+    parquet_path = str(tmp_path_factory.mktemp("datos") / "datos_limpios.parquet")
+    write_columnar(pd.read_csv(csv_path), parquet_path)
+    data = load_dataset(path=parquet_path + ".no-existe", csv_path=csv_path)
+    return PandasBackend(SharedDataset(data)), DuckDBBackend(parquet_path)
+
+
+def _random_filters(backend, seed):
+    # Combinaciones de filtros como las de la barra lateral, incluidas las que no filtran (None).
+    rng = np.random.default_rng(seed)
+    low, high = backend.price_bounds()
+    filters = {}
+    for name, column in [("brands", "marca"), ("types", "tipo")]:
+        options = backend.options(column)
+        if rng.random() < 0.7:
+            size = rng.integers(1, len(options) + 1)
+            filters[name] = [options[i] for i in rng.choice(len(options), size=size, replace=False)]
+        else:
+            filters[name] = None
+    if rng.random() < 0.7:
+        filters["price_range"] = tuple(sorted(rng.uniform(low, high, size=2)))
+    else:
+        filters["price_range"] = None
+    filters["keyword"] = rng.choice(["", "sony", "usb ca", "cable hdmi", "xyz"])
+    return filters
+
+
+def test_options_and_price_bounds_match(backends):
+    pandas_backend, duckdb_backend = backends
+    for column in ["marca", "tipo"]:
+        assert [None if pd.isna(value) else value for value in pandas_backend.options(column)] == \
+            duckdb_backend.options(column)
+    assert pandas_backend.price_bounds() == pytest.approx(duckdb_backend.price_bounds())
+
+
+def test_unfiltered_price_keeps_rows_without_price(backends):
+    pandas_backend, duckdb_backend = backends
+    brands = pandas_backend.options("marca")[:3]
+    total = pandas_backend.count(brands=brands, price_range=None)
+    assert total == duckdb_backend.count(brands=brands, price_range=None)
+    low, high = pandas_backend.price_bounds()
+    assert pandas_backend.count(brands=brands, price_range=(low, high)) < total
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_backends_agree_on_filtered_queries(backends, seed):
+    pandas_backend, duckdb_backend = backends
+    filters = _random_filters(pandas_backend, seed)
+
+    assert pandas_backend.count(**filters) == duckdb_backend.count(**filters)
+    for by in ["marca", "tipo"]:
+        expected = pandas_backend.top(by, 10, **filters)
+        result = duckdb_backend.top(by, 10, **filters)
+        assert list(expected.index) == list(result.index)
+        assert expected.tolist() == result.tolist()
+    for sort_by, ascending in [(None, True), ("precio", False)]:
+        expected = pandas_backend.page(2, 25, sort_by=sort_by, ascending=ascending, **filters)
+        result = duckdb_backend.page(2, 25, sort_by=sort_by, ascending=ascending, **filters)
+        assert list(expected.index) == list(result.index)
+        assert expected["descripcion"].tolist() == result["descripcion"].tolist()
+    expected = pandas_backend.word_frequencies(max_words=50, **filters)
+    assert list(expected.items()) == list(duckdb_backend.word_frequencies(max_words=50, **filters).items())
+
+
+def test_word_frequencies_match_wordcloud_on_full_catalog(backends):
+    from wordcloud import WordCloud
+
+    pandas_backend, _ = backends
+    descriptions = pandas_backend.shared.frame["descripcion"].dropna()
+    expected = WordCloud(collocations=False).process_text(" ".join(descriptions))
+    result = pandas_backend.word_frequencies(max_words=len(expected))
+    assert result == expected
+    assert list(result.values()) == sorted(result.values(), reverse=True)
+
+
+def test_similarity_index_from_streamed_batches(backends):
+    from similar import SimilarityIndex
+
+    pandas_backend, duckdb_backend = backends
+    data = pandas_backend.shared.frame
+    expected = SimilarityIndex(data["descripcion"], data["tipo"], data["precio"])
+    columns = ["descripcion", "tipo", "precio"]
+    for backend in backends:
+        index = SimilarityIndex.from_batches(lambda: backend.batches(columns, batch_size=100))
+        for name in ["feature_ptr", "rows", "weights", "idf", "tipo", "precio"]:
+            assert np.array_equal(getattr(index, name), getattr(expected, name), equal_nan=name == "precio")
+        assert index.type_labels == expected.type_labels
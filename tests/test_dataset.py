@@ -0,0 +1,20 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from conftest import ROOT
+from dataset import SharedDataset, to_typed_frame
+
+
+def test_memory_usage_counts_base_data_apart_from_derived_results():
+    data = to_typed_frame(pd.read_csv(os.path.join(ROOT, "datos_limpios.csv")))
+    shared = SharedDataset(data)
+    usage = shared.memory_usage()
+    assert usage["datos"] == data.memory_usage(deep=True).sum()
+    assert usage["derivados"] == 0
+
+    shared.derived("filas", lambda df: np.arange(len(df), dtype=np.int64))
+    usage = shared.memory_usage()
+    assert usage["derivados"] == len(data) * 8
+    assert list(shared._derived) == ["filas"]  # El tamaño de los datos no se guarda como un derivado.
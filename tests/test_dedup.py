@@ -0,0 +1,39 @@
+import os
+
+import pandas as pd
+
+from conftest import ROOT
+from dedup import find_duplicates
+from extraction import OUTPUT_COLUMNS
+
+
+def _catalog(descriptions):
+    data = pd.DataFrame({column: [None] * len(descriptions) for column in OUTPUT_COLUMNS})
+    data["descripcion"] = pd.Series(descriptions, dtype=object)
+    return data
+
+
+def test_empty_catalog():
+    groups = find_duplicates(_catalog([]))
+    assert len(groups) == 0
+    assert list(groups.columns) == ["grupo", "canonica"]
+
+
+def test_catalog_without_model_codes():
+    # Sin sku ni códigos de modelo en el texto: solo se agrupan las descripciones repetidas.
+    descriptions = [f"cable de audio estereo numero {'uno dos tres cuatro cinco'.split()[i % 5]} largo" for i in range(50)]
+    groups = find_duplicates(_catalog(descriptions))
+    assert len(groups) == 50
+    assert groups["grupo"].nunique() == 5
+    assert groups["canonica"].sum() == 5
+
+
+def test_known_duplicates_are_grouped():
+    data = pd.read_csv(os.path.join(ROOT, "datos_limpios.csv")).head(20)
+    copy = data.iloc[[3]].copy()
+    copy["descripcion"] = copy["descripcion"].str.upper()
+    data = pd.concat([data, copy], ignore_index=True)
+    groups = find_duplicates(data)
+    assert groups.loc[3, "grupo"] == groups.loc[20, "grupo"]
+    assert groups.loc[3, "canonica"] and not groups.loc[20, "canonica"]
+    assert groups.drop(index=[3, 20])["grupo"].is_unique
@@ -0,0 +1,80 @@
+import os
+import re
+
+import pandas as pd
+import pytest
+from fuzzywuzzy import process
+
+from conftest import ROOT
+from extraction import BrandMatcher, TypeClassifier, brands, clean_catalog, extract_type_from_dict, tipos
+
+
+def _read_catalog():
+    return pd.read_excel(os.path.join(ROOT, "Prueba_EVA.XLSX"))
+
+
+def _type_by_keyword_loop(description, datas):
+    # Versión original del notebook: una búsqueda por palabra clave, en orden de prioridad.
+    for tipo, keywords in datas.items():
+        for keyword in keywords:
+            if re.search(rf"\b{re.escape(keyword)}\b", description, re.IGNORECASE):
+                return tipo
+    return None
+
+
+def test_type_classifier_matches_keyword_loop_on_catalog():
+    descriptions = _read_catalog()["descripcion"].dropna().tolist()
+    classifier = TypeClassifier(tipos)
+    for description in descriptions:
+        expected = _type_by_keyword_loop(description, tipos)
+        assert classifier.classify(description) == expected
+        assert extract_type_from_dict(description) == expected
+
+
+@pytest.mark.parametrize("description", [
+    "",
+    "Linksys Wi-Fi Router WRT54G",
+    "wi-fi routers",
+    "Router/Modem combo",
+    "IR/RF remote",
+    "tv_box",
+    "CÁMARA IP para exteriores",
+    "Blu-ray player BD-P1500",
+    "Smart TV, Smart Speaker",
+    "C++ Flash",
+])
+def test_type_classifier_matches_keyword_loop_on_edge_cases(description):
+    datas = dict(tipos, lenguaje=["C++", "+"])  # Palabras clave que terminan en un signo.
+    assert TypeClassifier(datas).classify(description) == _type_by_keyword_loop(description, datas)
+
+
+def test_clean_catalog_reproduces_notebook_output():
+    # datos_limpios.csv es la salida del notebook original sobre Prueba_EVA.XLSX.
+    with open(os.path.join(ROOT, "datos_limpios.csv"), encoding="utf-8", newline="") as expected:
+        assert clean_catalog(_read_catalog()).to_csv(index=False) == expected.read()
+
+
+def _brand_by_extract_one(description, brand_list):
+    # Versión original del notebook: la primera palabra cuya mejor marca supera 80 puntos.
+    if not description or pd.isna(description):
+        return None
+    for word in re.findall(r"\b\w+\b", description):
+        matched_brand, score = process.extractOne(word, brand_list)
+        if score > 80:
+            return matched_brand
+    return "other"
+
+
+def test_brand_matcher_matches_extract_one_on_catalog_tokens():
+    words = set()
+    for description in _read_catalog()["descripcion"].dropna():
+        words.update(re.findall(r"\b\w+\b", description))
+    words.update(["Sonny", "Samsng", "SAMSUNG", "lg", "Panasonik", "Tosh", "Philip", "Bosee", "x", "é", "_"])
+    matcher = BrandMatcher(brands)
+    for word in sorted(words):
+        assert matcher.extract(word) == _brand_by_extract_one(word, brands), word
+
+
+@pytest.mark.parametrize("description", [None, "", "Samsng 40' TV", "cable generico", "HP / Dell docking"])
+def test_brand_matcher_matches_extract_one_on_descriptions(description):
+    assert BrandMatcher(brands).extract(description) == _brand_by_extract_one(description, brands)
@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from extraction import BrandMatcher, brands, clean_catalog
+from extraction_cache import ExtractionCache
+
+GROUPS = ["marca", "tipo", "numericos", "descripcion"]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return pd.read_excel(os.path.join(ROOT, "Prueba_EVA.XLSX"))
+
+
+def _recomputed(cache):
+    return {group: cache.stats["grupos"][group]["recalculadas"] for group in GROUPS}
+
+
+def test_second_run_reuses_every_row(tmp_path, catalog):
+    first = ExtractionCache(str(tmp_path))
+    pd.testing.assert_frame_equal(first.clean(catalog), clean_catalog(catalog))
+    assert first.stats["recalculadas"] == len(catalog)
+
+    second = ExtractionCache(str(tmp_path))
+    pd.testing.assert_frame_equal(second.clean(catalog), clean_catalog(catalog))
+    assert second.stats["recalculadas"] == 0
+    assert second.stats["reutilizadas"] == len(catalog)
+    assert _recomputed(second) == dict.fromkeys(GROUPS, 0)
+
+
+def test_edited_descriptions_are_the_only_rows_recomputed(tmp_path, catalog):
+    ExtractionCache(str(tmp_path)).clean(catalog)
+
+    edited = catalog.copy()
+    edited.loc[[3, 500], "descripcion"] = ["Bose SoundLink Mini 20W - Black", "Kingston USB 64GB flash drive"]
+    cache = ExtractionCache(str(tmp_path))
+    result = cache.clean(edited)
+    pd.testing.assert_frame_equal(result, clean_catalog(edited))
+    assert cache.stats["recalculadas"] == 2
+    assert _recomputed(cache) == dict.fromkeys(GROUPS, 2)
+
+
+def test_changed_brand_rules_recompute_only_the_brand_group(tmp_path, catalog):
+    ExtractionCache(str(tmp_path)).clean(catalog)
+
+    matcher = BrandMatcher([brand for brand in brands if brand != "Sony"])
+    cache = ExtractionCache(str(tmp_path), brand_matcher=matcher)
+    result = cache.clean(catalog)
+    pd.testing.assert_frame_equal(result, clean_catalog(catalog, brand_matcher=matcher))
+    assert _recomputed(cache) == {"marca": len(catalog), "tipo": 0, "numericos": 0, "descripcion": 0}
+    assert "Sony" not in set(result["marca"])
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from dataset import to_typed_frame
+from filters import FilterEngine
+
+
+@pytest.fixture(scope="module")
+def data():
+    return to_typed_frame(pd.read_csv(os.path.join(ROOT, "datos_limpios.csv")))
+
+
+def _pandas_mask(data, brands, types, price_range):
+    # Filtros originales de la barra lateral: `isin` no reconoce NaN en la selección.
+    mask = pd.Series(True, index=data.index)
+    for column, selected in [("marca", brands), ("tipo", types)]:
+        values = [value for value in selected if not pd.isna(value)]
+        mask &= data[column].isin(values) | (data[column].isna() & any(pd.isna(value) for value in selected))
+    if price_range is not None:
+        mask &= data["precio"].between(*price_range)
+    return mask.to_numpy()
+
+
+def _random_selections(data, n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    brands = list(data["marca"].cat.categories) + [np.nan]
+    types = list(data["tipo"].cat.categories) + [np.nan]
+    for _ in range(n):
+        chosen_brands = [brands[i] for i in rng.choice(len(brands), rng.integers(0, len(brands) + 1), replace=False)]
+        chosen_types = [types[i] for i in rng.choice(len(types), rng.integers(0, len(types) + 1), replace=False)]
+        if rng.random() < 0.3:
+            price_range = None
+        else:
+            price_range = tuple(sorted(rng.uniform(0, 1500, size=2).round(rng.integers(0, 3))))
+        yield chosen_brands, chosen_types, price_range
+
+
+def test_apply_matches_pandas_masks(data):
+    engine = FilterEngine(data)
+    for brands, types, price_range in _random_selections(data):
+        expected = np.flatnonzero(_pandas_mask(data, brands, types, price_range))
+        np.testing.assert_array_equal(engine.apply(brands, types, price_range), expected)
+
+
+@pytest.mark.parametrize("price_range", [None, (0, 4000), (99.99, 99.99), (5000, 6000)])
+def test_apply_edge_selections(data, price_range):
+    engine = FilterEngine(data)
+    brands = list(data["marca"].cat.categories) + [np.nan]
+    types = list(data["tipo"].cat.categories) + [np.nan]
+    for selected_brands, selected_types in [(brands, types), ([], types), (brands, [np.nan]), (["Sony"], types[:-1])]:
+        expected = np.flatnonzero(_pandas_mask(data, selected_brands, selected_types, price_range))
+        np.testing.assert_array_equal(engine.apply(selected_brands, selected_types, price_range), expected)
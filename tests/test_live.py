@@ -0,0 +1,40 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+
+
+def _live_document(tmp_path, monkeypatch):
+    pytest.importorskip("bokeh")
+    from bokeh.application import Application
+    from bokeh.application.handlers import ScriptHandler
+    from bokeh.document import Document
+
+    shutil.copy(os.path.join(ROOT, "datos_limpios.csv"), tmp_path / "datos_limpios.csv")
+    monkeypatch.chdir(tmp_path)
+    doc = Document()
+    Application(ScriptHandler(filename=os.path.join(ROOT, "live_server.py"))).initialize_document(doc)
+    return doc, list(doc.session_callbacks)[0].callback
+
+
+def test_live_server_pushes_only_patches_and_streams(tmp_path, monkeypatch):
+    doc, update = _live_document(tmp_path, monkeypatch)
+    events = []
+    doc.on_change(lambda event: events.append((type(event).__name__, getattr(event, "attr", None))))
+
+    update()  # Sin cambios en el archivo: solo se actualiza la hora de revisión.
+    assert events == [("ModelChangedEvent", "text")]
+
+    lines = (tmp_path / "datos_limpios.csv").read_text(encoding="utf-8").splitlines()
+    with open(tmp_path / "datos_limpios.csv", "a", encoding="utf-8") as output:
+        output.write("\n".join(lines[1:4]) + "\n")
+    events.clear()
+    update()
+    kinds = {kind for kind, _ in events}
+    assert kinds <= {"ColumnsPatchedEvent", "ColumnsStreamedEvent", "ModelChangedEvent"}
+    assert "ColumnsStreamedEvent" in kinds  # Un punto nuevo en la historia, sin reemplazar la fuente.
+    assert ("ModelChangedEvent", "data") not in events
+    status = doc.roots[0].children[-1].text
+    assert "Cambios:" in status and "+" in status
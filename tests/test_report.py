@@ -0,0 +1,45 @@
+import os
+
+import pandas as pd
+import pytest
+
+import report
+from conftest import ROOT
+from dataset import to_typed_frame
+
+
+def test_slugs_keep_unique_names_and_separate_collisions():
+    slugs = report._slugs(["Sony", "A/B", "A B", "Bose", "BOSE", None])
+    assert slugs[0] == "Sony"
+    assert slugs[5] == "None"
+    assert len({slug.lower() for slug in slugs}) == len(slugs)
+    for slug, base in zip(slugs[1:5], ["A_B", "A_B", "Bose", "BOSE"]):
+        assert slug.startswith(base + "-") and len(slug) == len(base) + 9
+    assert report._slugs(["A B", "A/B"]) == [slugs[2], slugs[1]]  # No depende del orden.
+
+
+def test_reports_by_brand_do_not_share_a_folder(tmp_path):
+    pytest.importorskip("matplotlib")
+    pytest.importorskip("wordcloud")
+    data = to_typed_frame(pd.read_csv(os.path.join(ROOT, "datos_limpios.csv")).head(40))
+    data["marca"] = pd.Categorical(["A/B"] * 20 + ["A B"] * 20)
+    report.generate_reports(data, str(tmp_path), by="marca")
+    folders = sorted(name for name in os.listdir(tmp_path) if os.path.isdir(tmp_path / name))
+    assert len(folders) == 2
+    titles = {(tmp_path / folder / "index.html").read_text(encoding="utf-8").split("<h1>")[1].split("</h1>")[0]
+              for folder in folders}
+    assert titles == {"Reporte de Productos: A/B", "Reporte de Productos: A B"}
+
+
+def test_fingerprint_follows_shared_drawing_code(monkeypatch):
+    inputs = {"labels": ["a"], "values": [1.0], "xlabel": "x", "ylabel": "y", "horizontal": False}
+    base = report.fingerprint("barras", "Título", inputs)
+    assert report.fingerprint("barras", "Título", inputs) == base
+    monkeypatch.setattr(report, "RENDER_VERSION", report.RENDER_VERSION + 1)
+    assert report.fingerprint("barras", "Título", inputs) != base
+    monkeypatch.undo()
+    monkeypatch.setattr(report.inspect, "getsource",
+                        lambda function: "cambiado" if function is report.render_chart else "")
+    changed = report.fingerprint("barras", "Título", inputs)
+    monkeypatch.setattr(report.inspect, "getsource", lambda function: "")
+    assert changed != report.fingerprint("barras", "Título", inputs)
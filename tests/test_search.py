@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from search import KeywordIndex
+
+DESCRIPTIONS = pd.Series([
+    "Sony 40' HDTV / Black Finish",
+    "Samsung LED TV - UN40 / 1080p",
+    "Sony Cable HDMI 6 ft",
+    "Panasonic cordless phone",
+    "SONY TV stand",
+])
+
+
+@pytest.fixture(scope="module")
+def index():
+    return KeywordIndex(DESCRIPTIONS)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("sony", [0, 2, 4]),
+    ("SONY", [0, 2, 4]),          # Sin distinguir mayúsculas.
+    ("sony tv", [4]),             # Todas las palabras (AND).
+    ("tv sony", [4]),             # En cualquier orden.
+    ("tv", [1, 4]),               # Palabras completas: "HDTV" no contiene el token "tv".
+    ("hdtv", [0]),
+    ("sam", [1]),                 # La última palabra es un prefijo.
+    ("sony ca", [2]),
+    ("son tv", []),               # Las demás palabras deben coincidir completas.
+    ("ony", []),                  # No se busca dentro de las palabras.
+    ("cable hdmi", [2]),
+    ("xyz", []),
+])
+def test_query_matches_whole_tokens_with_last_word_as_prefix(index, query, expected):
+    assert index.query(query).tolist() == expected
+
+
+def test_query_without_prefix(index):
+    assert index.query("sam", prefix=False).tolist() == []
+    assert index.query("samsung", prefix=False).tolist() == [1]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "/ $$"])
+def test_query_without_words_does_not_filter(index, query):
+    assert index.query(query) is None
+
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import similar
+from conftest import ROOT
+from similar import SimilarityIndex
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    data = pd.read_csv(os.path.join(ROOT, "datos_limpios.csv"))
+    return data, SimilarityIndex(data["descripcion"], data["tipo"], data["precio"])
+
+
+def _exact_scores(index, rows):
+    # Similitud coseno de `rows` contra todo el catálogo con los vectores completos del índice.
+    lengths = np.diff(index.feature_ptr)
+    used = np.flatnonzero(lengths)
+    vectors = np.zeros((index.n_rows, len(used)), dtype=np.float64)
+    vectors[index.rows, np.repeat(np.arange(len(used)), lengths[used])] = index.weights
+    return vectors[rows] @ vectors.T
+
+
+def test_query_is_exact_within_postings_budget(catalog):
+    data, index = catalog
+    rows = np.arange(0, index.n_rows, 25)
+    exact = _exact_scores(index, rows)
+    for row, scores in zip(rows, exact):
+        scores[row] = 0
+        result, similarity = index.query(data["descripcion"][row], k=10, exclude=row)
+        expected = np.sort(scores[scores > 1e-6])[::-1][:10]
+        assert np.allclose(similarity, expected, atol=1e-4)
+        assert np.allclose(scores[result], similarity, atol=1e-4)
+
+
+def test_query_over_budget_uses_rarest_ngrams(catalog, monkeypatch):
+    data, index = catalog
+    monkeypatch.setattr(similar, "MAX_POSTINGS", 200)
+    row = 500
+    exact = _exact_scores(index, [row])[0]
+    result, similarity = index.query(data["descripcion"][row], k=10, exclude=row)
+    assert 0 < len(result) <= 10
+    assert row not in result
+    assert np.all(similarity <= exact[result] + 1e-4)  # Con parte de los n-gramas la similitud es una cota inferior.
+
+
+def _batches(data):
+    return lambda: [data]
+
+
+def test_load_or_build_replaces_old_versions_after_saving(catalog, tmp_path):
+    data, _ = catalog
+    data = data.head(200)
+    cache_dir = str(tmp_path / "indices")
+    first = similar.load_or_build(("v", 1), _batches(data), cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == [os.path.basename(similar.index_directory(("v", 1), cache_dir))]
+    reopened = similar.load_or_build(("v", 1), lambda: pytest.fail("no debería reconstruirse"), cache_dir=cache_dir)
+    assert np.array_equal(reopened.rows, first.rows)
+
+    second = similar.load_or_build(("v", 2), _batches(data.head(100)), cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == [os.path.basename(similar.index_directory(("v", 2), cache_dir))]
+    assert second.n_rows == 100
+    assert first.n_rows == 200 and len(first.query(data["descripcion"][0], k=1)[0]) == 1  # Sigue abierto.
+
+
+def test_load_or_build_keeps_index_saved_by_another_process(catalog, tmp_path):
+    data, _ = catalog
+    data = data.head(200)
+    cache_dir = str(tmp_path / "indices")
+    directory = similar.index_directory(("v", 1), cache_dir)
+    other = SimilarityIndex(data["descripcion"], data["tipo"], data["precio"])
+
+    def batches():
+        # Otro proceso termina de guardar la misma versión mientras este la construye.
+        if not os.path.exists(directory):
+            other.save(directory)
+        return [data]
+
+    index = similar.load_or_build(("v", 1), batches, cache_dir=cache_dir)
+    assert os.listdir(cache_dir) == [os.path.basename(directory)]
+    assert np.array_equal(index.rows, other.rows)
+
+
+def test_empty_catalog_index():
+    index = SimilarityIndex(pd.Series([], dtype=object), pd.Series([], dtype=object), pd.Series([], dtype=float))
+    rows, scores = index.query("cable hdmi", k=5)
+    assert len(rows) == 0 and len(scores) == 0